@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+STAGE Anomaly Detector
+Week-over-week outlier flags per (market, show, channel, platform) series.
+
+Every series keeps running statistics for CAC, IR, TR, TCR and CTR: an
+exponentially weighted mean/variance (the "expected" level, which follows
+trends) and a Welford mean/variance (the long-run level).  A new week is
+scored against the state before it is folded in, so each week costs O(1)
+per series and history is never re-scanned:
+
+    series with MIN_HISTORY+ weeks   |value - ewma| >= Z_THRESHOLD std devs
+                                     and >= MIN_CHANGE of the expected level
+    younger series                   a move of EARLY_CHANGE or more vs last week
+
+Weeks with fewer than MIN_TRIALS trials are not scored (too noisy).  A week
+at or before a series' last seen week is never folded in twice; it is noted
+in `late` instead, and the caller replays the market's history in week order.
+
+The history store feeds every newly loaded export through a persistent
+detector (tables anomaly_state / anomalies), replaying a market whenever an
+export backfills or restates a week; the pages replay the weeks of their own
+dataset through a fresh one.  Both score each series' rows of a week blended
+(dataset_rows), so they raise the same flags.
+
+Usage: python3 anomaly_detector.py [market ...] [--weeks N] [--rebuild]
+"""
+
+import math
+import sys
+
+from cac_dataset import ShowDataset
+from cac_metrics import GroupedMetrics, metrics_from_sums
+from cac_reader import DEFAULT_SECTION
+
+# Metrics tracked per series, with the direction that counts as "worse"
+TRACKED = {'cac': 1, 'ir': -1, 'tr': -1, 'tcr': 1, 'ctr': -1}
+
+SERIES_DIMENSIONS = ('show', 'channel', 'platform')
+
+# Smoothing of the expected level (higher follows recent weeks faster)
+ALPHA = 0.3
+
+MIN_HISTORY = 3
+Z_THRESHOLD = 3.0
+MIN_CHANGE = 0.15
+EARLY_CHANGE = 0.30
+MIN_TRIALS = 50
+
+# Spread never assumed tighter than this share of the level
+REL_FLOOR = 0.05
+
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS anomaly_state (
+    market TEXT NOT NULL,
+    show TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    mean REAL NOT NULL,
+    m2 REAL NOT NULL,
+    ewma REAL NOT NULL,
+    ewvar REAL NOT NULL,
+    last REAL NOT NULL,
+    last_week TEXT NOT NULL,
+    PRIMARY KEY (market, show, channel, platform, metric)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS anomalies (
+    market TEXT NOT NULL,
+    week_start TEXT NOT NULL,
+    show TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL,
+    previous REAL NOT NULL,
+    expected REAL NOT NULL,
+    z REAL,
+    change REAL NOT NULL,
+    direction TEXT NOT NULL,
+    PRIMARY KEY (market, week_start, show, channel, platform, metric)
+) WITHOUT ROWID;
+"""
+
+STATE_TABLES = ('anomaly_state', 'anomalies')
+
+FLAG_FIELDS = ('market', 'week', 'show', 'channel', 'platform', 'metric',
+               'value', 'previous', 'expected', 'z', 'change', 'direction')
+
+
+class MetricStats:
+    """Running Welford + EWMA statistics of one metric of one series"""
+
+    __slots__ = ('n', 'mean', 'm2', 'ewma', 'ewvar', 'last', 'last_week')
+
+    def __init__(self, n=0, mean=0.0, m2=0.0, ewma=0.0, ewvar=0.0, last=0.0, last_week=''):
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+        self.ewma = ewma
+        self.ewvar = ewvar
+        self.last = last
+        self.last_week = last_week
+
+    @property
+    def std(self):
+        """Long-run (Welford) standard deviation"""
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    def score(self, value):
+        """(expected, z or None, relative change, outlier?) of a new value, before update()"""
+        if not self.n:
+            return value, None, 0.0, False
+        expected = self.ewma
+        change = (value - self.last) / abs(self.last) if self.last else 0.0
+        if self.n < MIN_HISTORY:
+            return expected, None, change, abs(change) >= EARLY_CHANGE
+        spread = max(math.sqrt(self.ewvar), REL_FLOOR * abs(expected))
+        z = (value - expected) / spread if spread else 0.0
+        deviation = abs(value - expected) / abs(expected) if expected else 0.0
+        return expected, z, change, abs(z) >= Z_THRESHOLD and deviation >= MIN_CHANGE
+
+    def update(self, value, week):
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+        if self.n == 1:
+            self.ewma, self.ewvar = value, 0.0
+        else:
+            diff = value - self.ewma
+            increment = ALPHA * diff
+            self.ewma += increment
+            self.ewvar = (1 - ALPHA) * (self.ewvar + diff * increment)
+        self.last = value
+        self.last_week = week
+
+    def as_row(self):
+        return (self.n, self.mean, self.m2, self.ewma, self.ewvar, self.last, self.last_week)
+
+
+class AnomalyDetector:
+    """
+    Per-series running statistics; observe() scores and folds in one week.
+
+    With a SQLite connection the states are loaded per market on first use
+    and written back (with the flags) by flush(); without one everything
+    stays in memory.
+    """
+
+    def __init__(self, db=None):
+        self.db = db
+        self.series = {}        # (market, show, channel, platform, metric) -> MetricStats
+        self._loaded = set()    # markets whose stored states are in self.series
+        self._dirty = set()
+        self._flags = []
+        self.late = set()       # (market, week) pairs observe() could not fold in
+        if db is not None:
+            db.executescript(STATE_SCHEMA)
+
+    def _load(self, market):
+        if self.db is None or market in self._loaded:
+            return
+        self._loaded.add(market)
+        for market_, show, channel, platform, metric, *state in self.db.execute(
+                'SELECT market, show, channel, platform, metric, n, mean, m2, ewma, ewvar, last, '
+                'last_week FROM anomaly_state WHERE market = ?', (market,)):
+            self.series[(market_, show, channel, platform, metric)] = MetricStats(*state)
+
+    def observe(self, market, week, rows):
+        """
+        Score and fold in one week of a market.  `rows` are
+        (show, channel, platform, trials, {metric: value}); returns the flags.
+        """
+        self._load(market)
+        flags = []
+        for show, channel, platform, trials, values in rows:
+            if trials < MIN_TRIALS:
+                continue
+            for metric, value in values.items():
+                if metric not in TRACKED or value is None or value != value:
+                    continue
+                key = (market, show, channel, platform, metric)
+                stats = self.series.get(key)
+                if stats is None:
+                    stats = self.series[key] = MetricStats()
+                elif week <= stats.last_week:
+                    # Backfilled or restated week: only a replay can score it in order
+                    self.late.add((market, week))
+                    continue
+                expected, z, change, outlier = stats.score(value)
+                if outlier:
+                    worse = (value - expected) * TRACKED[metric] > 0
+                    flags.append(dict(zip(FLAG_FIELDS, (
+                        market, week, show, channel, platform, metric, value, stats.last,
+                        expected, z, change, 'worse' if worse else 'better'))))
+                stats.update(value, week)
+                self._dirty.add(key)
+        self._flags.extend(flags)
+        return flags
+
+    def observe_dataset(self, data, market=None):
+        """Replay every week of a ShowDataset, oldest first; returns all flags"""
+        flags = []
+        weeks = data.group_by('market', 'section', 'week')
+        for (week_market, section, week), part in sorted(weeks.items(), key=lambda item: item[0][2]):
+            if section == DEFAULT_SECTION and week:
+                flags.extend(self.observe(market or week_market, week, dataset_rows(part)))
+        return flags
+
+    def replay(self, market, data):
+        """Forget a market's states and flags and re-score `data` (its full history) in week order"""
+        self.reset(market)
+        return self.observe_dataset(data, market)
+
+    def flush(self):
+        """Write changed states and new flags back to the database"""
+        if self.db is None:
+            self._dirty.clear()
+            self._flags.clear()
+            return
+        self.db.executemany(
+            'INSERT OR REPLACE INTO anomaly_state (market, show, channel, platform, metric, n, mean, '
+            'm2, ewma, ewvar, last, last_week) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            [key + self.series[key].as_row() for key in self._dirty])
+        self.db.executemany(
+            'INSERT OR REPLACE INTO anomalies (market, week_start, show, channel, platform, metric, '
+            'value, previous, expected, z, change, direction) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            [tuple(flag[name] for name in FLAG_FIELDS) for flag in self._flags])
+        self._dirty.clear()
+        self._flags.clear()
+
+    def flags(self, market=None, since=None):
+        """Stored flags, newest week first"""
+        sql = ('SELECT market, week_start, show, channel, platform, metric, value, previous, '
+               'expected, z, change, direction FROM anomalies WHERE 1 = 1')
+        params = []
+        if market:
+            sql += ' AND market = ?'
+            params.append(market)
+        if since:
+            sql += ' AND week_start >= ?'
+            params.append(since)
+        sql += ' ORDER BY week_start DESC, market, show'
+        return [dict(zip(FLAG_FIELDS, row)) for row in self.db.execute(sql, params)]
+
+    def reset(self, market=None):
+        """Forget states and flags (of one market) so history can be replayed"""
+        def kept(key):
+            return market is not None and key[0] != market
+
+        self.series = {key: stats for key, stats in self.series.items() if kept(key)}
+        self._dirty = {key for key in self._dirty if kept(key)}
+        self._flags = [flag for flag in self._flags if kept((flag['market'],))]
+        self.late = {key for key in self.late if kept(key)}
+        self._loaded.discard(market) if market else self._loaded.clear()
+        if self.db is not None:
+            for table in STATE_TABLES:
+                if market:
+                    self.db.execute(f'DELETE FROM {table} WHERE market = ?', (market,))
+                else:
+                    self.db.execute(f'DELETE FROM {table}')
+
+
+def dataset_rows(data):
+    """observe() rows of a ShowDataset (one week of one market), blended per series"""
+    for (show, channel, platform), sums in GroupedMetrics.of(data, *SERIES_DIMENSIONS).items():
+        values = metrics_from_sums(sums)
+        present = {'cac': sums[1] > 0, 'ir': sums[3] > 0, 'tr': sums[5] > 0,
+                   'tcr': sums[7] > 0, 'ctr': sums[9] > 0}
+        yield show, channel, platform, sums[1], {name: values[name] for name in TRACKED if present[name]}
+
+
+def batch_rows(batches):
+    """week_start -> observe() rows, from the main section of parsed RecordBatches"""
+    weeks = {}
+    for batch in batches:
+        if batch.section == DEFAULT_SECTION and batch.week_start:
+            weeks.setdefault(batch.week_start, ShowDataset()).extend(batch.data)
+    return {week: list(dataset_rows(data)) for week, data in weeks.items()}
+
+
+def detect(data):
+    """Flags of every week of a dataset, from a fresh detector"""
+    return AnomalyDetector().observe_dataset(data)
+
+
+def main():
+    from history_store import HistoryStore, parse_history_args, sync_markets
+
+    argv = sys.argv[1:]
+    _, weeks = parse_history_args(argv)
+    skip = {i + 1 for i, arg in enumerate(argv) if arg == '--weeks'}
+    markets = [arg.lower() for i, arg in enumerate(argv) if not arg.startswith('-') and i not in skip]
+
+    print("=" * 60)
+    print("📊 STAGE Anomaly Detector")
+    print("=" * 60)
+
+    with HistoryStore() as store:
+        if '--rebuild' in argv:
+            # Replay the stored history in week order
+            with store.db:
+                for market in markets or store.markets():
+                    store.anomalies.replay(market, store.load_dataset(market))
+                store.anomalies.flush()
+        sync_markets(store, markets or None)
+
+        for market in markets or store.markets():
+            recent = store.weeks(market, limit=weeks)
+            flags = store.anomalies.flags(market, recent[-1] if weeks and recent else None)
+            print(f"\n📄 {market.capitalize()}: {len(flags)} flags")
+            for flag in flags:
+                mark = '⚠️' if flag['direction'] == 'worse' else '✓'
+                print(f"   {mark} {flag['week']} {flag['show']} ({flag['channel']} {flag['platform']}): "
+                      f"{flag['metric'].upper()} {flag['previous']:.2f} → {flag['value']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
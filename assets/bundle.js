@@ -0,0 +1,38 @@
+// Deploy bundle shell: manifest first (always revalidated), then the content-hashed
+// data files (immutable), then the page code once the globals it reads are set
+if ('serviceWorker' in navigator) {
+    navigator.serviceWorker.register(BUNDLE.serviceWorker)
+        .catch(error => console.warn('⚠️ Service worker not registered:', error));
+}
+
+function fetchJson(url, options) {
+    return fetch(url, options).then(response => {
+        if (!response.ok) throw new Error(`${url}: HTTP ${response.status}`);
+        return response.json();
+    });
+}
+
+fetchJson(BUNDLE.manifest, { cache: 'no-cache' }).then(manifest => {
+    const page = manifest.pages[BUNDLE.page];
+    // One row payload per market and week; payload.js merges them
+    const shards = page.markets.flatMap(market => manifest.markets[market].weeks.map(week => week.file));
+    return Promise.all([
+        Promise.all(shards.map(file => fetchJson(file))),
+        fetchJson(page.cube),
+        fetchJson(page.rankings),
+        fetchJson(page.insights)
+    ]).then(([payloads, cube, rankings, insights]) => {
+        window.PAYLOAD = payloads;
+        window.CUBE = cube;
+        window.RANKINGS = rankings;
+        window.INSIGHTS = insights;
+        window.MARKET_LABEL = manifest.markets[page.markets[0]].label;
+        window.currentMarket = page.markets[0];
+        const rowCount = document.getElementById('rowCount');
+        if (rowCount) rowCount.textContent = payloads.reduce((total, payload) => total + payload.rows, 0);
+
+        const script = document.createElement('script');
+        script.src = BUNDLE.app;
+        document.body.appendChild(script);
+    });
+}).catch(error => console.error('❌ Could not load the dashboard bundle:', error));
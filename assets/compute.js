@@ -0,0 +1,82 @@
+// Show rows per market, decoded off the main thread when a worker can start.
+// assets/worker.js inflates, merges and splits the payload and sorts every
+// table column, then transfers each market back as typed arrays; this thread
+// only wraps them (ColumnRows) and renders.  Without a worker the same work
+// runs here.  Metrics and insights need neither: they are precomputed at
+// build time (cac_cube, insights_engine).
+
+// A market's rows over transferred columns; row objects are built on first read
+class ColumnRows {
+    constructor(slice) {
+        this.fields = slice.fields;
+        this.labels = slice.labels;
+        this.columns = slice.columns;
+        this.length = slice.rows;
+        this.cache = new Array(slice.rows);
+    }
+
+    at(i) {
+        let row = this.cache[i];
+        if (!row) {
+            row = {};
+            this.fields.forEach(name => {
+                const value = this.columns[name][i];
+                const table = this.labels[name];
+                row[name] = table ? table[value] : (value !== value ? null : value);
+            });
+            this.cache[i] = row;
+        }
+        return row;
+    }
+}
+
+function startWorker() {
+    if (!window.Worker) return null;
+    try {
+        if (typeof BUNDLE !== 'undefined' && BUNDLE.worker) return new Worker(BUNDLE.worker);
+        const source = document.getElementById('computeWorker');
+        if (!source || !source.textContent.trim()) return null;
+        return new Worker(URL.createObjectURL(new Blob([source.textContent], { type: 'text/javascript' })));
+    } catch (error) {
+        console.warn('⚠️ Compute worker not started:', error);
+        return null;
+    }
+}
+
+function loadInWorker(worker, payload, market) {
+    return new Promise((resolve, reject) => {
+        worker.onmessage = event => event.data.error ? reject(new Error(event.data.error)) : resolve(event.data.result);
+        worker.onerror = event => {
+            event.preventDefault();
+            reject(new Error(event.message || 'compute worker failed'));
+        };
+        worker.postMessage({ payload, market });
+    }).then(slices => {
+        const markets = {};
+        Object.entries(slices).forEach(([name, slice]) => {
+            markets[name] = new ColumnRows(slice);
+            registerSortOrders(markets[name], slice.orders, slice.weekOrders);
+        });
+        return markets;
+    }).finally(() => worker.terminate());
+}
+
+function loadHere(payload, market) {
+    return loadPayload(payload).then(data => {
+        const orders = decodeOrders(data);
+        const markets = data.columns.market ? decodeByMarket(data) : { [market]: decodeRows(data) };
+        Object.entries(markets).forEach(([name, rows]) => registerSortOrders(
+            rows, orders[name] || orders[''], weekOrders(orders, data.columns.market ? name : '')));
+        return markets;
+    });
+}
+
+// {market: rows}; a payload without a market column is all `market`
+function loadShowRows(payload, market) {
+    const worker = startWorker();
+    if (!worker) return loadHere(payload, market);
+    return loadInWorker(worker, payload, market).catch(error => {
+        console.warn('⚠️ Compute worker failed, decoding on the main thread:', error);
+        return loadHere(payload, market);
+    });
+}
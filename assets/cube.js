@@ -0,0 +1,29 @@
+// Metrics cube (cac_cube): indexes CUBE once, then every metric is a lookup
+function metricsFromSums(v) {
+    const [spend, trials, irW, irN, trW, trN, tcrW, tcrN, ctrW, ctrN] = v;
+    return {
+        totalSpend: spend, totalTrials: trials,
+        cac: trials > 0 ? spend / trials : 0,
+        ir: irN > 0 ? irW / irN : 0,
+        tr: trN > 0 ? trW / trN : 0,
+        tcr: tcrN > 0 ? tcrW / tcrN : 0,
+        ctr: ctrN > 0 ? ctrW / ctrN : 0
+    };
+}
+
+const EMPTY_METRICS = metricsFromSums([0, 0, 0, 0, 0, 0, 0, 0, 0, 0]);
+
+// rollup name -> Map('label|label' -> metrics), built once on load
+const CUBE_INDEX = {};
+Object.entries(CUBE.rollups).forEach(([name, rollup]) => {
+    const dims = name.split(',');
+    const table = CUBE_INDEX[name] = new Map();
+    rollup.keys.forEach((key, i) => {
+        const label = key.map((code, d) => CUBE.labels[dims[d]][code]).join('|');
+        table.set(label, metricsFromSums(rollup.values[i]));
+    });
+});
+
+function cubeMetrics(rollup, ...values) {
+    return CUBE_INDEX[rollup].get(values.join('|')) || EMPTY_METRICS;
+}
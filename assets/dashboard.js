@@ -0,0 +1,468 @@
+// Rendering shared by every dashboard page.  The page script defines
+// currentMarket, getCurrentData(), renderTable() and showsTable (a
+// VirtualTable over the show rows) before this runs.
+let currentSortCol = 4; // Default sort by trials
+let currentWeek = null; // null: every week of the market
+let sortAsc = false;
+let channelChart = null;
+let platformChart = null;
+let chartLibrary = null;
+
+// One formatter instead of a toLocaleString('en-IN') lookup per cell
+const RUPEES = new Intl.NumberFormat('en-IN');
+
+function formatCurrency(num) { return num == null ? '—' : '₹' + RUPEES.format(parseFloat(num)); }
+
+function formatPercent(num) { return num == null ? '—' : num + '%'; }
+
+// Week filter: the weeks of the current market (cube rollup market x week),
+// newest first, after an "All weeks" entry
+let weekOptions = [null];
+
+function marketWeeks(market) {
+    const weeks = [];
+    CUBE_INDEX['market,week'].forEach((_, key) => {
+        const [name, week] = key.split('|');
+        if (name === market) weeks.push(week);
+    });
+    return weeks.sort().reverse();
+}
+
+function renderWeekOptions() {
+    weekOptions = [null, ...marketWeeks(currentMarket)];
+    if (!weekOptions.includes(currentWeek)) currentWeek = null;
+    const select = document.getElementById('weekFilter');
+    select.innerHTML = weekOptions
+        .map(week => `<option>${week === null ? 'All weeks' : week || '(undated)'}</option>`).join('');
+    select.selectedIndex = weekOptions.indexOf(currentWeek);
+}
+
+// Cube metrics of the current market and week, optionally of one channel or platform
+function currentMetrics(dim, value) {
+    const dims = currentWeek === null ? ['market'] : ['market', 'week'];
+    const values = currentWeek === null ? [currentMarket] : [currentMarket, currentWeek];
+    if (dim) {
+        dims.push(dim);
+        values.push(value);
+    }
+    return cubeMetrics(dims.join(','), ...values);
+}
+
+function renderMetrics() {
+    const metrics = currentMetrics();
+    const grid = document.getElementById('metricsGrid');
+    const cards = [
+        { label: 'Total Spend', value: formatCurrency(metrics.totalSpend), status: '', healthy: true },
+        { label: 'Total Trials', value: metrics.totalTrials.toLocaleString(), status: '', healthy: true },
+        { label: 'Average CAC', value: formatCurrency(metrics.cac.toFixed(2)), status: metrics.cac < 250 ? 'Healthy ✅' : 'Needs Attention ⚠️', healthy: metrics.cac < 250 },
+        { label: 'CTR', value: metrics.ctr.toFixed(2) + '%', status: metrics.ctr > 0.75 ? 'Healthy ✅' : 'Needs Attention ⚠️', healthy: metrics.ctr > 0.75 },
+        { label: 'Install Rate (IR)', value: metrics.ir.toFixed(2) + '%', status: metrics.ir >= 10 ? 'Healthy ✅' : 'Needs Attention ⚠️', healthy: metrics.ir >= 10 },
+        { label: 'Trial Rate (TR)', value: metrics.tr.toFixed(2) + '%', status: metrics.tr >= 20 ? 'Healthy ✅' : 'Needs Attention ⚠️', healthy: metrics.tr >= 20 },
+        { label: 'D0 TCR', value: metrics.tcr.toFixed(2) + '%', status: metrics.tcr < 30 ? 'Healthy ✅' : 'Needs Attention ⚠️', healthy: metrics.tcr < 30 }
+    ];
+    grid.innerHTML = cards.map(card => `
+        <div class="metric-card ${card.healthy ? 'healthy' : 'unhealthy'}">
+            <div class="metric-label">${card.label}</div>
+            <div class="metric-value">${card.value}</div>
+            ${card.status ? `<div class="metric-status ${card.healthy ? 'healthy' : 'unhealthy'}">${card.status}</div>` : ''}
+        </div>
+    `).join('');
+    renderHealth();
+}
+
+// Rankings (cac_rankings) of the current market and week: its market x week
+// x channel x platform blocks merged, top-K lists by trials and bucket totals
+// summed, so the summary never scans the rows
+const RANKING_BUCKETS = ['cacEfficient', 'cacOver', 'tcrHealthy', 'tcrPoor'];
+
+function currentRanking() {
+    const [market, week, channel, platform] = ['market', 'week', 'channel', 'platform'].map(dim => RANKINGS.dims.indexOf(dim));
+    const ranking = { size: 0, topTrials: [] };
+    RANKING_BUCKETS.forEach(name => { ranking[name] = name === 'tcrPoor' ? [0, 0, 0, 0] : [0, 0, 0]; });
+    Object.entries(RANKINGS.slices).forEach(([key, block]) => {
+        const values = key.split('|');
+        if (values[market] !== currentMarket || (currentWeek !== null && values[week] !== currentWeek)) return;
+        ranking.size += block.size;
+        // Rows are per channel and platform, so a show can appear more than once
+        block.topTrials.forEach(([show, trials]) => ranking.topTrials.push([show, trials, `${values[channel]} ${values[platform]}`]));
+        RANKING_BUCKETS.forEach(name => block[name].forEach((value, i) => { ranking[name][i] += value; }));
+    });
+    // Stable: equal trials keep block order
+    ranking.topTrials = ranking.topTrials.sort((a, b) => b[1] - a[1]).slice(0, RANKINGS.k);
+    return ranking;
+}
+
+function renderHealth() {
+    const ranking = currentRanking();
+    const { cac, minTrials, tcr } = RANKINGS.thresholds;
+    const totalTrials = currentMetrics().totalTrials;
+    const share = trials => totalTrials > 0 ? (trials / totalTrials * 100).toFixed(1) : '0.0';
+    const top = ranking.topTrials.slice(0, 5)
+        .map(([show, trials, block]) => `<strong>${RANKINGS.shows[show]}</strong> (${block}, ${trials.toLocaleString()})`).join(' · ');
+    const [efficient, efficientTrials] = ranking.cacEfficient;
+    const [over, , overSpend] = ranking.cacOver;
+    const [poor, , , lost] = ranking.tcrPoor;
+    document.getElementById('healthSummary').innerHTML = ranking.size ? `
+        <div>🏆 <strong>Top shows by trials:</strong> ${top}</div>
+        <div>✅ <strong>${efficient} of ${ranking.size}</strong> shows under ₹${cac} CAC on ${minTrials}+ trials (${share(efficientTrials)}% of trials) •
+            ⚠️ <strong>${over}</strong> at or above ₹${cac} CAC (${formatCurrency(Math.round(overSpend))} spend) •
+            🚨 <strong>${poor}</strong> at or above ${tcr}% TCR (~${lost.toLocaleString()} trials lost)</div>
+    ` : '';
+}
+
+// Chart.js is loaded on the first chart tab, from the inert #chartLibrary
+// element: its inlined source (vendored build) or else its data-src URL
+function loadChartLibrary() {
+    if (window.Chart) return Promise.resolve();
+    if (!chartLibrary) {
+        chartLibrary = new Promise((resolve, reject) => {
+            const source = document.getElementById('chartLibrary');
+            const script = document.createElement('script');
+            if (source.textContent.trim()) {
+                // Inline scripts run as soon as they are appended
+                script.text = source.textContent;
+                document.head.appendChild(script);
+                if (window.Chart) resolve();
+                else reject(new Error('inlined Chart.js did not define Chart'));
+                return;
+            }
+            script.src = source.dataset.src;
+            script.onload = () => resolve();
+            script.onerror = () => reject(new Error(`could not fetch ${source.dataset.src}`));
+            document.head.appendChild(script);
+        }).catch(error => {
+            chartLibrary = null; // retry on the next chart tab
+            throw error;
+        });
+    }
+    return chartLibrary;
+}
+
+function withCharts(draw) {
+    loadChartLibrary().then(draw).catch(error => console.error('❌ Charts unavailable:', error));
+}
+
+function renderChannelChart() {
+    withCharts(drawChannelChart);
+}
+
+function renderPlatformChart() {
+    withCharts(drawPlatformChart);
+}
+
+const CHART_LABELS = ['Spend (₹)', 'Trials', 'CAC (₹)', 'CTR%', 'IR%', 'TR%', 'TCR%'];
+
+function chartValues(m) {
+    return [m.totalSpend, m.totalTrials, m.cac, m.ctr, m.ir, m.tr, m.tcr];
+}
+
+// Each chart is built once; later renders swap its data and update in place
+function drawBarChart(chart, canvasId, series) {
+    if (chart) {
+        series.forEach((dataset, i) => { chart.data.datasets[i].data = dataset.data; });
+        chart.update();
+        return chart;
+    }
+    return new Chart(document.getElementById(canvasId), {
+        type: 'bar',
+        data: { labels: CHART_LABELS, datasets: series },
+        options: { responsive: true, maintainAspectRatio: false, plugins: { legend: { position: 'top' } } }
+    });
+}
+
+function drawChannelChart() {
+    channelChart = drawBarChart(channelChart, 'channelChart', [
+        { label: 'Meta', data: chartValues(currentMetrics('channel', 'meta')), backgroundColor: '#3b82f6' },
+        { label: 'Google', data: chartValues(currentMetrics('channel', 'google')), backgroundColor: '#10b981' }
+    ]);
+}
+
+function drawPlatformChart() {
+    platformChart = drawBarChart(platformChart, 'platformChart', [
+        { label: 'App', data: chartValues(currentMetrics('platform', 'app')), backgroundColor: '#8b5cf6' },
+        { label: 'Web', data: chartValues(currentMetrics('platform', 'web')), backgroundColor: '#f97316' }
+    ]);
+}
+
+function renderInsights() {
+    // Evaluated at build time by insights_engine, per market and per week of it
+    const insights = (currentWeek === null ? INSIGHTS.market[currentMarket]
+        : (INSIGHTS['market,week'] || {})[`${currentMarket}|${currentWeek}`]) || [];
+    const container = document.getElementById('insightsContainer');
+
+    container.innerHTML = `
+        <div style="background: #f0fdf4; padding: 20px; border-radius: 10px; margin-bottom: 20px; border-left: 4px solid #10b981;">
+            <strong style="font-size: 16px; color: #065f46;">📊 Analysis Summary</strong><br>
+            <span style="color: #047857; font-size: 14px;">
+                Generated ${insights.length} executive insights •
+                ${insights.filter(i => i.priority === 'high').length} high priority •
+                ${insights.filter(i => i.priority === 'medium').length} medium priority •
+                ${insights.filter(i => i.priority === 'low').length} low priority
+            </span>
+        </div>
+    ` + insights.map((insight, idx) => `
+        <div class="insight-card ${insight.priority}">
+            <span class="insight-badge ${insight.priority}">${insight.priority.toUpperCase()} PRIORITY</span>
+            <div class="insight-title">${idx + 1}. ${insight.title}</div>
+            <div class="insight-analysis">${insight.analysis}</div>
+            <div class="insight-recommendation">${insight.recommendation}</div>
+            <div class="insight-impact"><strong>💼 Business Impact:</strong> ${insight.impact}</div>
+        </div>
+    `).join('');
+}
+
+// Windowed table: only the rows in view plus OVERSCAN on each side are in the
+// DOM, between two spacer rows that stand in for the rest.  Row nodes are
+// reused and filled with textContent, so scrolling and re-sorting cost the
+// same for a hundred rows or fifty thousand.
+//
+// rows: anything with .length and .at(i) (an array, SortedRows, ColumnRows)
+// columns: [{ text: row => string, wrap: 'strong' | 'span', badge: row => class
+//             of the wrapper, cellClass: row => class of the <td> }]
+const OVERSCAN = 20;
+const ESTIMATED_ROW_HEIGHT = 45;
+
+class VirtualTable {
+    constructor(tbody, columns) {
+        this.tbody = tbody;
+        this.columns = columns;
+        this.rows = [];
+        this.pool = [];
+        this.rowHeight = 0;
+        this.first = 0;
+        this.last = 0;
+        this.scheduled = false;
+        this.topSpacer = this.spacer();
+        this.bottomSpacer = this.spacer();
+        tbody.appendChild(this.topSpacer);
+        tbody.appendChild(this.bottomSpacer);
+        window.addEventListener('scroll', () => this.update(), { passive: true });
+        window.addEventListener('resize', () => this.update());
+    }
+
+    spacer() {
+        const tr = document.createElement('tr');
+        tr.className = 'table-spacer';
+        const td = document.createElement('td');
+        td.colSpan = this.columns.length;
+        tr.appendChild(td);
+        return tr;
+    }
+
+    setRows(rows) {
+        this.rows = rows;
+        this.render(true);
+    }
+
+    // Scroll and resize bursts render once per frame
+    update() {
+        if (this.scheduled) return;
+        this.scheduled = true;
+        requestAnimationFrame(() => {
+            this.scheduled = false;
+            this.render(false);
+        });
+    }
+
+    render(force) {
+        const height = this.rowHeight || ESTIMATED_ROW_HEIGHT;
+        const offset = Math.max(0, -this.tbody.getBoundingClientRect().top);
+        const visible = Math.ceil((window.innerHeight || 800) / height);
+        const first = Math.max(0, Math.floor(offset / height) - OVERSCAN);
+        const last = Math.min(this.rows.length, first + visible + 2 * OVERSCAN);
+        if (!force && first === this.first && last === this.last) return;
+        this.first = first;
+        this.last = last;
+
+        while (this.pool.length < last - first) this.pool.push(this.createRow());
+        this.pool.forEach((entry, i) => {
+            const row = first + i < this.rows.length ? this.rows.at(first + i) : null;
+            entry.tr.style.display = row ? '' : 'none';
+            if (row) this.fill(entry, row);
+        });
+        this.topSpacer.style.height = `${first * height}px`;
+        this.bottomSpacer.style.height = `${(this.rows.length - last) * height}px`;
+
+        // Measured once the table is on screen (it may start in a hidden tab)
+        if (!this.rowHeight && last > first) {
+            const measured = this.pool[0].tr.getBoundingClientRect().height;
+            if (measured) {
+                this.rowHeight = measured;
+                this.render(true);
+            }
+        }
+    }
+
+    createRow() {
+        const tr = document.createElement('tr');
+        const cells = [];
+        const targets = [];
+        this.columns.forEach(column => {
+            const td = document.createElement('td');
+            let target = td;
+            if (column.wrap) {
+                target = document.createElement(column.wrap);
+                td.appendChild(target);
+            }
+            tr.appendChild(td);
+            cells.push(td);
+            targets.push(target);
+        });
+        this.tbody.insertBefore(tr, this.bottomSpacer);
+        return { tr, cells, targets };
+    }
+
+    fill(entry, row) {
+        this.columns.forEach((column, c) => {
+            entry.targets[c].textContent = column.text(row);
+            if (column.badge) entry.targets[c].className = column.badge(row);
+            if (column.cellClass) entry.cells[c].className = column.cellClass(row);
+        });
+    }
+}
+
+// Table sorting reads rows through a permutation per column: the build-time
+// orders of the payload (registerSortOrders; a market's and each of its
+// weeks'), else one stable sort per column on first use.  Ascending has ties
+// in row order and nulls last; descending is the same order reversed, so
+// re-sorting does no comparisons.
+const TABLE_FIELDS = ['show', 'channel', 'platform', 'spend', 'trials', 'cac', 'ir', 'tr', 'tcr', 'ctr'];
+const SORT_ORDERS = new WeakMap(); // rows array -> {column index: permutation}
+const WEEK_ORDERS = new WeakMap(); // market rows -> {week: {field: permutation}}
+
+function registerSortOrders(rows, orders, weekOrders) {
+    const byColumn = {};
+    TABLE_FIELDS.forEach((field, col) => {
+        if (orders && orders[field] && orders[field].length === rows.length) byColumn[col] = orders[field];
+    });
+    SORT_ORDERS.set(rows, byColumn);
+    if (weekOrders) WEEK_ORDERS.set(rows, weekOrders);
+}
+
+function computeSortOrder(rows, field) {
+    // Without a field (e.g. the Action column) rows keep their order
+    return sortPermutation(rows.length, field ? i => rows.at(i)[field] : () => 0);
+}
+
+function sortOrder(rows, col) {
+    let orders = SORT_ORDERS.get(rows);
+    if (!orders) SORT_ORDERS.set(rows, orders = {});
+    if (!orders[col]) orders[col] = computeSortOrder(rows, TABLE_FIELDS[col]);
+    return orders[col];
+}
+
+// Rows read through a permutation; nothing is copied
+class SortedRows {
+    constructor(rows, order, ascending) {
+        this.rows = rows;
+        this.order = order;
+        this.ascending = ascending;
+        this.length = rows.length;
+    }
+
+    at(i) {
+        return this.rows.at(this.order[this.ascending ? i : this.length - 1 - i]);
+    }
+}
+
+function sortedRows(rows) {
+    return new SortedRows(rows, sortOrder(rows, currentSortCol), sortAsc);
+}
+
+// Rows of one week of a market's rows, read through their positions; built
+// once per market and week with that week's build-time orders
+class WeekRows {
+    constructor(rows, positions) {
+        this.rows = rows;
+        this.positions = positions;
+        this.length = positions.length;
+    }
+
+    at(i) {
+        return this.rows.at(this.positions[i]);
+    }
+}
+
+const WEEK_ROWS = new WeakMap(); // market rows -> Map(week -> WeekRows)
+
+function weekPositions(rows, week) {
+    const positions = [];
+    if (rows.columns) {
+        // ColumnRows: compare label codes, no row objects
+        const code = rows.labels.week.indexOf(week);
+        rows.columns.week.forEach((value, i) => { if (value === code) positions.push(i); });
+    } else {
+        for (let i = 0; i < rows.length; i++) if (rows[i].week === week) positions.push(i);
+    }
+    return positions;
+}
+
+function currentWeekRows(rows) {
+    if (currentWeek === null) return rows;
+    let weeks = WEEK_ROWS.get(rows);
+    if (!weeks) WEEK_ROWS.set(rows, weeks = new Map());
+    if (!weeks.has(currentWeek)) {
+        const positions = weekPositions(rows, currentWeek);
+        // A market of one week: the market's rows and orders are the week's
+        if (positions.length === rows.length) {
+            weeks.set(currentWeek, rows);
+        } else {
+            const view = new WeekRows(rows, positions);
+            registerSortOrders(view, (WEEK_ORDERS.get(rows) || {})[currentWeek]);
+            weeks.set(currentWeek, view);
+        }
+    }
+    return weeks.get(currentWeek);
+}
+
+// Render scheduler: state changes mark parts dirty and the next animation
+// frame draws them once, so a burst of tab, market or sort clicks costs one
+// render.  Parts that live in a tab wait until that tab is shown.
+const RENDERERS = {
+    metrics: () => renderMetrics(),
+    table: () => renderTable(),
+    channel: () => renderChannelChart(),
+    platform: () => renderPlatformChart(),
+    insights: () => renderInsights()
+};
+const TAB_PARTS = new Set(['channel', 'platform', 'insights']);
+const dirtyParts = new Set();
+let renderFrame = 0;
+
+function requestRender(...parts) {
+    parts.forEach(part => dirtyParts.add(part));
+    if (!renderFrame) renderFrame = requestAnimationFrame(flushRender);
+}
+
+function flushRender() {
+    renderFrame = 0;
+    const tab = document.querySelector('.tab-btn.active').dataset.tab;
+    dirtyParts.forEach(part => {
+        if (TAB_PARTS.has(part) && part !== tab) return;
+        dirtyParts.delete(part);
+        RENDERERS[part]();
+    });
+}
+
+function sortTable(col) {
+    if (currentSortCol === col) sortAsc = !sortAsc;
+    else { currentSortCol = col; sortAsc = false; }
+    requestRender('table');
+}
+
+document.getElementById('weekFilter').addEventListener('change', (e) => {
+    currentWeek = weekOptions[e.target.selectedIndex];
+    requestRender('metrics', 'table', 'channel', 'platform', 'insights');
+});
+
+document.querySelectorAll('.tab-btn').forEach(btn => {
+    btn.addEventListener('click', (e) => {
+        document.querySelectorAll('.tab-btn').forEach(b => b.classList.remove('active'));
+        document.querySelectorAll('.tab-content').forEach(c => c.classList.remove('active'));
+        e.target.classList.add('active');
+        const tab = e.target.dataset.tab;
+        document.getElementById('tab-' + tab).classList.add('active');
+        if (TAB_PARTS.has(tab)) requestRender(tab);
+        if (tab === 'shows') showsTable.update();
+    });
+});
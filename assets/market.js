@@ -0,0 +1,32 @@
+// Single-market page: DATA holds the market's rows
+let DATA = [];
+
+function getCurrentData() {
+    return DATA;
+}
+
+const showsTable = new VirtualTable(document.getElementById('showsTableBody'), [
+    { text: row => row.show, wrap: 'strong' },
+    { text: row => row.channel, wrap: 'span', badge: row => `channel-badge channel-${row.channel}` },
+    { text: row => row.platform },
+    { text: row => formatCurrency(row.spend) },
+    { text: row => row.trials.toLocaleString() },
+    { text: row => formatCurrency(row.cac) },
+    { text: row => formatPercent(row.ir) },
+    { text: row => formatPercent(row.tr) },
+    { text: row => formatPercent(row.tcr) },
+    { text: row => formatPercent(row.ctr) }
+]);
+
+function renderTable() {
+    showsTable.setRows(sortedRows(currentWeekRows(DATA)));
+}
+
+// Metrics come from the cube, so they render before the rows are decoded
+renderWeekOptions();
+renderMetrics();
+loadShowRows(PAYLOAD, currentMarket).then(markets => {
+    DATA = markets[currentMarket] || [];
+    renderTable();
+    console.log('✅ Dashboard loaded with', DATA.length, 'shows for', MARKET_LABEL, 'Market');
+}).catch(error => console.error('❌ Could not load the show data:', error));
@@ -0,0 +1,115 @@
+// Columnar data payload (cac_payload): string tables + one array per field
+function decodeRows(payload) {
+    const { rows, fields, labels, columns } = payload;
+    const out = new Array(rows);
+    for (let i = 0; i < rows; i++) out[i] = {};
+    // Field by field, so every row object gets its keys in the same order
+    fields.forEach(name => {
+        const column = columns[name];
+        const table = labels[name];
+        if (table) {
+            for (let i = 0; i < rows; i++) out[i][name] = table[column[i]];
+        } else {
+            for (let i = 0; i < rows; i++) out[i][name] = column[i];
+        }
+    });
+    return out;
+}
+
+// Sort orders (cac_payload orders=True): {slice: {field: Uint16Array | Uint32Array}};
+// a slice is a market ('' without a market column) or a week of one ('market|week')
+function decodeOrders(payload) {
+    const out = {};
+    Object.entries(payload.orders || {}).forEach(([slice, fields]) => {
+        out[slice] = {};
+        Object.entries(fields).forEach(([name, base64]) => {
+            const bytes = Uint8Array.from(atob(base64), c => c.charCodeAt(0));
+            // uint16 up to 65536 rows, so anything longer is uint32
+            out[slice][name] = bytes.length <= 2 * 0x10000 ? new Uint16Array(bytes.buffer) : new Uint32Array(bytes.buffer);
+        });
+    });
+    return out;
+}
+
+// {week: orders} of the weeks of one slice
+function weekOrders(orders, slice) {
+    const weeks = {};
+    Object.entries(orders).forEach(([key, fields]) => {
+        const cut = key.indexOf('|');
+        if (cut >= 0 && key.slice(0, cut) === slice) weeks[key.slice(cut + 1)] = fields;
+    });
+    return weeks;
+}
+
+// Compressed mode embeds the payload as a base64 gzip string
+async function inflatePayload(base64) {
+    const bytes = Uint8Array.from(atob(base64), c => c.charCodeAt(0));
+    const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+    return JSON.parse(await new Response(stream).text());
+}
+
+// Deploy bundles fetch one payload per market and week (deploy_bundle)
+function mergePayloads(payloads) {
+    const merged = { rows: 0, fields: payloads.length ? payloads[0].fields : [], labels: {}, columns: {}, orders: {} };
+    const index = {};
+    payloads.forEach(payload => {
+        // A shard is one week of a market: its market orders are that week's
+        const weeks = payload.labels.week;
+        if (weeks && weeks.length === 1) {
+            Object.entries(payload.orders || {}).forEach(([slice, fields]) => {
+                if (!slice.includes('|')) merged.orders[`${slice}|${weeks[0]}`] = fields;
+            });
+        }
+        Object.entries(payload.columns).forEach(([name, column]) => {
+            const out = merged.columns[name] || (merged.columns[name] = []);
+            const table = payload.labels[name];
+            if (!table) {
+                for (let i = 0; i < column.length; i++) out.push(column[i]);
+                return;
+            }
+            // Shards number their labels independently; recode into one table
+            const labels = merged.labels[name] || (merged.labels[name] = []);
+            const codes = index[name] || (index[name] = new Map());
+            const remap = table.map(label => {
+                if (!codes.has(label)) {
+                    codes.set(label, labels.length);
+                    labels.push(label);
+                }
+                return codes.get(label);
+            });
+            for (let i = 0; i < column.length; i++) out.push(remap[column[i]]);
+        });
+        merged.rows += payload.rows;
+    });
+    return merged;
+}
+
+function loadPayload(payload) {
+    if (typeof payload === 'string') return inflatePayload(payload);
+    return Promise.resolve(Array.isArray(payload) ? mergePayloads(payload) : payload);
+}
+
+// Ascending permutation of value(i), i < n: missing values (null/NaN) last,
+// ties in index order -- the order cac_payload.sort_order() builds
+function sortPermutation(n, value) {
+    const order = new Uint32Array(n);
+    for (let i = 0; i < n; i++) order[i] = i;
+    return order.sort((a, b) => {
+        const x = value(a);
+        const y = value(b);
+        const xMissing = x == null || x !== x;
+        const yMissing = y == null || y !== y;
+        if (xMissing || yMissing) return (xMissing - yMissing) || a - b;
+        return x < y ? -1 : x > y ? 1 : a - b;
+    });
+}
+
+function decodeByMarket(payload) {
+    const rows = decodeRows(payload);
+    const names = payload.labels.market;
+    const codes = payload.columns.market;
+    const markets = {};
+    names.forEach(name => { markets[name] = []; });
+    rows.forEach((row, i) => markets[names[codes[i]]].push(row));
+    return markets;
+}
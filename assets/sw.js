@@ -0,0 +1,55 @@
+// Service worker of the deploy bundle (deploy_bundle).  Content-hashed files
+// never change, so they come from the cache and are fetched once; the shells
+// and manifest.json go to the network first and fall back to the cache offline.
+const CACHE_NAME = 'stage-dashboards';
+const HASHED = /\.[0-9a-f]{12}\.(js|json)$/;
+
+self.addEventListener('install', () => self.skipWaiting());
+self.addEventListener('activate', event => event.waitUntil(self.clients.claim()));
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    const url = new URL(request.url);
+    if (request.method !== 'GET' || url.origin !== self.location.origin) return;
+    event.respondWith(HASHED.test(url.pathname) ? cacheFirst(request) : networkFirst(request));
+});
+
+async function cacheFirst(request) {
+    const cache = await caches.open(CACHE_NAME);
+    const cached = await cache.match(request);
+    if (cached) return cached;
+    const response = await fetch(request);
+    if (response.ok) await cache.put(request, response.clone());
+    return response;
+}
+
+async function networkFirst(request) {
+    const cache = await caches.open(CACHE_NAME);
+    try {
+        const response = await fetch(request);
+        if (response.ok) {
+            await cache.put(request, response.clone());
+            if (new URL(request.url).pathname.endsWith('/manifest.json')) {
+                await prune(cache, await response.clone().json());
+            }
+        }
+        return response;
+    } catch (error) {
+        const cached = await cache.match(request, { ignoreSearch: true });
+        if (cached) return cached;
+        throw error;
+    }
+}
+
+// Drops cached data files the current manifest no longer lists
+async function prune(cache, manifest) {
+    const live = new Set();
+    const keep = file => live.add(new URL(file, self.registration.scope).href);
+    Object.values(manifest.markets).forEach(market => market.weeks.forEach(week => keep(week.file)));
+    Object.values(manifest.pages).forEach(page => { keep(page.cube); keep(page.rankings); keep(page.insights); });
+    const requests = await cache.keys();
+    await Promise.all(requests
+        .filter(request => HASHED.test(request.url) && new URL(request.url).pathname.includes('/data/')
+            && !live.has(request.url))
+        .map(request => cache.delete(request)));
+}
@@ -0,0 +1,118 @@
+// Multi-market page: ALL_MARKETS_DATA holds every market's rows
+let ALL_MARKETS_DATA = {};
+
+const MARKET_CODES = {
+    'gujarati': 'GJ',
+    'haryanvi': 'HR',
+    'rajasthani': 'RJ',
+    'bhojpuri': 'BH'
+};
+
+function getCurrentData() {
+    return ALL_MARKETS_DATA[currentMarket] || [];
+}
+
+function switchMarket(market) {
+    currentMarket = market;
+    const marketDisplay = market.charAt(0).toUpperCase() + market.slice(1);
+    const marketCode = MARKET_CODES[market] || market.substring(0, 2).toUpperCase();
+    document.getElementById('marketSubtitle').textContent = `${marketDisplay} (${marketCode}) Market • Data Pre-Loaded ✅`;
+    document.getElementById('showCount').textContent = getCurrentData().length;
+
+    // Update UI
+    renderWeekOptions();
+    renderAll();
+
+    console.log(`✅ Switched to ${marketDisplay} market (${getCurrentData().length} shows)`);
+}
+
+function renderAll() {
+    // Charts and insights of hidden tabs draw when their tab is opened
+    requestRender('metrics', 'table', 'channel', 'platform', 'insights');
+}
+
+function getMetricClass(metric, value) {
+    if (value == null) return '';
+    if (metric === 'cac') {
+        if (value < 250) return 'metric-healthy';
+        if (value < 350) return 'metric-warning';
+        return 'metric-critical';
+    }
+    if (metric === 'tcr') {
+        if (value < 30) return 'metric-healthy';
+        if (value < 40) return 'metric-warning';
+        return 'metric-critical';
+    }
+    if (metric === 'ctr') {
+        if (value > 0.75) return 'metric-healthy';
+        if (value > 0.5) return 'metric-warning';
+        return 'metric-critical';
+    }
+    if (metric === 'ir') {
+        return value >= 10 ? 'metric-healthy' : 'metric-critical';
+    }
+    if (metric === 'tr') {
+        return value >= 20 ? 'metric-healthy' : 'metric-critical';
+    }
+    return '';
+}
+
+function getActionInsight(row) {
+    // Scale: Good CAC, good volume, good retention
+    if (row.cac != null && row.cac < 250 && row.trials > 100 && row.tcr != null && row.tcr < 30) {
+        return { text: 'Scale', class: 'action-scale' };
+    }
+
+    // Kill: Very poor performance
+    if (row.cac > 400 || (row.trials > 50 && row.tcr > 40)) {
+        return { text: 'Kill', class: 'action-kill' };
+    }
+
+    // Optimize: Needs improvement
+    if ((row.cac >= 250 && row.cac <= 400) || (row.tcr >= 30 && row.tcr <= 40)) {
+        return { text: 'Optimize', class: 'action-optimize' };
+    }
+
+    // Monitor: Too early to judge
+    if (row.trials < 50) {
+        return { text: 'Monitor', class: 'action-monitor' };
+    }
+
+    // Default
+    return { text: 'Monitor', class: 'action-monitor' };
+}
+
+const showsTable = new VirtualTable(document.getElementById('showsTableBody'), [
+    { text: row => row.show, wrap: 'strong' },
+    { text: row => row.channel, wrap: 'span', badge: row => `channel-badge channel-${row.channel}` },
+    { text: row => row.platform, wrap: 'span', badge: row => `platform-badge platform-${row.platform}` },
+    { text: row => formatCurrency(row.spend) },
+    { text: row => row.trials.toLocaleString() },
+    { text: row => formatCurrency(row.cac), cellClass: row => getMetricClass('cac', row.cac) },
+    { text: row => formatPercent(row.ir), cellClass: row => getMetricClass('ir', row.ir) },
+    { text: row => formatPercent(row.tr), cellClass: row => getMetricClass('tr', row.tr) },
+    { text: row => formatPercent(row.tcr), cellClass: row => getMetricClass('tcr', row.tcr) },
+    { text: row => formatPercent(row.ctr), cellClass: row => getMetricClass('ctr', row.ctr) },
+    { text: row => getActionInsight(row).text, wrap: 'span', badge: row => `action-badge ${getActionInsight(row).class}` }
+]);
+
+function renderTable() {
+    showsTable.setRows(sortedRows(currentWeekRows(getCurrentData())));
+}
+
+document.querySelectorAll('.market-btn').forEach(btn => {
+    btn.addEventListener('click', (e) => {
+        document.querySelectorAll('.market-btn').forEach(b => b.classList.remove('active'));
+        e.target.classList.add('active');
+        switchMarket(e.target.dataset.market);
+    });
+});
+
+// Initialize: metrics come from the cube, so they render before the rows are decoded
+renderWeekOptions();
+renderMetrics();
+loadShowRows(PAYLOAD, currentMarket).then(markets => {
+    ALL_MARKETS_DATA = markets;
+    switchMarket(currentMarket);
+    console.log('✅ Multi-market dashboard loaded with', Object.keys(ALL_MARKETS_DATA).length, 'markets');
+}).catch(error => console.error('❌ Could not load the show data:', error));
@@ -0,0 +1,58 @@
+// Compute worker, started by assets/compute.js with payload.js ahead of it.
+// One message {payload, market} in; one {result: {market: slice}} out, where a
+// slice is {rows, fields, labels, columns, orders, weekOrders}: text columns as
+// Uint32Array label codes, measures as Float64Array (NaN for missing), one
+// ascending Uint32Array permutation per field, and the build-time orders of
+// each week ({week: {field: Uint32Array}}).  Every buffer is transferred.
+function splitColumns(payload, market) {
+    const { fields, labels, columns } = payload;
+    const orders = decodeOrders(payload);
+    const groups = {};
+    if (columns.market) {
+        labels.market.forEach(name => { groups[name] = []; });
+        columns.market.forEach((code, i) => groups[labels.market[code]].push(i));
+    } else {
+        groups[market] = Array.from({ length: payload.rows }, (_, i) => i);
+    }
+
+    const slices = {};
+    Object.entries(groups).forEach(([name, indices]) => {
+        const slice = { rows: indices.length, fields, labels: {}, columns: {}, orders: {}, weekOrders: {} };
+        fields.forEach(field => {
+            const source = columns[field];
+            const table = labels[field];
+            const column = table ? new Uint32Array(indices.length) : new Float64Array(indices.length);
+            indices.forEach((row, i) => {
+                const value = source[row];
+                column[i] = value == null ? NaN : value;
+            });
+            slice.columns[field] = column;
+            if (table) slice.labels[field] = table;
+
+            const stored = (orders[name] || orders[''] || {})[field];
+            slice.orders[field] = stored && stored.length === indices.length
+                ? Uint32Array.from(stored)
+                : sortPermutation(indices.length, table ? i => table[column[i]] : i => column[i]);
+        });
+        Object.entries(weekOrders(orders, columns.market ? name : '')).forEach(([week, stored]) => {
+            slice.weekOrders[week] = {};
+            Object.entries(stored).forEach(([field, order]) => { slice.weekOrders[week][field] = Uint32Array.from(order); });
+        });
+        slices[name] = slice;
+    });
+    return slices;
+}
+
+self.onmessage = event => {
+    const { payload, market } = event.data;
+    loadPayload(payload).then(data => {
+        const slices = splitColumns(data, market);
+        const transfer = [];
+        Object.values(slices).forEach(slice => {
+            Object.values(slice.columns).forEach(column => transfer.push(column.buffer));
+            Object.values(slice.orders).forEach(order => transfer.push(order.buffer));
+            Object.values(slice.weekOrders).forEach(week => Object.values(week).forEach(order => transfer.push(order.buffer)));
+        });
+        self.postMessage({ result: slices }, transfer);
+    }).catch(error => self.postMessage({ error: String(error) }));
+};
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+STAGE Budget Solver
+Trial-maximizing split of a spend budget across show x channel x platform cells.
+
+Each cell gets a diminishing-returns response curve fitted to its
+week-over-week history:
+
+    trials = a * spend ** b        (0 < b < 1; least squares in log-log space)
+
+Cells with a single week fall back to DEFAULT_ELASTICITY through their one
+point.  The budget is then handed out in small increments, always to the cell
+whose next increment buys the most trials (a max-heap of marginal gains).
+Because every curve is concave this greedy split is optimal up to the
+increment size.  A cell stops receiving budget where its planned average CAC
+reaches the ceiling (DEFAULT_CAC_CEILING unless --ceiling is given) or at
+MAX_SCALE x the most it has ever spent, so the curves are never extrapolated
+far past the data.
+
+A cell's current spend is its spend in the latest week it has data for, since
+the exports of one market need not cover the same weeks.
+
+Usage: python3 budget_solver.py [market ...] [--budget RUPEES] [--ceiling CAC]
+"""
+
+import heapq
+import json
+import math
+import sys
+import time
+
+# Elasticity used when a cell's history cannot support a fit
+DEFAULT_ELASTICITY = 0.7
+
+# Fitted elasticities are clamped to this range
+MIN_ELASTICITY = 0.2
+MAX_ELASTICITY = 0.95
+
+# A cell is never planned above this multiple of its highest observed spend
+MAX_SCALE = 2.0
+
+# Average CAC a cell may be planned up to (1.5x the ₹250 target)
+DEFAULT_CAC_CEILING = 375
+
+# Budget increments handed out per solve (at least this many, more for big grids)
+MIN_STEPS = 1000
+
+CELL_DIMENSIONS = ('show', 'channel', 'platform')
+
+
+class Curve:
+    """Fitted spend -> trials response of one cell"""
+
+    __slots__ = ('key', 'a', 'b', 'points', 'fitted', 'max_spend', 'spend', 'trials')
+
+    def __init__(self, key, a, b, points, fitted, max_spend, spend, trials):
+        self.key = key
+        self.a = a
+        self.b = b
+        self.points = points        # weeks with spend and trials
+        self.fitted = fitted        # False when b is the default elasticity
+        self.max_spend = max_spend
+        self.spend = spend          # spend in the current (latest) week
+        self.trials = trials
+
+    def predict(self, spend):
+        return self.a * spend ** self.b if spend > 0 else 0.0
+
+    def cap(self, cac_ceiling=None):
+        """Highest spend the solver may plan for this cell"""
+        limit = MAX_SCALE * self.max_spend
+        if self.a <= 0 or limit <= 0:
+            return 0.0
+        if cac_ceiling:
+            # spend / trials <= ceiling  <=>  spend <= (a * ceiling) ** (1 / (1 - b)),
+            # compared in log space since the power overflows for b near 1
+            exponent = math.log(self.a * cac_ceiling) / (1 - self.b)
+            if exponent < math.log(limit):
+                limit = math.exp(exponent)
+        return limit
+
+    def __repr__(self):
+        return f"Curve({'/'.join(self.key)}, a={self.a:.4g}, b={self.b:.3f}, points={self.points})"
+
+
+def fit_curve(key, history, spend=0.0, trials=0.0):
+    """Power-law fit of (spend, trials) weekly points; `spend`/`trials` are the current week"""
+    points = [(math.log(s), math.log(t)) for s, t in history if s > 0 and t > 0]
+    max_spend = max((s for s, _ in history), default=0.0)
+    if not points:
+        return Curve(key, 0.0, DEFAULT_ELASTICITY, 0, False, max_spend, spend, trials)
+
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    fitted = n >= 2 and var_x > 1e-6
+    if fitted:
+        b = sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+        b = min(MAX_ELASTICITY, max(MIN_ELASTICITY, b))
+    else:
+        b = DEFAULT_ELASTICITY
+    a = math.exp(mean_y - b * mean_x)
+    return Curve(key, a, b, n, fitted, max_spend, spend, trials)
+
+
+def fit_curves(data, dims=CELL_DIMENSIONS):
+    """Curves of every cell of a dataset, using its weeks as the history"""
+    spend, trials = data.column('spend'), data.column('trials')
+    columns = [data.codes(name) for name in dims]
+    weeks = data.codes('week')
+    week_labels = data.labels('week')
+
+    # One pass: cell codes -> week code -> [spend, trials]
+    cells = {}
+    for i in range(len(data)):
+        key = tuple(column[i] for column in columns)
+        by_week = cells.get(key)
+        if by_week is None:
+            by_week = cells[key] = {}
+        totals = by_week.get(weeks[i])
+        if totals is None:
+            by_week[weeks[i]] = [spend[i], trials[i]]
+        else:
+            totals[0] += spend[i]
+            totals[1] += trials[i]
+
+    labels = [data.labels(name) for name in dims]
+    curves = []
+    for key, by_week in cells.items():
+        # The cell's own latest week; another export may run a week further
+        current = by_week[max(by_week, key=week_labels.__getitem__)]
+        curves.append(fit_curve(tuple(names[code] for names, code in zip(labels, key)),
+                                list(by_week.values()), *current))
+    return curves
+
+
+def solve(curves, budget, cac_ceiling=DEFAULT_CAC_CEILING, steps=None):
+    """
+    Greedy marginal allocation of `budget`; returns a plan dict:
+
+        {'budget', 'allocated', 'trials', 'cac', 'current_trials', 'cells': [...]}
+
+    Cells are listed by planned spend, largest first.
+    """
+    steps = steps or max(MIN_STEPS, 4 * len(curves))
+    step = budget / steps if budget > 0 else 0.0
+    caps = [curve.cap(cac_ceiling) for curve in curves]
+    spend = [0.0] * len(curves)
+    gained = [0.0] * len(curves)
+
+    def next_gain(i):
+        amount = min(step, caps[i] - spend[i])
+        if amount <= 0:
+            return 0.0, 0.0
+        return curves[i].predict(spend[i] + amount) - gained[i], amount
+
+    heap = []
+    for i in range(len(curves)):
+        gain, amount = next_gain(i)
+        if gain > 0:
+            heap.append((-gain / amount, i))
+    heapq.heapify(heap)
+
+    remaining = budget
+    while heap and remaining > 1e-9:
+        _, i = heapq.heappop(heap)
+        amount = min(step, caps[i] - spend[i], remaining)
+        spend[i] += amount
+        gained[i] = curves[i].predict(spend[i])
+        remaining -= amount
+        gain, amount = next_gain(i)
+        if gain > 0:
+            heapq.heappush(heap, (-gain / amount, i))
+
+    cells = []
+    for curve, planned, trials in zip(curves, spend, gained):
+        if planned <= 0 and curve.spend <= 0:
+            continue
+        cells.append({
+            'key': list(curve.key),
+            'current_spend': curve.spend,
+            'spend': planned,
+            'current_trials': curve.predict(curve.spend),
+            'trials': trials,
+            'elasticity': curve.b,
+            'fitted': curve.fitted,
+        })
+    cells.sort(key=lambda cell: -cell['spend'])
+
+    allocated = budget - remaining
+    total_trials = sum(gained)
+    return {
+        'budget': budget,
+        'allocated': allocated,
+        'trials': total_trials,
+        'cac': allocated / total_trials if total_trials > 0 else 0,
+        'current_trials': sum(curve.predict(curve.spend) for curve in curves),
+        'cac_ceiling': cac_ceiling,
+        'cells': cells,
+    }
+
+
+def plan_dataset(data, budget=None, cac_ceiling=DEFAULT_CAC_CEILING):
+    """Fit and solve for one dataset; the budget defaults to the cells' current spend"""
+    curves = fit_curves(data)
+    if budget is None:
+        budget = sum(curve.spend for curve in curves)
+    return solve(curves, budget, cac_ceiling)
+
+
+def split_by(plan, dim_index):
+    """Planned and current spend per value of one cell dimension (0 show, 1 channel, 2 platform)"""
+    split = {}
+    for cell in plan['cells']:
+        name = cell['key'][dim_index]
+        planned, current = split.get(name, (0.0, 0.0))
+        split[name] = (planned + cell['spend'], current + cell['current_spend'])
+    return split
+
+
+def plan_json(plan):
+    """Compact JSON of a plan for embedding in a page"""
+    return json.dumps(plan, ensure_ascii=False, separators=(',', ':'))
+
+
+def _arg_value(argv, flag):
+    if flag in argv:
+        i = argv.index(flag)
+        try:
+            return float(argv[i + 1])
+        except (IndexError, ValueError):
+            print(f"⚠️ Ignoring invalid {flag} value")
+    return None
+
+
+def main():
+    from history_store import HistoryStore, sync_markets
+
+    argv = sys.argv[1:]
+    budget = _arg_value(argv, '--budget')
+    ceiling = _arg_value(argv, '--ceiling') or DEFAULT_CAC_CEILING
+    skip = {i + 1 for i, arg in enumerate(argv) if arg in ('--budget', '--ceiling')}
+    markets = [arg.lower() for i, arg in enumerate(argv) if not arg.startswith('-') and i not in skip]
+
+    print("=" * 60)
+    print("📊 STAGE Budget Solver")
+    print("=" * 60)
+
+    with HistoryStore() as store:
+        sync_markets(store, markets or None)
+        for market in store.markets():
+            if markets and market not in markets:
+                continue
+            data = store.load_dataset(market)
+            started = time.perf_counter()
+            plan = plan_dataset(data, budget, ceiling)
+            elapsed = (time.perf_counter() - started) * 1000
+
+            print(f"\n📄 {market.capitalize()}: {len(plan['cells'])} cells solved in {elapsed:.1f} ms")
+            print(f"   Budget ₹{plan['budget']:,.0f} (₹{plan['allocated']:,.0f} placed under ₹{ceiling:.0f} CAC)")
+            print(f"   Trials {plan['current_trials']:,.0f} → {plan['trials']:,.0f} "
+                  f"(CAC ₹{plan['cac']:.0f})")
+            for name, (planned, current) in sorted(split_by(plan, 1).items()):
+                print(f"   ✓ {name}: ₹{current:,.0f} → ₹{planned:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+STAGE Dashboard Build
+One command for every generated page, rebuilding only what is stale.
+
+The build is a small dependency graph:
+
+    exports of a market ──> dataset:<market> ──> dashboard_<market>.html
+    GJ exports ──> dataset:gujarati ──> dashboard_generated.html
+    every dataset ──> dashboard_unified.html
+
+Every node gets a content key: a hash of its inputs (export content hashes,
+the generator code and template assets it uses, and the keys of the nodes it
+depends on).  A page
+is rebuilt only when its key changed or the file on disk is missing or was
+edited.  Stale market pages are built in parallel, and every output is written
+atomically.  Keys live in .cache/build-state.json.
+
+Every page also gets precompressed .gz (and, with the brotli module, .br)
+siblings for static hosts that serve them directly.  --compress embeds the
+page data gzipped, inflated in the browser (see cac_payload).  --vendor
+downloads Chart.js into assets/vendor first, so pages carry it inline;
+without it the build stops, unless --cdn (STAGE_CHART_CDN=1) links the CDN
+build instead.
+
+Usage: python3 build_dashboards.py [market ...] [--workers N] [--force] [--compress] [--vendor | --cdn]
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from dashboard_template import CHART_JS, asset_names, chart_library, vendor_chart_library
+from generate_dashboard import GENERATED_MARKET
+from ingest import MARKET_FOLDERS, find_exports, ingest_folder, parse_workers_arg
+from parse_cache import PARSER_SOURCES, atomic_write, default_cache, file_digest
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BASE_PATH = Path(__file__).parent
+STATE_FILE = BASE_PATH / '.cache' / 'build-state.json'
+
+# Code each kind of node runs; editing any of these invalidates the node
+DATA_SOURCES = PARSER_SOURCES + ('parse_cache.py',)
+PAGE_SOURCES = ('cac_cube.py', 'cac_metrics.py', 'cac_rankings.py', 'insights_engine.py',
+                'budget_solver.py', 'anomaly_detector.py', 'cac_payload.py', 'dashboard_template.py')
+PAGE_SOURCES += tuple(f"assets/{name}" for name in asset_names()) + (f"assets/{CHART_JS}",)
+GENERATED_SOURCES = ('generate_dashboard.py',) + PAGE_SOURCES
+MARKET_SOURCES = ('generate_market_dashboard.py',) + PAGE_SOURCES
+UNIFIED_SOURCES = ('create_unified_dashboard.py',) + PAGE_SOURCES
+
+
+def _digest(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class Node:
+    """One build step: a content key and, for pages, the file it writes"""
+
+    __slots__ = ('name', 'key', 'output', 'deps')
+
+    def __init__(self, name, inputs, deps=(), output=None):
+        self.name = name
+        self.deps = tuple(deps)
+        self.output = output
+        self.key = _digest(name, *inputs, *(dep.key for dep in self.deps))
+
+    def __repr__(self):
+        return f"Node({self.name!r}, key={self.key[:12]})"
+
+
+class BuildGraph:
+    """Nodes of one build, keyed from the current inputs on disk"""
+
+    def __init__(self, base_path=BASE_PATH, markets=None, compress=False):
+        self.base_path = Path(base_path)
+        self._sources = {}
+        self.datasets = {}
+        self.pages = {}
+        self.market_pages = {}  # page name -> market
+
+        cache = default_cache()
+        for market, folder in MARKET_FOLDERS.items():
+            folder_path = self.base_path / folder
+            exports = find_exports(folder_path) if folder_path.exists() else []
+            if exports:
+                # Stat records make this a hash lookup for unchanged files
+                inputs = [f"{path.name}:{cache.content_hash(path)}" for path in exports]
+                self.datasets[market] = Node(f"dataset:{market}",
+                                             [self.source_hash(DATA_SOURCES)] + inputs)
+
+        if GENERATED_MARKET in self.datasets and (not markets or GENERATED_MARKET in markets):
+            self.pages['dashboard_generated.html'] = Node(
+                'dashboard_generated.html', [self.source_hash(GENERATED_SOURCES), compress],
+                [self.datasets[GENERATED_MARKET]], self.base_path / 'dashboard_generated.html')
+
+        for market, dataset in self.datasets.items():
+            if markets and market not in markets:
+                continue
+            name = f"dashboard_{market}.html"
+            self.pages[name] = Node(name, [self.source_hash(MARKET_SOURCES), compress], [dataset],
+                                    self.base_path / name)
+            self.market_pages[name] = market
+
+        if self.datasets and not markets:
+            self.pages['dashboard_unified.html'] = Node(
+                'dashboard_unified.html', [self.source_hash(UNIFIED_SOURCES), compress],
+                self.datasets.values(), self.base_path / 'dashboard_unified.html')
+
+    def source_hash(self, names):
+        key = tuple(names)
+        if key not in self._sources:
+            self._sources[key] = _digest(*(file_digest(self.base_path / name)
+                                           if (self.base_path / name).exists() else name
+                                           for name in names))
+        return self._sources[key]
+
+    def stale(self, state, force=False):
+        """Pages whose key changed or whose output is missing or was edited"""
+        stale = []
+        for name, node in self.pages.items():
+            record = state.get(name)
+            if (force or record is None or record.get('key') != node.key
+                    or not node.output.exists() or file_digest(node.output) != record.get('output')
+                    or not all(path.exists() for path in compressed_siblings(node.output))):
+                stale.append(name)
+        return stale
+
+
+def load_state(path=STATE_FILE):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state, path=STATE_FILE):
+    atomic_write(path, json.dumps(state, indent=2, sort_keys=True).encode('utf-8'))
+
+
+def compressed_siblings(path):
+    """Precompressed copies written next to a page"""
+    path = Path(path)
+    siblings = [path.with_name(path.name + '.gz')]
+    if brotli is not None:
+        siblings.append(path.with_name(path.name + '.br'))
+    return siblings
+
+
+def write_page(path, html):
+    """Write a page and its precompressed siblings atomically"""
+    data = html.encode('utf-8')
+    atomic_write(path, data)
+    for sibling in compressed_siblings(path):
+        if sibling.suffix == '.gz':
+            packed = gzip.compress(data, compresslevel=9, mtime=0)
+        else:
+            packed = brotli.compress(data, quality=11)
+        atomic_write(sibling, packed)
+    return path
+
+
+def _market_dataset(base_path, market):
+    # Parse-cache hits for unchanged exports; one process is enough here
+    return ingest_folder(Path(base_path) / MARKET_FOLDERS[market], market, workers=1).dataset
+
+
+def _build_generated(base_path, output, compress=False):
+    from generate_dashboard import generate_dashboard_html
+
+    html = generate_dashboard_html(_market_dataset(base_path, GENERATED_MARKET), compress)
+    return write_page(output, html)
+
+
+def _build_market(base_path, market, output, compress=False):
+    from generate_market_dashboard import generate_dashboard_html
+
+    html = generate_dashboard_html(_market_dataset(base_path, market), market, compress)
+    return write_page(output, html)
+
+
+def _build_unified(base_path, markets, output, compress=False):
+    from create_unified_dashboard import generate_unified_html
+
+    html = generate_unified_html({market: _market_dataset(base_path, market) for market in markets},
+                                 compress)
+    return write_page(output, html)
+
+
+def build(base_path=BASE_PATH, markets=None, workers=None, force=False, state_file=STATE_FILE,
+          compress=False):
+    """Rebuild the stale pages; returns (built page names, skipped page names)"""
+    graph = BuildGraph(base_path, markets, compress)
+    state = load_state(state_file)
+    stale = graph.stale(state, force)
+    base_path = str(graph.base_path)
+
+    def done(name):
+        node = graph.pages[name]
+        state[name] = {'key': node.key, 'output': file_digest(node.output), 'built_at': time.time()}
+
+    try:
+        if 'dashboard_generated.html' in stale:
+            _build_generated(base_path, graph.pages['dashboard_generated.html'].output, compress)
+            done('dashboard_generated.html')
+
+        market_pages = [name for name in stale if name in graph.market_pages]
+        jobs = [(base_path, graph.market_pages[name], graph.pages[name].output, compress)
+                for name in market_pages]
+        workers = workers or min(len(jobs), os.cpu_count() or 1)
+        if workers <= 1 or len(jobs) <= 1:
+            for name, job in zip(market_pages, jobs):
+                _build_market(*job)
+                done(name)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_build_market, *job) for job in jobs]
+                for name, future in zip(market_pages, futures):
+                    future.result()
+                    done(name)
+
+        if 'dashboard_unified.html' in stale:
+            _build_unified(base_path, list(graph.datasets),
+                           graph.pages['dashboard_unified.html'].output, compress)
+            done('dashboard_unified.html')
+    finally:
+        # Keep what did get built even if a later page failed
+        if stale:
+            save_state(state, state_file)
+    skipped = [name for name in graph.pages if name not in stale]
+    return stale, skipped
+
+
+def main():
+    argv = sys.argv[1:]
+    workers = parse_workers_arg(argv)
+    force = '--force' in argv
+    skip = {i + 1 for i, arg in enumerate(argv) if arg in ('--workers', '-j')}
+    markets = [arg.lower() for i, arg in enumerate(argv) if not arg.startswith('-') and i not in skip]
+
+    unknown = [market for market in markets if market not in MARKET_FOLDERS]
+    if unknown:
+        print(f"❌ Unknown market: {', '.join(unknown)}")
+        print(f"Available markets: {', '.join(MARKET_FOLDERS)}")
+        sys.exit(1)
+
+    if '--vendor' in argv:
+        try:
+            print(f"   ✓ Vendored {vendor_chart_library().relative_to(BASE_PATH)}")
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not vendor Chart.js: {e}")
+            sys.exit(1)
+    if '--cdn' in argv:
+        os.environ['STAGE_CHART_CDN'] = '1'
+    try:
+        chart_library()
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    built, skipped = build(markets=markets or None, workers=workers, force=force,
+                           compress='--compress' in argv)
+
+    for name in built:
+        print(f"   ✓ Built {name}")
+    for name in skipped:
+        print(f"   ✓ Up to date: {name}")
+    if not built and not skipped:
+        print("❌ No market data found!")
+        sys.exit(1)
+    print(f"\n✅ Build finished in {time.perf_counter() - started:.2f}s "
+          f"({len(built)} built, {len(skipped)} up to date)")
+
+
+if __name__ == "__main__":
+    main()
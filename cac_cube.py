@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+STAGE Metrics Cube
+Additive rollups of a ShowDataset, precomputed for the dashboards.
+
+Every blended metric is a ratio of two sums (see cac_metrics), so each
+cube cell stores only the sums and any rollup turns into metrics with one
+division.
+
+The embedded form is compact JSON: dimension labels once, then per rollup
+a list of label-code keys and the matching sum vectors.  The pages index it
+once on load (assets/cube.js), so tab and market switches are lookups
+instead of scans.
+"""
+
+import json
+
+from cac_metrics import SUMS, GroupedMetrics, metrics_from_sums
+
+# Dimensions of the base cuboid (market x week x channel x platform x show)
+CUBE_DIMENSIONS = ('market', 'week', 'channel', 'platform', 'show')
+
+# Rollups the dashboards read
+DEFAULT_ROLLUPS = (
+    ('market',),
+    ('market', 'channel'),
+    ('market', 'platform'),
+    ('market', 'week'),
+    ('market', 'week', 'channel'),
+    ('market', 'week', 'platform'),
+    ('market', 'week', 'channel', 'platform'),
+    ('market', 'show'),
+)
+
+
+def _compact(value):
+    # Integral sums (spend, trials) print without a trailing '.0'
+    return int(value) if value == int(value) and abs(value) < 2 ** 53 else round(value, 6)
+
+
+def build_cube(data, rollups=DEFAULT_ROLLUPS):
+    """
+    Rollups of a dataset as a JSON-ready dict:
+
+        {'dims': [...], 'labels': {dim: [...]}, 'sums': [...],
+         'rollups': {'market,channel': {'keys': [[0, 1], ...], 'values': [[...], ...]}}}
+    """
+    cells = {}
+    for rollup in rollups:
+        codes = [{label: code for code, label in enumerate(data.labels(dim))} for dim in rollup]
+        cells[rollup] = {
+            tuple(code_of[label] for code_of, label in zip(codes, key)): sums
+            for key, sums in GroupedMetrics.of(data, *rollup).items()
+        }
+
+    return {
+        'dims': list(CUBE_DIMENSIONS),
+        'labels': {dim: list(data.labels(dim)) for dim in CUBE_DIMENSIONS},
+        'sums': list(SUMS),
+        'rollups': {
+            ','.join(rollup): {
+                'keys': [list(key) for key in table],
+                'values': [[_compact(v) for v in cell] for cell in table.values()],
+            }
+            for rollup, table in cells.items()
+        },
+    }
+
+
+def cube_json(data, rollups=DEFAULT_ROLLUPS):
+    """Compact JSON of build_cube() for embedding in a page"""
+    return json.dumps(build_cube(data, rollups), ensure_ascii=False, separators=(',', ':'))
+
+
+def lookup(cube, rollup, *values):
+    """Metrics of one cell of a built cube, e.g. lookup(cube, 'market,channel', 'gujarati', 'meta')"""
+    dims = rollup.split(',')
+    labels = [cube['labels'][dim] for dim in dims]
+    table = cube['rollups'][rollup]
+    for key, sums in zip(table['keys'], table['values']):
+        if all(names[code] == value for names, code, value in zip(labels, key, values)):
+            return metrics_from_sums(sums)
+    return metrics_from_sums([0] * len(SUMS))
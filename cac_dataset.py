@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+STAGE Show Dataset
+Compact columnar storage for parsed show records.
+
+Measures live in typed arrays (array('d')), and the text dimensions
+(market/section/week/show/channel/platform) are dictionary-encoded as small
+integer codes.  One row costs ~100 bytes instead of a 10-key dict.  When NumPy
+is installed, `column()` returns zero-copy ndarray views over the same buffers.
+
+Missing rate metrics are stored as NaN and exported to JSON as null.
+"""
+
+import json
+import struct
+from array import array
+
+from cac_numbers import MISSING
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DIMENSIONS = ('market', 'section', 'week', 'show', 'channel', 'platform')
+MEASURES = ('spend', 'trials', 'cac', 'ir', 'tr', 'tcr', 'ctr')
+
+# Field order of the JSON records embedded in the dashboards
+RECORD_FIELDS = ('show', 'channel', 'platform', 'spend', 'trials', 'cac', 'ir', 'tr', 'tcr', 'ctr')
+
+# Shows can run into the thousands once adsets are loaded; the rest stay tiny
+_CODE_TYPES = {'show': 'I'}
+
+# to_bytes() layout: magic, JSON header length, JSON header, raw column buffers
+_MAGIC = b'SDS1'
+_HEADER = struct.Struct('<4sI')
+
+
+class StringTable:
+    """Dictionary encoding: string <-> small integer code"""
+
+    __slots__ = ('values', '_codes')
+
+    def __init__(self, values=()):
+        self.values = []
+        self._codes = {}
+        for value in values:
+            self.encode(value)
+
+    def encode(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def code(self, value):
+        """Code of an existing value, or None"""
+        return self._codes.get(value)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, code):
+        return self.values[code]
+
+
+class ShowRow:
+    """Read-only view of one dataset row"""
+
+    __slots__ = ('_data', '_i')
+
+    def __init__(self, data, i):
+        self._data = data
+        self._i = i
+
+    def to_record(self, fields=RECORD_FIELDS):
+        record = {}
+        for name in fields:
+            value = getattr(self, name)
+            # NaN marks a missing metric; JSON has no NaN, so emit null
+            record[name] = None if value != value else value
+        return record
+
+    def __repr__(self):
+        return f"ShowRow({self.to_record()!r})"
+
+
+def _dimension_property(name):
+    def getter(self):
+        data = self._data
+        return data._tables[name].values[data._codes[name][self._i]]
+    return property(getter)
+
+
+def _measure_property(name):
+    if name == 'trials':
+        def getter(self):
+            return int(self._data._measures[name][self._i])
+    else:
+        def getter(self):
+            return self._data._measures[name][self._i]
+    return property(getter)
+
+
+for _name in DIMENSIONS:
+    setattr(ShowRow, _name, _dimension_property(_name))
+for _name in MEASURES:
+    setattr(ShowRow, _name, _measure_property(_name))
+
+
+class ShowDataset:
+    """Columnar table of show metrics with dictionary-encoded dimensions"""
+
+    __slots__ = ('_tables', '_codes', '_measures')
+
+    def __init__(self):
+        self._tables = {name: StringTable() for name in DIMENSIONS}
+        self._codes = {name: array(_CODE_TYPES.get(name, 'H')) for name in DIMENSIONS}
+        self._measures = {name: array('d') for name in MEASURES}
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def append(self, show, channel, platform, spend, trials, cac, ir, tr, tcr, ctr,
+               week='', section='', market=''):
+        """Append one row"""
+        values = {'market': market, 'section': section, 'week': week,
+                  'show': show, 'channel': channel, 'platform': platform}
+        for name in DIMENSIONS:
+            self._codes[name].append(self._tables[name].encode(values[name]))
+        measures = self._measures
+        measures['spend'].append(spend)
+        measures['trials'].append(trials)
+        measures['cac'].append(cac)
+        measures['ir'].append(ir)
+        measures['tr'].append(tr)
+        measures['tcr'].append(tcr)
+        measures['ctr'].append(ctr)
+
+    @classmethod
+    def from_records(cls, records, **dims):
+        """Build from dicts with the RECORD_FIELDS keys; `dims` fills the rest"""
+        data = cls()
+        for record in records:
+            row = dict(dims)
+            row.update(record)
+            values = {key: row[key] for key in DIMENSIONS + MEASURES if key in row}
+            for key in MEASURES:
+                if values.get(key) is None:
+                    values[key] = 0 if key in ('spend', 'trials') else MISSING
+            data.append(**values)
+        return data
+
+    @classmethod
+    def concat(cls, datasets):
+        """Stack several datasets into one, re-coding their string tables"""
+        result = cls()
+        for data in datasets:
+            result.extend(data)
+        return result
+
+    def extend(self, other):
+        """Append every row of another dataset in bulk"""
+        for name in DIMENSIONS:
+            table = self._tables[name]
+            remap = [table.encode(value) for value in other._tables[name].values]
+            codes = other._codes[name]
+            if remap == list(range(len(remap))):
+                self._codes[name].extend(codes)
+            else:
+                self._codes[name].extend(remap[code] for code in codes)
+        for name in MEASURES:
+            self._measures[name].extend(other._measures[name])
+        return self
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+
+    def __len__(self):
+        return len(self._measures['spend'])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield ShowRow(self, i)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('dataset index out of range')
+        return ShowRow(self, i)
+
+    def __repr__(self):
+        return f"ShowDataset(rows={len(self)}, shows={len(self._tables['show'])})"
+
+    def column(self, name):
+        """Measure column as an ndarray view (NumPy) or the raw array('d')"""
+        values = self._measures[name]
+        if np is not None:
+            return np.frombuffer(values, dtype=np.float64) if len(values) else np.zeros(0)
+        return values
+
+    def codes(self, name):
+        """Integer codes of a dimension column"""
+        return self._codes[name]
+
+    def labels(self, name):
+        """Distinct values of a dimension, indexed by code"""
+        return self._tables[name].values
+
+    def values(self, name):
+        """Decoded dimension column (one string per row)"""
+        labels = self._tables[name].values
+        return [labels[code] for code in self._codes[name]]
+
+    @property
+    def nbytes(self):
+        """Approximate size of the column buffers"""
+        total = sum(col.itemsize * len(col) for col in self._codes.values())
+        total += sum(col.itemsize * len(col) for col in self._measures.values())
+        return total
+
+    def to_records(self, fields=RECORD_FIELDS):
+        """Row dicts in the shape the dashboards embed as JSON"""
+        return [row.to_record(fields) for row in self]
+
+    def set_dimension(self, name, value):
+        """Give every row the same value for one dimension (e.g. market)"""
+        self._tables[name] = StringTable((value,))
+        codes = self._codes[name]
+        self._codes[name] = array(codes.typecode, bytes(codes.itemsize * len(self)))
+        return self
+
+    # ------------------------------------------------------------------
+    # Serialization
+    # ------------------------------------------------------------------
+
+    def to_bytes(self):
+        """Compact binary form: string tables as JSON, columns as raw buffers"""
+        header = json.dumps({
+            'rows': len(self),
+            'tables': {name: self._tables[name].values for name in DIMENSIONS},
+            'codes': {name: self._codes[name].typecode for name in DIMENSIONS},
+        }, ensure_ascii=False).encode('utf-8')
+        parts = [_HEADER.pack(_MAGIC, len(header)), header]
+        parts.extend(self._codes[name].tobytes() for name in DIMENSIONS)
+        parts.extend(self._measures[name].tobytes() for name in MEASURES)
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, blob):
+        """Inverse of to_bytes()"""
+        magic, size = _HEADER.unpack_from(blob)
+        if magic != _MAGIC:
+            raise ValueError('not a serialized ShowDataset')
+        offset = _HEADER.size
+        header = json.loads(bytes(blob[offset:offset + size]).decode('utf-8'))
+        offset += size
+        rows = header['rows']
+
+        data = cls()
+        for name in DIMENSIONS:
+            data._tables[name] = StringTable(header['tables'][name])
+            codes = array(header['codes'][name])
+            end = offset + codes.itemsize * rows
+            codes.frombytes(blob[offset:end])
+            data._codes[name] = codes
+            offset = end
+        for name in MEASURES:
+            values = array('d')
+            end = offset + values.itemsize * rows
+            values.frombytes(blob[offset:end])
+            data._measures[name] = values
+            offset = end
+        return data
+
+    # ------------------------------------------------------------------
+    # Bulk operations
+    # ------------------------------------------------------------------
+
+    def take(self, indices):
+        """New dataset with the given row positions, sharing string tables' values"""
+        result = ShowDataset()
+        for name in DIMENSIONS:
+            result._tables[name] = StringTable(self._tables[name].values)
+            codes = self._codes[name]
+            result._codes[name] = array(codes.typecode, [codes[i] for i in indices])
+        for name in MEASURES:
+            values = self._measures[name]
+            result._measures[name] = array('d', [values[i] for i in indices])
+        return result
+
+    def filter(self, predicate=None, **dims):
+        """
+        Rows matching every `dim=value` (or `dim=(v1, v2)`) and, if given,
+        `predicate(row)`.  Dimension filters compare integer codes only.
+        """
+        wanted = {}
+        for name, value in dims.items():
+            options = value if isinstance(value, (tuple, list, set, frozenset)) else (value,)
+            table = self._tables[name]
+            wanted[name] = {table.code(v) for v in options} - {None}
+
+        indices = []
+        columns = [(self._codes[name], codes) for name, codes in wanted.items()]
+        for i in range(len(self)):
+            if all(col[i] in codes for col, codes in columns):
+                if predicate is None or predicate(ShowRow(self, i)):
+                    indices.append(i)
+        return self.take(indices)
+
+    def group_indices(self, *dims):
+        """Map of dimension-value tuple -> row positions, in first-seen order"""
+        groups = {}
+        columns = [self._codes[name] for name in dims]
+        tables = [self._tables[name].values for name in dims]
+        for i in range(len(self)):
+            key = tuple(col[i] for col in columns)
+            positions = groups.get(key)
+            if positions is None:
+                groups[key] = positions = []
+            positions.append(i)
+        return {
+            tuple(table[code] for table, code in zip(tables, key)): positions
+            for key, positions in groups.items()
+        }
+
+    def group_by(self, *dims):
+        """Map of dimension-value tuple -> sub-dataset"""
+        return {key: self.take(positions) for key, positions in self.group_indices(*dims).items()}
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+STAGE Export Index
+Byte-offset index of the blocks inside a CAC Solver export.
+
+One pass over a memory-mapped file records where every header row, week
+marker, section title and notes row starts; runs of show rows collapse to a
+single entry.  The index is tiny next to the export and is stored in the
+parse cache (index/), so a later read can replay it to find the
+(section, week) blocks and decode only the byte ranges it needs.  Neither
+pass ever holds more than one row of the file as Python text.
+"""
+
+import csv
+import io
+import json
+import mmap
+import os
+import struct
+from array import array
+
+from cac_reader import (BLANK, DATA, DEFAULT_SECTION, HEADER, NOTES, PIVOT, TEXT, WEEK,
+                        _looks_like_title, classify_row, iter_row_batches)
+from parse_cache import cache_enabled, default_cache
+
+# Bump whenever the index layout changes
+INDEX_VERSION = 1
+
+# Exports below this size are cheaper to stream than to index
+INDEX_MIN_BYTES = 4 * 1024 * 1024
+
+# to_bytes() layout: magic, JSON header length, JSON header, offsets, kinds
+_MAGIC = b'SIX1'
+_HEADER = struct.Struct('<4sI')
+
+
+class Block:
+    """Byte range [start, end) of one (section, week) block"""
+
+    __slots__ = ('section', 'week', 'start', 'end', 'header')
+
+    def __init__(self, section, week, start, end=None, header=None):
+        self.section = section
+        self.week = week        # (start, end) dates or (None, None)
+        self.start = start
+        self.end = end
+        self.header = header    # offset of the column header in effect at `start`
+
+    def __repr__(self):
+        return (f"Block(section={self.section!r}, week={self.week[0]!r}, "
+                f"bytes={self.start}-{self.end})")
+
+
+def _iter_records(mm, start=0, end=None):
+    """(offset, raw bytes) of every CSV record in [start, end); quoted line breaks stay in one record"""
+    pos, size = start, len(mm) if end is None else end
+    while pos < size:
+        record = pos
+        quoted = False
+        while True:
+            line_end = mm.find(b'\n', pos, size)
+            line_end = size if line_end < 0 else line_end + 1
+            if mm[pos:line_end].count(b'"') & 1:
+                quoted = not quoted
+            pos = line_end
+            if not quoted or pos >= size:
+                break
+        yield record, mm[record:pos]
+
+
+def _cells(raw):
+    text = raw.decode('utf-8')
+    if '"' not in text:
+        return text.rstrip('\r\n').split(',')
+    return next(csv.reader(io.StringIO(text, newline='')), [])
+
+
+class ExportIndex:
+    """Offsets and kinds of the structural rows of one export"""
+
+    __slots__ = ('size', 'offsets', 'kinds', 'labels')
+
+    def __init__(self, size=0):
+        self.size = size
+        self.offsets = array('Q')
+        self.kinds = array('B')
+        self.labels = {}  # entry position -> week range (WEEK) or title-like text (TEXT)
+
+    @classmethod
+    def scan(cls, filepath):
+        """Build the index in one pass over a memory-mapped export"""
+        size = os.path.getsize(filepath)
+        index = cls(size)
+        if not size:
+            return index
+        with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            previous = None
+            for offset, raw in _iter_records(mm):
+                kind, value = classify_row(_cells(raw))
+                # Runs of show rows (or blanks) act as one row for the block layout
+                if kind == previous and kind in (DATA, BLANK):
+                    continue
+                previous = kind
+                # Notes only matter as "not a title"; keep the labels that could be
+                if kind == WEEK or (kind == TEXT and _looks_like_title(value)):
+                    index.labels[len(index.kinds)] = value
+                index.offsets.append(offset)
+                index.kinds.append(kind)
+        return index
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def entries(self):
+        """(offset, kind, label) of every indexed row"""
+        for i, (offset, kind) in enumerate(zip(self.offsets, self.kinds)):
+            yield offset, kind, self.labels.get(i)
+
+    def headers(self):
+        """Offsets of the column header rows"""
+        return [offset for offset, kind in zip(self.offsets, self.kinds) if kind == HEADER]
+
+    def blocks(self):
+        """
+        Replay the reader's section/week rules over the index.
+
+        Mirrors cac_reader.iter_row_batches: a title is excluded from the
+        block above it, so each block reads back exactly the batches a full
+        pass yields for it.
+        """
+        section = DEFAULT_SECTION
+        week = (None, None)
+        header = None
+        text_run = []  # (offset, text)
+        notes_mode = False
+        blocks = [Block(section, week, 0)]
+
+        def split(end, start, carry=None):
+            current = blocks[-1]
+            if current.start == start:
+                current.section, current.week, current.header = section, week, carry
+                return
+            current.end = end
+            blocks.append(Block(section, week, start, header=carry))
+
+        for offset, kind, label in self.entries():
+            if kind == BLANK:
+                if notes_mode or len(text_run) != 1 or text_run[0][1] is None:
+                    text_run.clear()
+                    notes_mode = False
+            elif kind in (WEEK, HEADER, PIVOT):
+                if len(text_run) == 1 and not notes_mode and text_run[0][1] is not None:
+                    title_offset, section = text_run.pop()
+                    # Below a pivot row the previous column header still applies
+                    split(title_offset, offset, header if kind == PIVOT else None)
+                text_run.clear()
+                notes_mode = False
+                if kind == WEEK:
+                    week, header = label, None
+                    split(offset, offset)
+                elif kind == HEADER:
+                    header = offset
+            elif kind == TEXT:
+                text_run.append((offset, label))
+            elif kind == NOTES:
+                text_run.clear()
+                notes_mode = True
+            else:
+                text_run.clear()
+
+        blocks[-1].end = self.size
+        return [block for block in blocks if block.end > block.start]
+
+    # ------------------------------------------------------------------
+    # Serialization
+    # ------------------------------------------------------------------
+
+    def to_bytes(self):
+        header = json.dumps({
+            'size': self.size,
+            'entries': len(self),
+            'labels': {str(i): label for i, label in self.labels.items()},
+        }, ensure_ascii=False).encode('utf-8')
+        return b''.join((_HEADER.pack(_MAGIC, len(header)), header,
+                         self.offsets.tobytes(), self.kinds.tobytes()))
+
+    @classmethod
+    def from_bytes(cls, blob):
+        magic, size = _HEADER.unpack_from(blob)
+        if magic != _MAGIC:
+            raise ValueError('not a serialized ExportIndex')
+        offset = _HEADER.size
+        header = json.loads(bytes(blob[offset:offset + size]).decode('utf-8'))
+        offset += size
+
+        index = cls(header['size'])
+        count = header['entries']
+        end = offset + index.offsets.itemsize * count
+        index.offsets.frombytes(blob[offset:end])
+        index.kinds.frombytes(blob[end:end + count])
+        index.labels = {int(i): tuple(label) if isinstance(label, list) else label
+                        for i, label in header['labels'].items()}
+        return index
+
+
+def load_index(filepath, cache=True):
+    """Index of an export, from the parse cache when possible"""
+    if not (cache and cache_enabled()):
+        return ExportIndex.scan(filepath)
+    store = default_cache()
+    entry = store.entry_path(filepath, f"index-v{INDEX_VERSION}", kind='index', suffix='.idx')
+    blob = store.read(entry)
+    if blob is not None:
+        try:
+            return ExportIndex.from_bytes(blob)
+        except (ValueError, KeyError, struct.error):
+            pass
+    index = ExportIndex.scan(filepath)
+    store.write(entry, index.to_bytes())
+    return index
+
+
+def _block_rows(mm, block):
+    """Cells of a block's rows, decoded one record at a time"""
+    if block.header is not None:
+        _, raw = next(_iter_records(mm, block.header))
+        yield _cells(raw)
+    for _, raw in _iter_records(mm, block.start, block.end):
+        yield _cells(raw)
+
+
+def iter_indexed_batches(filepath, sections=None, index=None, cache=True):
+    """
+    Like cac_reader.iter_batches, but decodes only the blocks of `sections`
+    (all of them if None), using the export's byte-offset index.
+    """
+    index = index or load_index(filepath, cache)
+    blocks = [block for block in index.blocks() if sections is None or block.section in sections]
+    if not blocks:
+        return
+    source = os.path.basename(filepath)
+    with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for block in blocks:
+            yield from iter_row_batches(_block_rows(mm, block), source,
+                                        section=block.section, week=block.week)
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+STAGE Blended Metrics
+Group-by engine for the dashboard metrics over a ShowDataset.
+
+Every blended metric is a ratio of two sums:
+
+    CAC = spend / trials
+    IR/TR/TCR = sum(metric * trials) / sum(trials)   (rows with the metric)
+    CTR = sum(ctr * spend) / sum(spend)              (rows with CTR)
+
+GroupedMetrics keeps those sums per group for any combination of
+dimensions, filled in one pass over the rows.  Sums are compensated
+(Neumaier), so rupee totals over hundreds of thousands of rows do not drift.
+With NumPy installed the pass is vectorized: rows are added pairwise within
+each group, with the same Neumaier step on every addition.  Partial results (e.g. one per
+worker or per export) combine with merge().
+"""
+
+from cac_dataset import DIMENSIONS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Sum vector kept per group, in this order
+SUMS = ('spend', 'trials', 'ir_w', 'ir_n', 'tr_w', 'tr_n', 'tcr_w', 'tcr_n', 'ctr_w', 'ctr_n')
+
+# Measure columns row_sums() reads, in argument order
+SUM_INPUTS = ('spend', 'trials', 'ir', 'tr', 'tcr', 'ctr')
+
+_WIDTH = len(SUMS)
+
+
+def row_sums(spend, trials, ir, tr, tcr, ctr):
+    """Sum vector of one row; missing (NaN) metrics add nothing"""
+    sums = [spend, trials]
+    for value, weight in ((ir, trials), (tr, trials), (tcr, trials), (ctr, spend)):
+        if value != value:
+            sums.extend((0.0, 0.0))
+        else:
+            sums.extend((value * weight, weight))
+    return sums
+
+
+def metrics_from_sums(sums):
+    """Blended metrics of one sum vector, the same way the pages compute them"""
+    spend, trials, ir_w, ir_n, tr_w, tr_n, tcr_w, tcr_n, ctr_w, ctr_n = sums
+    return {
+        'totalSpend': spend,
+        'totalTrials': trials,
+        'cac': spend / trials if trials > 0 else 0,
+        'ir': ir_w / ir_n if ir_n > 0 else 0,
+        'tr': tr_w / tr_n if tr_n > 0 else 0,
+        'tcr': tcr_w / tcr_n if tcr_n > 0 else 0,
+        'ctr': ctr_w / ctr_n if ctr_n > 0 else 0,
+    }
+
+
+def _accumulate(state, values):
+    """Neumaier step: state holds the running totals, then their compensations"""
+    for j, x in enumerate(values):
+        total = state[j]
+        s = total + x
+        if abs(total) >= abs(x):
+            state[_WIDTH + j] += (total - s) + x
+        else:
+            state[_WIDTH + j] += (x - s) + total
+        state[j] = s
+
+
+def _neumaier_by_group(inverse, values, groups):
+    """
+    Per-group (totals, compensations) of the rows of `values`, vectorized.
+
+    Rows are summed pairwise within each group, log2(rows) passes over the
+    arrays; every pair addition takes the Neumaier step, and its rounding
+    error goes to the group's compensation.
+    """
+    order = np.argsort(inverse, kind='stable')
+    group, values = inverse[order], values[order]
+    compensations = np.zeros((groups, values.shape[1]))
+    while True:
+        positions = np.arange(len(group))
+        starts = np.concatenate(([True], group[1:] != group[:-1]))
+        rank = positions - np.maximum.accumulate(np.where(starts, positions, 0))
+        has_next = np.concatenate((group[1:] == group[:-1], [False]))
+        left = np.flatnonzero((rank % 2 == 0) & has_next)
+        if not len(left):
+            break
+        a, b = values[left], values[left + 1]
+        s = a + b
+        np.add.at(compensations, group[left],
+                  np.where(np.abs(a) >= np.abs(b), (a - s) + b, (b - s) + a))
+        # Even-ranked rows carry on, holding their pair's sum
+        kept = np.flatnonzero(rank % 2 == 0)
+        paired = has_next[kept]
+        group, values = group[kept], values[kept]
+        values[paired] = s
+
+    totals = np.zeros((groups, values.shape[1]))
+    totals[group] = values
+    return totals, compensations
+
+
+class GroupedMetrics:
+    """Compensated metric sums per group of `dims` values"""
+
+    __slots__ = ('dims', '_groups')
+
+    def __init__(self, dims=()):
+        dims = (dims,) if isinstance(dims, str) else tuple(dims)
+        unknown = [name for name in dims if name not in DIMENSIONS]
+        if unknown:
+            raise ValueError(f"unknown dimension: {', '.join(unknown)}")
+        self.dims = dims
+        self._groups = {}  # value tuple -> totals + compensations (2 x len(SUMS))
+
+    @classmethod
+    def of(cls, data, *dims):
+        """Accumulator filled from one dataset"""
+        return cls(dims).add(data)
+
+    # ------------------------------------------------------------------
+    # Accumulating
+    # ------------------------------------------------------------------
+
+    def _state(self, key):
+        state = self._groups.get(key)
+        if state is None:
+            state = self._groups[key] = [0.0] * (2 * _WIDTH)
+        return state
+
+    def add(self, data):
+        """Add every row of a ShowDataset in one pass"""
+        if len(data):
+            if np is not None:
+                self._add_numpy(data)
+            else:
+                self._add_python(data)
+        return self
+
+    def _add_python(self, data):
+        columns = [data.column(name) for name in SUM_INPUTS]
+        codes = [data.codes(name) for name in self.dims]
+        states = {}  # code tuple -> state, so labels are resolved once per group
+        for i in range(len(data)):
+            key = tuple(col[i] for col in codes)
+            state = states.get(key)
+            if state is None:
+                state = states[key] = self._state(self._labels(data, key))
+            _accumulate(state, row_sums(*(column[i] for column in columns)))
+
+    def _add_numpy(self, data):
+        if self.dims:
+            stacked = np.stack([np.asarray(data.codes(name), dtype=np.int64) for name in self.dims],
+                               axis=1)
+            keys, inverse = np.unique(stacked, axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+        else:
+            keys = np.zeros((1, 0), dtype=np.int64)
+            inverse = np.zeros(len(data), dtype=np.int64)
+        groups = len(keys)
+
+        spend, trials, *rates = (np.asarray(data.column(name), dtype=np.float64)
+                                 for name in SUM_INPUTS)
+        vectors = [spend, trials]
+        for values, weight in zip(rates, (trials, trials, trials, spend)):
+            present = ~np.isnan(values)
+            vectors.append(np.where(present, values * weight, 0.0))
+            vectors.append(np.where(present, weight, 0.0))
+        totals, compensations = _neumaier_by_group(inverse, np.stack(vectors, axis=1), groups)
+
+        # Visit groups in first-seen order, like the pure-Python pass
+        first_seen = np.full(groups, len(data), dtype=np.int64)
+        np.minimum.at(first_seen, inverse, np.arange(len(data)))
+        keys, totals, compensations = keys.tolist(), totals.tolist(), compensations.tolist()
+        for g in np.argsort(first_seen, kind='stable').tolist():
+            state = self._state(self._labels(data, keys[g]))
+            _accumulate(state, totals[g])
+            _accumulate(state, compensations[g])
+
+    def _labels(self, data, codes):
+        return tuple(data.labels(name)[code] for name, code in zip(self.dims, codes))
+
+    def add_sums(self, key, sums):
+        """Add one precomputed sum vector to a group"""
+        _accumulate(self._state(tuple(key)), sums)
+        return self
+
+    def merge(self, other):
+        """Fold in another accumulator over the same dimensions (e.g. from a worker)"""
+        if other.dims != self.dims:
+            raise ValueError(f"cannot merge {other.dims} into {self.dims}")
+        for key, state in other._groups.items():
+            target = self._state(key)
+            _accumulate(target, state[:_WIDTH])
+            _accumulate(target, state[_WIDTH:])
+        return self
+
+    @classmethod
+    def merged(cls, parts, dims=None):
+        """One accumulator from several partial ones"""
+        parts = list(parts)
+        result = cls(dims if dims is not None else (parts[0].dims if parts else ()))
+        for part in parts:
+            result.merge(part)
+        return result
+
+    # ------------------------------------------------------------------
+    # Results
+    # ------------------------------------------------------------------
+
+    def __len__(self):
+        return len(self._groups)
+
+    def __contains__(self, key):
+        return tuple(key) in self._groups
+
+    def keys(self):
+        return list(self._groups)
+
+    def sums(self, key):
+        """Compensated sum vector of one group (zeros if the group is empty)"""
+        state = self._groups.get(tuple(key))
+        if state is None:
+            return [0.0] * _WIDTH
+        return [state[j] + state[_WIDTH + j] for j in range(_WIDTH)]
+
+    def metrics(self, *key):
+        """Blended metrics of one group, e.g. metrics('gujarati', 'meta')"""
+        return metrics_from_sums(self.sums(key))
+
+    def items(self):
+        """(group key, sum vector) pairs in first-seen order"""
+        for key in self._groups:
+            yield key, self.sums(key)
+
+    def to_dict(self):
+        """Group key -> blended metrics"""
+        return {key: metrics_from_sums(sums) for key, sums in self.items()}
+
+    def __repr__(self):
+        return f"GroupedMetrics(dims={self.dims!r}, groups={len(self)})"
+
+
+def grouped_metrics(data, *dims):
+    """Blended metrics of every group of `dims` values in a dataset"""
+    return GroupedMetrics.of(data, *dims).to_dict()
+
+
+def blended_metrics(data):
+    """Blended metrics of a whole dataset"""
+    return GroupedMetrics.of(data).metrics()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+STAGE Number Parser
+Bulk decoding of CAC Solver number cells: "1,007,212", "32.04%", "3,363", "".
+
+Blank or unparseable cells decode to NaN (MISSING) instead of 0, so a
+missing TCR_D0 or CP_AM_CPT_D0 never enters a weighted average as a real
+zero.  Percentages stay in percentage points ("32.04%" -> 32.04).
+"""
+
+import math
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MISSING = float('nan')
+
+# Characters the Sheets exports wrap around numbers
+_STRIP = str.maketrans('', '', ',%₹" \t\r\n')
+
+
+def is_missing(value):
+    """True for NaN/None cells"""
+    return value is None or value != value
+
+
+def parse_number(value):
+    """Decode one cell to float, or MISSING"""
+    if value is None:
+        return MISSING
+    if isinstance(value, (int, float)):
+        return float(value)
+    cleaned = value.translate(_STRIP)
+    if not cleaned:
+        return MISSING
+    try:
+        return float(cleaned)
+    except ValueError:
+        return MISSING
+
+
+def _parse_python(values):
+    # Fast path: one translate per cell and a single C-level map(float);
+    # blanks become 'nan' so they need no special casing.
+    cleaned = [(value.translate(_STRIP) or 'nan') if isinstance(value, str) else
+               ('nan' if value is None else value) for value in values]
+    try:
+        return array('d', map(float, cleaned))
+    except ValueError:
+        # Stray text such as '#DIV/0!' - fall back to per-cell decoding
+        return array('d', map(parse_number, values))
+
+
+def _parse_numpy(values):
+    text = np.asarray(['' if value is None else str(value) for value in values], dtype=str)
+    for char in (',', '%', '₹', '"', ' '):
+        text = np.char.replace(text, char, '')
+    text = np.where(text == '', 'nan', text)
+    try:
+        return array('d', text.astype(np.float64).tobytes())
+    except ValueError:
+        return _parse_python(values)
+
+
+def parse_column(values, vectorized=None):
+    """
+    Decode a whole column of cells into array('d'), MISSING for blanks.
+
+    `vectorized` forces (True) or disables (False) the NumPy path; by default
+    NumPy is used for large columns when it is installed.
+    """
+    values = values if isinstance(values, (list, tuple)) else list(values)
+    if vectorized is None:
+        vectorized = np is not None and len(values) >= 512
+    if vectorized and np is not None:
+        return _parse_numpy(values)
+    return _parse_python(values)
+
+
+def missing_mask(column):
+    """Per-row flags (bytes) marking MISSING values of a decoded column"""
+    return bytes(1 if value != value else 0 for value in column)
+
+
+def fill_missing(column, fill=0.0):
+    """Copy of a decoded column with MISSING replaced by `fill`"""
+    return array('d', (fill if value != value else value for value in column))
+
+
+def finite_or_none(value):
+    """JSON-friendly value: NaN -> None"""
+    return None if value != value or math.isinf(value) else value
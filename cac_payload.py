@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+STAGE Data Payload
+Columnar, dictionary-encoded form of the rows a page embeds.
+
+Instead of an array of objects (every key and every 'meta'/'google'/'app'/
+'web' repeated per row), a payload holds one array per field:
+
+    {"rows": 2, "fields": ["show", "channel", ...],
+     "labels": {"show": ["MPJ", "CBKR"], "channel": ["google"], ...},
+     "columns": {"show": [0, 1], "channel": [0, 0], "spend": [327547, 302874], ...}}
+
+Text fields are codes into string tables shared by every market in the
+payload, and numbers are rounded to PRECISION (integral values lose their
+'.0').  Missing metrics are null.  Pages embed it as a single JSON.parse('...')
+string, which engines parse much faster than an object literal, and decode
+it back into the same row objects with assets/payload.js.
+
+In compressed mode the JSON is gzipped and embedded as a base64 string
+instead; the page inflates it with the browser's DecompressionStream.
+
+With orders=True the payload also carries the table's sort orders: per
+market slice and field, the ascending permutation of the slice's rows (ties
+in row order, nulls last) as base64 little-endian uint16/uint32, so a page
+re-sorts by reading rows in a stored order instead of comparing them.  With
+a week column, each week of a slice gets its own orders too, keyed
+'<slice>|<week>' and indexing that week's rows in slice order; a slice of a
+single week does not repeat them.
+"""
+
+import base64
+import gzip
+import json
+import sys
+from array import array
+
+from cac_dataset import RECORD_FIELDS
+
+# Decimal places kept per measure (rupees to the paisa, rates to 4 places)
+PRECISION = {'spend': 2, 'trials': 0, 'cac': 2, 'ir': 4, 'tr': 4, 'tcr': 4, 'ctr': 4}
+
+TEXT_FIELDS = ('market', 'week', 'show', 'channel', 'platform')
+
+# Fields the pages decode: the table's, plus the week the pages filter on
+PAGE_FIELDS = RECORD_FIELDS + ('week',)
+
+
+def _number(value, digits):
+    if value != value:
+        return None
+    value = round(value, digits)
+    return int(value) if value == int(value) else value
+
+
+def _encode(data, name):
+    """Codes renumbered over the labels actually used, in first-seen order"""
+    labels, codes = data.labels(name), data.codes(name)
+    remap, used = {}, []
+    column = []
+    for code in codes:
+        new = remap.get(code)
+        if new is None:
+            new = remap[code] = len(used)
+            used.append(labels[code])
+        column.append(new)
+    return used, column
+
+
+def pack_order(order):
+    """Permutation as base64 little-endian uint16 (uint32 past 65536 rows)"""
+    packed = array('H' if len(order) <= 0x10000 else 'I', order)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return base64.b64encode(packed.tobytes()).decode('ascii')
+
+
+def unpack_order(text, rows):
+    """Inverse of pack_order() for a slice of `rows` rows"""
+    raw = base64.b64decode(text)
+    packed = array('H' if rows <= 0x10000 else 'I')
+    packed.frombytes(raw)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return packed.tolist()
+
+
+def sort_order(values):
+    """Ascending permutation of `values`: nulls last, ties in their original order"""
+    return sorted(range(len(values)), key=lambda i: (values[i] is None, values[i] if values[i] is not None else 0))
+
+
+def _sort_orders(payload, group):
+    labels, columns = payload['labels'], payload['columns']
+    if group:
+        slices = {name: [] for name in labels[group]}
+        for i, code in enumerate(columns[group]):
+            slices[labels[group][code]].append(i)
+    else:
+        slices = {'': range(payload['rows'])}
+    if 'week' in columns:
+        weeks, codes = labels['week'], columns['week']
+        for name, rows in list(slices.items()):
+            by_week = {}
+            for i in rows:
+                by_week.setdefault(weeks[codes[i]], []).append(i)
+            if len(by_week) > 1:
+                slices.update((f"{name}|{week}", positions) for week, positions in by_week.items())
+
+    orders = {}
+    for name, rows in slices.items():
+        orders[name] = {}
+        for field in payload['fields']:
+            column, table = columns[field], labels.get(field)
+            values = [table[column[i]] if table is not None else column[i] for i in rows]
+            orders[name][field] = pack_order(sort_order(values))
+    return orders
+
+
+def build_payload(data, fields=RECORD_FIELDS, group=None, orders=False):
+    """
+    Payload dict of a dataset; `group` (e.g. 'market') adds that dimension as
+    an extra coded column so the page can split the rows again, and `orders`
+    adds the sort orders of every group (or of all rows, keyed '').
+    """
+    names = list(fields) + ([group] if group and group not in fields else [])
+    labels, columns = {}, {}
+    for name in names:
+        if name in TEXT_FIELDS:
+            labels[name], columns[name] = _encode(data, name)
+        else:
+            digits = PRECISION.get(name, 6)
+            columns[name] = [_number(value, digits) for value in data.column(name)]
+    payload = {'rows': len(data), 'fields': list(fields), 'labels': labels, 'columns': columns}
+    if orders:
+        payload['orders'] = _sort_orders(payload, group)
+    return payload
+
+
+def payload_json(data, fields=RECORD_FIELDS, group=None, orders=False):
+    """Compact JSON of build_payload()"""
+    return json.dumps(build_payload(data, fields, group, orders), ensure_ascii=False,
+                      separators=(',', ':'))
+
+
+def payload_script(data, fields=RECORD_FIELDS, group=None, orders=False):
+    """JSON.parse('...') expression embedding the payload, safe inside <script>"""
+    text = payload_json(data, fields, group, orders)
+    text = (text.replace('\\', '\\\\').replace("'", "\\'").replace('</', '<\\/')
+            .replace('\u2028', '\\u2028').replace('\u2029', '\\u2029'))
+    return f"JSON.parse('{text}')"
+
+
+def payload_gzip_script(data, fields=RECORD_FIELDS, group=None, orders=False):
+    """Base64 gzip of the payload JSON as a JS string literal (compressed mode)"""
+    raw = payload_json(data, fields, group, orders).encode('utf-8')
+    # mtime=0 keeps the output byte-identical between builds
+    return f"'{base64.b64encode(gzip.compress(raw, compresslevel=9, mtime=0)).decode('ascii')}'"
+
+
+def decode_payload(payload):
+    """Row dicts of a payload, as assets/payload.js rebuilds them"""
+    labels, columns = payload['labels'], payload['columns']
+    rows = [{} for _ in range(payload['rows'])]
+    for name in payload['fields']:
+        column, table = columns[name], labels.get(name)
+        for row, value in zip(rows, column):
+            row[name] = table[value] if table is not None else value
+    return rows
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+STAGE Ranking Index
+Top-K lists and health-threshold buckets of a ShowDataset, precomputed at
+build time for the insight rules (insights_engine) and the pages.
+
+The build ranks every (market, week, channel, platform) block once and
+records:
+
+    topTrials              row positions of the K rows with most trials
+    cacEfficient           CAC below target on more than MIN_TRIALS trials
+    cacOver                CAC at or above target
+    tcrHealthy / tcrPoor   TCR below / at or above target
+
+Bucket members are listed by trials, descending (ties in row order), with
+their totals.  Any coarser slice (a market, or one week of a market) is a
+merge of its blocks: the sorted member lists interleave and the top-K list
+is the top K of the blocks' lists, so the insights read the answer directly
+instead of sorting and filtering every row.  Row positions index the
+dataset the rankings were built from.
+"""
+
+import heapq
+import json
+import math
+
+# Health thresholds the insights use
+CAC_TARGET = 250
+MIN_TRIALS = 50
+TCR_TARGET = 30
+
+# Rows kept per top-K list
+TOP_K = 10
+
+# Dimensions of the ranked blocks
+RANK_DIMENSIONS = ('market', 'week', 'channel', 'platform')
+
+BUCKETS = ('cacEfficient', 'cacOver', 'tcrHealthy', 'tcrPoor')
+
+
+class Columns:
+    """The measure columns rankings read, as plain lists indexed by row position"""
+
+    __slots__ = ('trials', 'spend', 'cac', 'tcr')
+
+    def __init__(self, data):
+        self.trials = [int(v) for v in data.column('trials')]
+        self.spend, self.cac, self.tcr = (list(data.column(name)) for name in ('spend', 'cac', 'tcr'))
+
+
+def _bucket(rows, *columns):
+    """Member positions plus plain left-to-right sums, the way the page used to reduce them"""
+    bucket = {'rows': rows}
+    for name, values in columns:
+        total = 0
+        for i in rows:
+            total += values[i]
+        bucket[name] = total
+    return bucket
+
+
+def _ranking(size, by_trials, members, cols, k):
+    """Ranking dict of a slice from its rows by trials and its bucket members"""
+    ranking = {'size': size, 'topTrials': by_trials[:k]}
+    # CAC buckets only hold rows with a CAC, so their CAC sum is always defined
+    for name in ('cacEfficient', 'cacOver'):
+        ranking[name] = _bucket(members[name], ('trials', cols.trials), ('spend', cols.spend),
+                                ('cacSum', cols.cac))
+    for name in ('tcrHealthy', 'tcrPoor'):
+        ranking[name] = _bucket(members[name], ('trials', cols.trials), ('spend', cols.spend))
+
+    # Trials lost to churn above the target (1 point of slack, as the insight counts it)
+    lost = 0
+    for i in members['tcrPoor']:
+        lost += math.floor(cols.trials[i] * max(0, (cols.tcr[i] - (TCR_TARGET - 1)) / 100))
+    ranking['tcrPoor']['lostTrials'] = lost
+    return ranking
+
+
+def rank_slice(positions, cols, k=TOP_K):
+    """Ranking of one slice (`positions` are row positions, in data order)"""
+    trials, cac, tcr = cols.trials, cols.cac, cols.tcr
+    # Stable: rows with equal trials keep their data order, as Array.sort does
+    by_trials = sorted(positions, key=lambda i: trials[i], reverse=True)
+    members = {
+        'cacEfficient': [i for i in by_trials if cac[i] < CAC_TARGET and trials[i] > MIN_TRIALS],
+        'cacOver': [i for i in by_trials if cac[i] >= CAC_TARGET],
+        'tcrHealthy': [i for i in by_trials if tcr[i] < TCR_TARGET],
+        'tcrPoor': [i for i in by_trials if tcr[i] >= TCR_TARGET],
+    }
+    return _ranking(len(by_trials), by_trials, members, cols, k)
+
+
+def merge_rankings(rankings, cols, k=TOP_K):
+    """
+    Ranking of the union of disjoint slices of one dataset, from theirs.
+    Costs the size of the merged lists, not of the slices' rows.
+    """
+    rankings = list(rankings)
+    trials = cols.trials
+
+    def merged(lists):
+        # Same order rank_slice gives the union: trials descending, ties by position
+        return list(heapq.merge(*lists, key=lambda i: (-trials[i], i)))
+
+    members = {name: merged(ranking[name]['rows'] for ranking in rankings) for name in BUCKETS}
+    top = merged(ranking['topTrials'] for ranking in rankings)
+    return _ranking(sum(ranking['size'] for ranking in rankings), top, members, cols, k)
+
+
+def build_rankings(data, k=TOP_K):
+    """
+    Rankings of every (market, week, channel, platform) block of a dataset:
+
+        {'k': 10, 'thresholds': {...}, 'dims': [...],
+         'slices': {'gujarati|2026-02-01|meta|app': {...}}}
+
+    Slice keys join the dimension values with '|', like the cube's lookups.
+    """
+    cols = Columns(data)
+    return {
+        'k': k,
+        'thresholds': {'cac': CAC_TARGET, 'minTrials': MIN_TRIALS, 'tcr': TCR_TARGET},
+        'dims': list(RANK_DIMENSIONS),
+        'slices': {'|'.join(key): rank_slice(positions, cols, k)
+                   for key, positions in data.group_indices(*RANK_DIMENSIONS).items()},
+    }
+
+
+def slice_ranking(rankings, cols, **values):
+    """Merged ranking of the blocks matching every `dim=value`, e.g. market='gujarati'"""
+    unknown = [name for name in values if name not in RANK_DIMENSIONS]
+    if unknown:
+        raise ValueError(f"not a ranked dimension: {', '.join(unknown)}")
+    wanted = [(RANK_DIMENSIONS.index(name), value) for name, value in values.items()]
+    blocks = [ranking for key, ranking in rankings['slices'].items()
+              if all(key.split('|')[d] == value for d, value in wanted)]
+    return merge_rankings(blocks, cols, rankings['k'])
+
+
+def rankings_json(data, rankings=None):
+    """
+    Compact JSON of the rankings for a page: show names instead of row
+    positions, and bucket totals instead of members.
+
+        {'k': 10, 'thresholds': {...}, 'dims': [...], 'shows': [...],
+         'slices': {key: {'size': 17, 'topTrials': [[show, trials], ...],
+                          'cacEfficient': [rows, trials, spend], ...,
+                          'tcrPoor': [rows, trials, spend, lostTrials]}}}
+    """
+    rankings = rankings or build_rankings(data)
+    codes = data.codes('show')
+    trials = Columns(data).trials
+    slices = {}
+    for key, ranking in rankings['slices'].items():
+        entry = {'size': ranking['size'], 'topTrials': [[codes[i], trials[i]] for i in ranking['topTrials']]}
+        for name in BUCKETS:
+            bucket = ranking[name]
+            entry[name] = [len(bucket['rows']), bucket['trials'], round(bucket['spend'], 2)]
+        entry['tcrPoor'].append(ranking['tcrPoor']['lostTrials'])
+        slices[key] = entry
+    page = {key: rankings[key] for key in ('k', 'thresholds', 'dims')}
+    page.update(shows=list(data.labels('show')), slices=slices)
+    return json.dumps(page, ensure_ascii=False, separators=(',', ':'))
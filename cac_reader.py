@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+STAGE CAC Solver Reader
+Streams a CAC Solver export once and yields one record batch per (section, week).
+
+Real exports stack many blocks in one sheet:
+
+    ,Week_range,Values,...              <- pivot header (ignored)
+    ,Week (2026-02-01 to 2026-02-07),...  <- week marker
+    Show_Name - APP,Spends_GST,...      <- column header
+    Saanwari,"1,007,212",...            <- show rows
+    Grand Total,...                     <- totals (ignored)
+    vb shut off, cac was high           <- analyst notes
+    PAN IND - Stage TAM                 <- section title
+
+Only the current block is held in memory, so file size does not matter.
+"""
+
+import csv
+import os
+import re
+
+from cac_dataset import ShowDataset
+from cac_numbers import fill_missing, parse_column
+from cac_schema import match_schema
+
+WEEK_PATTERN = re.compile(
+    r'Week(?:\s+[A-Za-z]+)?\s*\(\s*(\d{4}-\d{2}-\d{2})\s+to\s+(\d{4}-\d{2}-\d{2})\s*\)',
+    re.IGNORECASE
+)
+
+# A row is a column header if any cell matches one of these (lowercase)
+HEADER_MARKERS = ('spends_gst', 'showname', 'grouped showname', 'show_name - app')
+
+# Rows whose show cell is one of these are never data
+SKIP_SHOWS = ('Grand Total', 'Values', 'Week_range')
+
+NOTES_MARKER = 'insights:'
+
+DEFAULT_SECTION = 'main'
+
+# Bump whenever parsing output changes (invalidates parse caches)
+READER_VERSION = 1
+
+
+def detect_channel_platform(filename):
+    """Detect (channel, platform) from an export's file or sheet name"""
+    name = filename.lower()
+    channel = 'meta' if 'meta' in name else 'google'
+    platform = 'web' if 'web' in name else 'app'
+    return channel, platform
+
+
+class RecordBatch:
+    """All show records of one (section, week) block of an export"""
+
+    __slots__ = ('source', 'section', 'week_start', 'week_end', 'channel', 'platform',
+                 'derive_trials', 'data', 'notes', '_cells')
+
+    def __init__(self, source, section, week_start, week_end, channel, platform,
+                 derive_trials=False):
+        self.source = source
+        self.section = section
+        self.week_start = week_start
+        self.week_end = week_end
+        self.channel = channel
+        self.platform = platform
+        self.derive_trials = derive_trials
+        self.data = ShowDataset()
+        self.notes = []
+        self._cells = []  # raw (show, spend, trials, cac, ir, tr, tcr, ctr) strings
+
+    @property
+    def week(self):
+        """Week range label, e.g. '2026-02-01 to 2026-02-07'"""
+        if not self.week_start:
+            return ''
+        return f"{self.week_start} to {self.week_end}"
+
+    def add_cells(self, cells):
+        """Queue one raw show row; numbers are decoded column-wise in finish()"""
+        self._cells.append(cells)
+
+    def finish(self):
+        """Decode the queued rows in bulk into `data`"""
+        if not self._cells:
+            return self
+        shows, spend, trials, cac, ir, tr, tcr, ctr = zip(*self._cells)
+        self._cells = []
+
+        spend = fill_missing(parse_column(spend))
+        cac = parse_column(cac)
+        ir, tr, tcr, ctr = (parse_column(column) for column in (ir, tr, tcr, ctr))
+        if self.derive_trials:
+            # Some Google exports have no trial count; derive it from spend / CAC
+            trials = [int(s / c) if c > 0 else 0 for s, c in zip(spend, cac)]
+        else:
+            trials = [int(t) for t in fill_missing(parse_column(trials))]
+
+        week = self.week_start or ''
+        for i, show in enumerate(shows):
+            # Only include if we have meaningful data
+            if spend[i] <= 0 and trials[i] <= 0:
+                continue
+            self.data.append(show, self.channel, self.platform, spend[i], trials[i],
+                             cac[i], ir[i], tr[i], tcr[i], ctr[i],
+                             week=week, section=self.section)
+        return self
+
+    def __len__(self):
+        return len(self.data) + len(self._cells)
+
+    def __bool__(self):
+        return bool(len(self) or self.notes)
+
+    def __repr__(self):
+        return (f"RecordBatch({self.source!r}, section={self.section!r}, "
+                f"week={self.week!r}, rows={len(self)})")
+
+
+def _is_header(cells):
+    return any(cell.strip().lower() in HEADER_MARKERS for cell in cells)
+
+
+def _week_range(cells):
+    for cell in cells:
+        if 'week' in cell.lower():
+            match = WEEK_PATTERN.search(cell)
+            if match:
+                return match.group(1), match.group(2)
+    return None
+
+
+def _looks_like_title(text):
+    """Section titles are short labels like 'PAN IND - Stage TAM', not sentences"""
+    return len(text) <= 60 and ',' not in text and not text[0].islower()
+
+
+# Row kinds returned by classify_row()
+BLANK, WEEK, HEADER, PIVOT, TEXT, NOTES, DATA = range(7)
+
+
+def classify_row(cells):
+    """(kind, value) of a raw row; value is the week range for WEEK and the label for TEXT"""
+    nonempty = [cell.strip() for cell in cells if cell and cell.strip()]
+    if not nonempty:
+        return BLANK, None
+    week_range = _week_range(nonempty)
+    if week_range is not None:
+        return WEEK, week_range
+    if _is_header(cells):
+        return HEADER, None
+    if all(cell in SKIP_SHOWS for cell in nonempty):
+        return PIVOT, None
+    if len(nonempty) == 1:
+        if nonempty[0].lower() == NOTES_MARKER:
+            return NOTES, None
+        return TEXT, nonempty[0]
+    return DATA, None
+
+
+def iter_row_batches(rows, source, section=DEFAULT_SECTION, week=None):
+    """
+    Group an iterable of raw rows (lists of strings) into RecordBatch objects.
+
+    `source` is the export's file or sheet name; it decides channel/platform.
+    Each distinct header row is compiled once against the schema registry.
+    A lone single-cell label directly above a week marker or header starts a
+    new section; every other single-cell text row is an analyst note.
+    `section`/`week` set the starting state when reading from mid-file.
+    """
+    channel, platform = detect_channel_platform(source)
+    batch = None
+    schema = None
+    compiled = {}       # header tuple -> CompiledSchema
+    week = week or (None, None)
+    text_run = []       # single-cell text rows since the last table row
+    notes_mode = False  # inside an "Insights:" block
+
+    def new_batch():
+        return RecordBatch(source, section, week[0], week[1], schema.channel, schema.platform,
+                           derive_trials=schema.derive_trials)
+
+    def flush_notes():
+        if batch is not None:
+            batch.notes.extend(text_run)
+        text_run.clear()
+
+    for cells in rows:
+        kind, value = classify_row(cells)
+        if kind == BLANK:
+            # A blank row ends a notes block; only a lone label survives it
+            if notes_mode or len(text_run) != 1 or not _looks_like_title(text_run[0]):
+                flush_notes()
+                notes_mode = False
+            continue
+
+        if kind in (WEEK, HEADER, PIVOT):
+            if len(text_run) == 1 and not notes_mode and _looks_like_title(text_run[0]):
+                # Title right above a week/header starts a new section
+                if batch:
+                    yield batch.finish()
+                batch = None
+                section = text_run.pop()
+            flush_notes()
+            notes_mode = False
+            if kind == WEEK:
+                if batch:
+                    yield batch.finish()
+                week = value
+                batch = None
+                schema = None
+            elif kind == HEADER:
+                key = tuple(cells)
+                schema = compiled.get(key)
+                if schema is None:
+                    schema = compiled[key] = match_schema(cells, channel, platform)
+                if batch is None:
+                    batch = new_batch()
+            continue
+
+        if kind == TEXT:
+            text_run.append(value)
+            continue
+        if kind == NOTES:
+            flush_notes()
+            notes_mode = True
+            continue
+
+        flush_notes()
+        if schema is None:
+            continue
+        raw = schema.extract(cells)
+        show_name = raw[0].strip()
+        # Skip empty rows, repeated headers, and totals
+        if not show_name or show_name in SKIP_SHOWS or 'Week' in show_name:
+            continue
+        if batch is None:
+            batch = new_batch()
+        batch.add_cells((show_name,) + raw[1:])
+
+    flush_notes()
+    if batch:
+        yield batch.finish()
+
+
+def iter_batches(filepath):
+    """Stream a CAC Solver CSV export and yield one RecordBatch per (section, week)"""
+    source = os.path.basename(filepath)
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
+        yield from iter_row_batches(csv.reader(f), source)
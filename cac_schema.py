@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+STAGE Export Schemas
+Registry of the known CAC Solver export layouts.
+
+Each header row is matched against the registry once and compiled into a
+fixed column-index extractor that works directly on raw csv.reader rows,
+so resolving columns costs O(1) per file instead of a lookup per cell.
+"""
+
+from operator import itemgetter
+
+# Bump whenever a schema changes what gets extracted (invalidates caches)
+SCHEMA_VERSION = 2
+
+# Order of the raw cells an extractor returns
+FIELDS = ('show', 'spend', 'trials', 'cac', 'ir', 'tr', 'tcr', 'ctr')
+
+
+class ExportSchema:
+    """One export layout: its identifying columns and where each field lives"""
+
+    __slots__ = ('name', 'channel', 'platform', 'signature', 'columns')
+
+    def __init__(self, name, channel, platform, signature=(), **columns):
+        self.name = name
+        self.channel = channel
+        self.platform = platform  # None: take the platform from the file name
+        self.signature = frozenset(col.lower() for col in signature)
+        # field -> candidate column names, most specific first
+        self.columns = {field: tuple(columns.get(field, ())) for field in FIELDS}
+
+    def accepts(self, channel, platform):
+        return self.channel == channel and self.platform in (None, platform)
+
+    def matches(self, header_names):
+        """True if every identifying column is in the (lowercase) header"""
+        return self.signature <= header_names
+
+    def compile(self, header, channel, platform):
+        """Resolve column positions for one concrete header row"""
+        positions = {}
+        for i, name in enumerate(header):
+            key = name.strip().lower()
+            if key and key not in positions:
+                positions[key] = i
+
+        indices = {}
+        for field, candidates in self.columns.items():
+            indices[field] = next((positions[c.lower()] for c in candidates if c.lower() in positions), None)
+        return CompiledSchema(self, indices, len(header), self.platform or platform)
+
+    def __repr__(self):
+        return f"ExportSchema({self.name!r}, {self.channel}/{self.platform or '*'})"
+
+
+class CompiledSchema:
+    """A schema bound to one header: extract(row) -> raw FIELDS cells"""
+
+    __slots__ = ('schema', 'channel', 'platform', 'indices', 'width',
+                 'derive_trials', '_getter')
+
+    def __init__(self, schema, indices, width, platform):
+        self.schema = schema
+        self.channel = schema.channel
+        self.platform = platform
+        self.indices = indices
+        self.width = width
+        # Google exports without a trial column: trials = spend / CAC
+        self.derive_trials = indices['trials'] is None
+        # Unmapped fields point one past the header and read as blank
+        self._getter = itemgetter(*(width if indices[f] is None else indices[f] for f in FIELDS))
+
+    def extract(self, row):
+        if len(row) <= self.width:
+            row = list(row)
+            row.extend([''] * (self.width + 1 - len(row)))
+        return self._getter(row)
+
+    def __repr__(self):
+        mapped = {f: i for f, i in self.indices.items() if i is not None}
+        return f"CompiledSchema({self.schema.name!r}, {mapped})"
+
+
+SCHEMAS = (
+    # HR v2 exports ("Grouped Showname")
+    ExportSchema('hr_v2_meta_app', 'meta', 'app',
+                 signature=('Grouped Showname', 'af_start_trial_uni'),
+                 show=('Grouped Showname',), spend=('Spends_GST',),
+                 trials=('af_start_trial_uni',), cac=('Mandate_CAC',),
+                 ir=('AF_IR%',), tr=('TR%_AF',), tcr=('TCR_D0',), ctr=('CTR',)),
+    ExportSchema('hr_v2_meta_web', 'meta', 'web',
+                 signature=('Grouped Showname', 'Trial_web', 'CP_AM_CPT_D0'),
+                 show=('Grouped Showname',), spend=('Spends_GST',),
+                 trials=('Trial_web',), cac=('Mandate_CAC',),
+                 tcr=('TCR_D0',), ctr=('CTR',)),
+
+    # GJ exports ("Show_Name - APP")
+    ExportSchema('gj_meta_app', 'meta', 'app',
+                 signature=('Show_Name - APP', 'af_start_trial'),
+                 show=('Show_Name - APP',), spend=('Spends_GST',),
+                 trials=('af_start_trial',), cac=('Mandate_CAC',),
+                 ir=('AF_IR%',), tr=('TR%_AF',), tcr=('TCR_D0',), ctr=('CTR',)),
+    ExportSchema('gj_meta_web', 'meta', 'web',
+                 signature=('Show_Name - APP', 'Trial_web'),
+                 show=('Show_Name - APP',), spend=('Spends_GST',),
+                 trials=('Trial_web',), cac=('Mandate_CAC',),
+                 tcr=('TCR_D0',), ctr=('CTR',)),
+
+    # Google exports ("showname")
+    ExportSchema('google_trials', 'google', None,
+                 signature=('showname', 'start_trial_d0'),
+                 show=('showname',), spend=('Spends_GST',),
+                 trials=('start_trial_d0',), cac=('CP_AF_CPT_D0',),
+                 ir=('AF_IR%',), tr=('AF_TR%',), tcr=('AF_TCR%D0', 'AF_TCR%'), ctr=('CTR',)),
+    ExportSchema('gj_google_app', 'google', None,
+                 signature=('showname', 'CP_AF_CPT_D0'),
+                 show=('showname',), spend=('Spends_GST',),
+                 cac=('CP_AF_CPT_D0',),
+                 ir=('AF_IR%',), tr=('AF_TR%',), tcr=('AF_TCR%', 'AF_TCR%D0'), ctr=('CTR',)),
+
+    # Fallbacks for unknown layouts: every alias the generators ever accepted
+    ExportSchema('generic_meta_app', 'meta', 'app',
+                 show=('Grouped Showname', 'Show_Name - APP', 'Show_Name', 'showname', 'show'),
+                 spend=('Spends_GST', 'Spend'),
+                 trials=('af_start_trial_uni', 'af_start_trial', 'Trials'), cac=('Mandate_CAC', 'CAC'),
+                 ir=('AF_IR%', 'IR%'), tr=('TR%_AF', 'TR%'), tcr=('TCR_D0', 'TCR%'), ctr=('CTR', 'CTR%')),
+    ExportSchema('generic_meta_web', 'meta', 'web',
+                 show=('Grouped Showname', 'Show_Name - APP', 'Show_Name', 'showname', 'show'),
+                 spend=('Spends_GST', 'Spend'),
+                 trials=('Trial_web', 'af_start_trial_uni', 'Trials'), cac=('Mandate_CAC', 'CAC'),
+                 tcr=('TCR_D0', 'TCR%'), ctr=('CTR', 'CTR%')),
+    ExportSchema('generic_google', 'google', None,
+                 show=('Grouped Showname', 'Show_Name - APP', 'Show_Name', 'showname', 'show'),
+                 spend=('Spends_GST', 'Spend'),
+                 cac=('CP_AF_CPT_D0', 'CAC'),
+                 ir=('AF_IR%', 'IR%'), tr=('AF_TR%', 'TR%'), tcr=('AF_TCR%D0', 'AF_TCR%', 'TCR%'),
+                 ctr=('CTR', 'CTR%')),
+)
+
+
+def match_schema(header, channel, platform):
+    """
+    Compile the first registered schema that fits a header row.
+
+    `channel`/`platform` come from the file or sheet name; generic fallbacks
+    guarantee a match for every combination.
+    """
+    names = {cell.strip().lower() for cell in header if cell and cell.strip()}
+    for schema in SCHEMAS:
+        if schema.accepts(channel, platform) and schema.matches(names):
+            return schema.compile(header, channel, platform)
+    return None
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+STAGE Dashboard Template
+Page templates compiled once per process and rendered by filling slots.
+
+The page skeletons and the CSS/JS they share live in assets/ as plain
+files (no doubled braces).  A skeleton has two kinds of markers:
+
+    {{asset:name}}   replaced by assets/<name>, verbatim, at compile time
+    {{slot}}         filled per page by Template.render()
+
+Compiling splits a skeleton into literal chunks and slot positions, so
+rendering a page is one join of those chunks with the slot values, and no
+generated page is ever read back as a template.
+
+A page's {{scripts}} slot is itself a rendered template: <page>_scripts.html
+embeds the data and code inline, bundle_scripts.html loads them from the
+content-hashed files of a deploy bundle (see deploy_bundle).
+
+The show rows are decoded in a Web Worker (assets/worker.js) when one can
+start; single-file pages carry its source in an inert script element too.
+
+Chart.js is vendored into assets/vendor (build_dashboards.py --vendor).
+Single-file pages inline it in an inert <script type="text/plain">, which
+costs no parse time until the first chart tab runs it.  A build without the
+vendored file fails, unless STAGE_CHART_CDN=1 (build_dashboards.py --cdn)
+asks for pages that fetch the CDN build on that first chart tab instead.
+"""
+
+import html
+import json
+import os
+import re
+import urllib.request
+from functools import lru_cache
+from pathlib import Path
+
+from cac_cube import cube_json
+from cac_dataset import ShowDataset
+from cac_payload import PAGE_FIELDS, payload_gzip_script, payload_script
+from cac_rankings import build_rankings, rankings_json
+from ingest import MARKET_FOLDERS
+from insights_engine import insights_json
+from parse_cache import atomic_write
+
+ASSETS_DIR = Path(__file__).parent / 'assets'
+
+CHART_JS = 'vendor/chart.umd.min.js'
+CHART_JS_URL = 'https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.min.js'
+
+# Page code, in load order
+APP_SCRIPTS = {
+    'market': ('payload.js', 'compute.js', 'cube.js', 'dashboard.js', 'market.js'),
+    'unified': ('payload.js', 'compute.js', 'cube.js', 'dashboard.js', 'unified.js'),
+}
+WORKER_SCRIPTS = ('payload.js', 'worker.js')
+
+_MARKER = re.compile(r'\{\{(asset:)?([\w.-]+)\}\}')
+
+
+class Template:
+    """A compiled page skeleton: literal chunks with slots between them"""
+
+    __slots__ = ('name', '_chunks', '_slots')
+
+    def __init__(self, name, text):
+        self.name = name
+        chunks, slots, literal = [], [], []
+        position = 0
+        for match in _MARKER.finditer(text):
+            literal.append(text[position:match.start()])
+            position = match.end()
+            if match.group(1):
+                literal.append(asset(match.group(2)))
+            else:
+                chunks.append(''.join(literal))
+                literal = []
+                slots.append((len(chunks), match.group(2)))
+                chunks.append('')
+        literal.append(text[position:])
+        chunks.append(''.join(literal))
+        self._chunks = tuple(chunks)
+        self._slots = tuple(slots)
+
+    @property
+    def slots(self):
+        return sorted({name for _, name in self._slots})
+
+    def render(self, **values):
+        """The page with every slot filled; all slots are required"""
+        missing = [name for name in self.slots if name not in values]
+        if missing:
+            raise KeyError(f"{self.name}: missing slot(s) {', '.join(missing)}")
+        parts = list(self._chunks)
+        for position, name in self._slots:
+            parts[position] = str(values[name])
+        return ''.join(parts)
+
+    def __repr__(self):
+        return f"Template({self.name!r}, slots={self.slots})"
+
+
+@lru_cache(maxsize=None)
+def asset(name):
+    """Text of one file in assets/"""
+    return (ASSETS_DIR / name).read_text(encoding='utf-8')
+
+
+@lru_cache(maxsize=None)
+def load_template(name):
+    """Compiled template of assets/<name>, cached for the process"""
+    return Template(name, asset(name))
+
+
+def asset_names():
+    """Every asset file, for build keys"""
+    return sorted(path.name for path in ASSETS_DIR.iterdir() if path.is_file())
+
+
+def chart_cdn_allowed():
+    return os.environ.get('STAGE_CHART_CDN', '') not in ('', '0')
+
+
+def chart_library():
+    """
+    Vendored Chart.js source; None when STAGE_CHART_CDN is set and it has not
+    been fetched (pages then load the CDN build).  Raises FileNotFoundError
+    otherwise, so a build never drops to the CDN unnoticed.
+    """
+    path = ASSETS_DIR / CHART_JS
+    if path.exists():
+        return asset(CHART_JS)
+    if chart_cdn_allowed():
+        return None
+    raise FileNotFoundError(f"Chart.js is not vendored ({path}): run build_dashboards.py --vendor, "
+                            f"or set STAGE_CHART_CDN=1 to load it from {CHART_JS_URL}")
+
+
+def vendor_chart_library(url=CHART_JS_URL):
+    """Download the pinned Chart.js build into assets/vendor"""
+    with urllib.request.urlopen(url, timeout=30) as response:
+        data = response.read()
+    if b'Chart' not in data:
+        raise ValueError(f"{url} does not look like a Chart.js build")
+    path = ASSETS_DIR / CHART_JS
+    atomic_write(path, data)
+    asset.cache_clear()
+    return path
+
+
+@lru_cache(maxsize=None)
+def app_js(page):
+    """The code of a page ('market' or 'unified') as one script"""
+    return '\n'.join(asset(name) for name in APP_SCRIPTS[page])
+
+
+@lru_cache(maxsize=None)
+def worker_js():
+    """The compute worker as one script"""
+    return '\n'.join(asset(name) for name in WORKER_SCRIPTS)
+
+
+# ----------------------------------------------------------------------
+# Pages
+# ----------------------------------------------------------------------
+
+def script_json(text):
+    """JSON text made safe to embed in a <script> element"""
+    return text.replace('</', '<\\/')
+
+
+def inert_script(source):
+    """Script source made safe inside <script type="text/plain">"""
+    return re.sub(r'(?i)</(script)', r'<\\/\1', source).replace('<!--', '<\\!--')
+
+
+def _chart_slots(src=None):
+    # A bundle passes its own Chart.js file; single-file pages inline it
+    if src:
+        return {'chart_src': html.escape(src), 'chart_inline': ''}
+    source = chart_library()
+    return {'chart_src': CHART_JS_URL, 'chart_inline': inert_script(source) if source else ''}
+
+
+def market_code(market):
+    """Short market code, e.g. 'HR' for haryanvi (from its export folder)"""
+    folder = MARKET_FOLDERS.get(market)
+    return folder.split()[0] if folder else market[:2].upper()
+
+
+def _payload(data, compress, group=None):
+    return (payload_gzip_script if compress else payload_script)(data, PAGE_FIELDS, group, orders=True)
+
+
+def market_label(market):
+    """Display label of a market, e.g. 'Haryanvi (HR)'"""
+    return f"{market.capitalize()} ({market_code(market)})"
+
+
+def unified_dataset(markets_data):
+    """One dataset of {market: dataset}, each row tagged with its market"""
+    return ShowDataset.concat(ShowDataset().extend(data).set_dimension('market', market)
+                              for market, data in markets_data.items())
+
+
+def _market_buttons(markets):
+    buttons = []
+    for idx, market in enumerate(markets):
+        active = "active" if idx == 0 else ""
+        buttons.append(f'<button class="market-btn {active}" data-market="{html.escape(market)}">'
+                       f'{html.escape(market.capitalize())} ({market_code(market)})</button>')
+    return '\n                '.join(buttons)
+
+
+def _bundle_scripts(bundle):
+    return load_template('bundle_scripts.html').render(
+        bundle_json=script_json(json.dumps(bundle, ensure_ascii=False)))
+
+
+def _market_shell(market, row_count, scripts, chart_src=None):
+    display = market.capitalize()
+    return load_template('market.html').render(
+        market_display=html.escape(display),
+        market_badge=html.escape(display.upper()),
+        row_count=row_count,
+        scripts=scripts,
+        **_chart_slots(chart_src),
+    )
+
+
+def render_market_page(data, market, compress=False):
+    """Single-market dashboard of one dataset; `compress` embeds the rows gzipped"""
+    rankings = build_rankings(data)
+    scripts = load_template('market_scripts.html').render(
+        data_payload=_payload(data, compress),
+        cube_json=script_json(cube_json(data)),
+        rankings_json=script_json(rankings_json(data, rankings)),
+        insights_json=script_json(insights_json(data, rankings=rankings)),
+        market_label=script_json(json.dumps(market_label(market), ensure_ascii=False)),
+        app_js=app_js('market'),
+        worker_js=inert_script(worker_js()),
+    )
+    return _market_shell(market, len(data), scripts)
+
+
+def render_market_shell(market, bundle, chart_src=CHART_JS_URL):
+    """Single-market page of a deploy bundle: markup and loader, no data"""
+    return _market_shell(market, '<span id="rowCount">…</span>', _bundle_scripts(bundle), chart_src)
+
+
+def render_unified_page(markets_data, compress=False):
+    """Multi-market dashboard of {market: dataset}, first market selected"""
+    cube_data = unified_dataset(markets_data)
+    rankings = build_rankings(cube_data)
+    scripts = load_template('unified_scripts.html').render(
+        markets_payload=_payload(cube_data, compress, group='market'),
+        cube_json=script_json(cube_json(cube_data)),
+        rankings_json=script_json(rankings_json(cube_data, rankings)),
+        insights_json=script_json(insights_json(cube_data, rankings=rankings)),
+        first_market=script_json(json.dumps(next(iter(markets_data), ''), ensure_ascii=False)),
+        app_js=app_js('unified'),
+        worker_js=inert_script(worker_js()),
+    )
+    return load_template('unified.html').render(market_buttons=_market_buttons(markets_data),
+                                                scripts=scripts, **_chart_slots())
+
+
+def render_unified_shell(markets, bundle, chart_src=CHART_JS_URL):
+    """Multi-market page of a deploy bundle, first market selected"""
+    return load_template('unified.html').render(market_buttons=_market_buttons(markets),
+                                                scripts=_bundle_scripts(bundle),
+                                                **_chart_slots(chart_src))
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+STAGE Deploy Bundle
+The dashboards as small HTML shells plus content-hashed data files.
+
+    dist/
+      dashboard_unified.html, dashboard_<market>.html   shells: markup and a loader
+      app-market.<hash>.js, app-unified.<hash>.js       page code
+      app-worker.<hash>.js                              compute worker
+      vendor/chart.umd.min.<hash>.js                    Chart.js, when vendored
+      data/<market>-<week>.<hash>.json                  rows of one market and week, with sort orders
+      data/<page>-cube.<hash>.json                      rollups of a page (cac_cube)
+      data/<page>-rankings.<hash>.json                  top-K and health buckets (cac_rankings)
+      data/<page>-insights.<hash>.json                  insights of a page
+      manifest.json                                     the files each page is made of
+      sw.js, vercel.json                                service worker, cache headers
+
+A hashed file never changes, so it is served `immutable` and the service
+worker fetches it once; only the shells, manifest.json and sw.js are
+revalidated.  A new export week adds one shard per market (plus the page
+rollups, rankings and insights), so a repeat visit downloads just those.  Files listed
+by neither the new nor the previous manifest are removed.
+
+Chart.js must be vendored (build_dashboards.py --vendor) unless --cdn
+(STAGE_CHART_CDN=1) points the shells at the CDN build.
+
+Usage: python3 deploy_bundle.py [--out DIR] [--workers N] [--cdn]
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+from cac_cube import cube_json
+from cac_payload import PAGE_FIELDS, payload_json
+from cac_rankings import build_rankings, rankings_json
+from dashboard_template import (CHART_JS_URL, app_js, asset, chart_library, market_label,
+                                render_market_shell, render_unified_shell, unified_dataset,
+                                worker_js)
+from ingest import MARKET_FOLDERS, ingest_folder, parse_workers_arg
+from insights_engine import insights_json
+from parse_cache import atomic_write
+
+BASE_PATH = Path(__file__).parent
+DIST_DIR = BASE_PATH / 'dist'
+
+MANIFEST = 'manifest.json'
+SERVICE_WORKER = 'sw.js'
+HASH_LENGTH = 12  # hex digits in hashed file names; assets/sw.js matches on it
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=0, must-revalidate'
+
+
+def _slug(text):
+    return re.sub(r'[^\w.-]+', '_', str(text)) or '_'
+
+
+def hashed_name(stem, data, suffix):
+    """File name carrying the first HASH_LENGTH hex digits of its content hash"""
+    return f"{_slug(stem)}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{suffix}"
+
+
+def headers_config():
+    """vercel.json of a bundle: hashed files immutable, everything else revalidated"""
+    return {
+        'version': 2,
+        'name': 'stage-performance-dashboard',
+        'rewrites': [{'source': '/', 'destination': '/dashboard_unified.html'}],
+        'headers': [
+            {'source': '/data/(.*)', 'headers': [{'key': 'Cache-Control', 'value': IMMUTABLE}]},
+            {'source': '/app-(.*).js', 'headers': [{'key': 'Cache-Control', 'value': IMMUTABLE}]},
+            {'source': '/vendor/(.*)', 'headers': [{'key': 'Cache-Control', 'value': IMMUTABLE}]},
+            {'source': f'/{MANIFEST}', 'headers': [{'key': 'Cache-Control', 'value': REVALIDATE}]},
+            {'source': f'/{SERVICE_WORKER}', 'headers': [{'key': 'Cache-Control', 'value': REVALIDATE}]},
+            {'source': '/(.*).html', 'headers': [{'key': 'Cache-Control', 'value': REVALIDATE}]},
+        ],
+    }
+
+
+class Bundle:
+    """Files of one deploy bundle, written into out_dir"""
+
+    def __init__(self, out_dir=DIST_DIR):
+        self.out_dir = Path(out_dir)
+        self.files = {}  # relative path -> bytes
+        self.written = []
+        self.reused = []
+        self.removed = []
+
+    def add(self, path, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self.files[path] = data
+        return path
+
+    def add_hashed(self, stem, data, suffix='.json', folder='data'):
+        """Add a content-addressed file; returns its path relative to the bundle"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        name = hashed_name(stem, data, suffix)
+        return self.add(f"{folder}/{name}" if folder else name, data)
+
+    def _previous_files(self):
+        try:
+            manifest = json.loads((self.out_dir / MANIFEST).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return set()
+        return set(manifest.get('files', ()))
+
+    def write(self):
+        """Write new files, then the manifest, then drop files nothing lists any more"""
+        previous = self._previous_files()
+        for path, data in self.files.items():
+            target = self.out_dir / path
+            # A hashed file that exists already holds these bytes
+            if target.exists() and target.read_bytes() == data:
+                self.reused.append(path)
+                continue
+            atomic_write(target, data)
+            self.written.append(path)
+
+        # Files of the previous build stay one more round for pages still open
+        for path in sorted(self._hashed_on_disk() - set(self.files) - previous):
+            (self.out_dir / path).unlink()
+            self.removed.append(path)
+        return self
+
+    def _hashed_on_disk(self):
+        pattern = re.compile(rf"\.[0-9a-f]{{{HASH_LENGTH}}}\.(js|json)$")
+        return {path.relative_to(self.out_dir).as_posix()
+                for path in self.out_dir.rglob('*') if path.is_file() and pattern.search(path.name)}
+
+
+def build_bundle(markets_data, out_dir=DIST_DIR):
+    """Deploy bundle of {market: dataset}; returns the written Bundle"""
+    bundle = Bundle(out_dir)
+    manifest = {'version': 1, 'markets': {}, 'pages': {}}
+
+    for market, data in markets_data.items():
+        weeks = []
+        for (week,), rows in data.group_by('week').items():
+            path = bundle.add_hashed(f"{market}-{week}", payload_json(rows, PAGE_FIELDS, group='market', orders=True))
+            weeks.append({'week': week, 'rows': len(rows), 'file': path})
+        manifest['markets'][market] = {'label': market_label(market), 'weeks': weeks}
+
+    apps = {page: bundle.add_hashed(f"app-{page}", app_js(page), '.js', folder='')
+            for page in ('market', 'unified')}
+    worker = bundle.add_hashed('app-worker', worker_js(), '.js', folder='')
+    chart = chart_library()
+    chart_src = bundle.add_hashed('chart.umd.min', chart, '.js', folder='vendor') if chart else CHART_JS_URL
+
+    def add_page(name, markets, data, app):
+        """Hashed rollups, rankings and insights of a page; returns the config its shell embeds"""
+        rankings = build_rankings(data)
+        manifest['pages'][name] = {
+            'markets': list(markets),
+            'cube': bundle.add_hashed(f"{name}-cube", cube_json(data)),
+            'rankings': bundle.add_hashed(f"{name}-rankings", rankings_json(data, rankings)),
+            'insights': bundle.add_hashed(f"{name}-insights", insights_json(data, rankings=rankings)),
+        }
+        return {'manifest': MANIFEST, 'serviceWorker': SERVICE_WORKER, 'page': name, 'app': apps[app],
+                'worker': worker}
+
+    for market, data in markets_data.items():
+        config = add_page(market, [market], data, 'market')
+        bundle.add(f"dashboard_{market}.html", render_market_shell(market, config, chart_src))
+    if markets_data:
+        config = add_page('unified', markets_data, unified_dataset(markets_data), 'unified')
+        bundle.add('dashboard_unified.html', render_unified_shell(markets_data, config, chart_src))
+
+    bundle.add(SERVICE_WORKER, asset('sw.js'))
+    bundle.add('vercel.json', json.dumps(headers_config(), indent=2) + '\n')
+    manifest['files'] = sorted(bundle.files)
+    bundle.add(MANIFEST, json.dumps(manifest, indent=2, ensure_ascii=False) + '\n')
+    return bundle.write()
+
+
+def main():
+    argv = sys.argv[1:]
+    workers = parse_workers_arg(argv)
+    out_dir = Path(argv[argv.index('--out') + 1]) if '--out' in argv[:-1] else DIST_DIR
+
+    print("=" * 60)
+    print("📦 STAGE Deploy Bundle")
+    print("=" * 60)
+
+    if '--cdn' in argv:
+        os.environ['STAGE_CHART_CDN'] = '1'
+    try:
+        chart_library()
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    markets = {}
+    for market, folder in MARKET_FOLDERS.items():
+        folder_path = BASE_PATH / folder
+        if not folder_path.exists():
+            continue
+        result = ingest_folder(folder_path, market, workers)
+        for name, error in result.errors:
+            print(f"❌ ERROR parsing {name}: {error}")
+        if result.dataset:
+            markets[market] = result.dataset
+            print(f"✅ Loaded {market.capitalize()}: {len(result.dataset)} shows")
+
+    if not markets:
+        print("\n❌ No market data found!")
+        sys.exit(1)
+
+    bundle = build_bundle(markets, out_dir)
+    print(f"\n✅ Bundle written to {bundle.out_dir}")
+    print(f"   {len(bundle.written)} written, {len(bundle.reused)} unchanged, "
+          f"{len(bundle.removed)} removed")
+    print("\n💡 Deploy the folder as is (vercel deploy --prod from inside it)")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
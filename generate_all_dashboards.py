@@ -4,16 +4,19 @@ STAGE Performance Dashboard Generator - Multi-Market Support
 Generates separate dashboards for each market from their respective CSV folders.
 """
 
-import csv
-import json
-import os
 import sys
 from pathlib import Path
 
-# Import the existing functions
-import generate_dashboard
+from dashboard_template import render_market_page
+from history_store import load_market, parse_history_args
+from ingest import find_exports, ingest_files, parse_workers_arg, print_report
+from parse_cache import atomic_write
 
 def main():
+    workers = parse_workers_arg(sys.argv[1:])
+    use_history, weeks = parse_history_args(sys.argv[1:])
+    compress = '--compress' in sys.argv[1:]
+
     print("=" * 60)
     print("📊 STAGE Multi-Market Dashboard Generator")
     print("=" * 60)
@@ -33,7 +36,7 @@ def main():
     for market, folder in markets.items():
         folder_path = base_path / folder
         if folder_path.exists():
-            csv_files = list(folder_path.glob("*.csv")) + list(folder_path.glob("*.xlsx"))
+            csv_files = find_exports(folder_path)
             if csv_files:
                 available_markets[market] = folder
                 print(f"✅ Found {market.capitalize()} market data in '{folder}' ({len(csv_files)} files)")
@@ -43,7 +46,7 @@ def main():
         print("\nExpected folder structure:")
         for market, folder in markets.items():
             print(f"  - {folder}/ (for {market.capitalize()} market)")
-        print("\nPlease create folders and add your CSV files.")
+        print("\nPlease create folders and add your CSV or XLSX files.")
         return
 
     print(f"\n🔍 Processing {len(available_markets)} markets...")
@@ -55,22 +58,21 @@ def main():
         print(f"{'='*60}")
 
         csv_folder = base_path / folder
-        csv_files = list(csv_folder.glob("*.csv"))
+        csv_files = find_exports(csv_folder)
 
         if not csv_files:
-            print(f"⚠️ No CSV files found in {folder}, skipping...")
+            print(f"⚠️ No CSV/XLSX files found in {folder}, skipping...")
             continue
 
-        # Parse all CSV files for this market
-        all_data = []
-        for csv_file in csv_files:
-            try:
-                print(f"\n📄 Processing: {csv_file.name}")
-                data = generate_dashboard.parse_csv_file(csv_file)
-                all_data.extend(data)
-            except Exception as e:
-                print(f"❌ ERROR parsing {csv_file.name}: {e}")
-                continue
+        # Parse all CSV/XLSX files for this market (one process per file)
+        print(f"\n📄 Processing {len(csv_files)} files...")
+        if use_history:
+            all_data = load_market(csv_folder, market, weeks)
+            print(f"   ✓ History store: {len(all_data)} rows" + (f" (latest {weeks} weeks)" if weeks else ""))
+        else:
+            result = ingest_files(csv_files, market, workers)
+            print_report(result)
+            all_data = result.dataset
 
         if not all_data:
             print(f"❌ No data extracted for {market}, skipping...")
@@ -80,12 +82,11 @@ def main():
 
         # Generate HTML dashboard
         print(f"🔨 Generating HTML dashboard for {market}...")
-        html_content = generate_dashboard_html_for_market(all_data, market)
+        html_content = generate_dashboard_html_for_market(all_data, market, compress)
 
         # Write to file
         output_file = base_path / f"dashboard_{market}.html"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        atomic_write(output_file, html_content.encode('utf-8'))
 
         print(f"✅ Dashboard created: {output_file.name}")
 
@@ -97,154 +98,12 @@ def main():
         print(f"  - dashboard_{market}.html (open in browser)")
     print("\n💡 To update dashboards:")
     print("  1. Replace CSV files in respective folders")
-    print("  2. Run: python3 generate_all_dashboards.py")
+    print("  2. Run: python3 generate_all_dashboards.py [--workers N] [--history [--weeks N]] [--compress]")
     print("=" * 60)
 
-def generate_dashboard_html_for_market(all_data, market_name):
+def generate_dashboard_html_for_market(all_data, market_name, compress=False):
     """Generate HTML dashboard for specific market"""
-    market_display = market_name.capitalize()
-
-    # Use the template from generate_dashboard.py but customize market name
-    html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>STAGE Performance Dashboard - {market_display} Market</title>
-    <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.min.js"></script>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; background: #f5f5f5; }}
-        .container {{ max-width: 1400px; margin: 0 auto; padding: 20px; }}
-        .header {{ background: white; padding: 25px 30px; border-radius: 10px; margin-bottom: 20px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); display: flex; justify-content: space-between; align-items: center; }}
-        .header h1 {{ color: #2563eb; font-size: 24px; }}
-        .header p {{ color: #666; font-size: 14px; margin-top: 5px; }}
-        .market-badge {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 8px 16px; border-radius: 20px; font-weight: 600; font-size: 14px; }}
-        .success {{ background: #f0fdf4; color: #15803d; padding: 15px 20px; border-radius: 8px; margin-bottom: 20px; border-left: 4px solid #22c55e; font-size: 14px; }}
-        .tab-nav {{ display: flex; gap: 10px; margin-bottom: 20px; background: white; padding: 15px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); overflow-x: auto; }}
-        .tab-btn {{ padding: 10px 20px; border: none; background: transparent; color: #666; font-weight: 500; cursor: pointer; border-radius: 6px; transition: all 0.2s; white-space: nowrap; }}
-        .tab-btn:hover {{ background: #f3f4f6; color: #2563eb; }}
-        .tab-btn.active {{ background: #2563eb; color: white; }}
-        .tab-content {{ display: none; }}
-        .tab-content.active {{ display: block; }}
-        .metrics-grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(220px, 1fr)); gap: 20px; margin-bottom: 20px; }}
-        .metric-card {{ background: white; padding: 20px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); border-left: 4px solid #2563eb; }}
-        .metric-card.healthy {{ border-left-color: #10b981; }}
-        .metric-card.unhealthy {{ border-left-color: #ef4444; }}
-        .metric-label {{ font-size: 13px; color: #666; margin-bottom: 8px; font-weight: 500; }}
-        .metric-value {{ font-size: 28px; font-weight: 700; color: #111; margin-bottom: 5px; }}
-        .metric-status {{ font-size: 12px; font-weight: 600; }}
-        .metric-status.healthy {{ color: #10b981; }}
-        .metric-status.unhealthy {{ color: #ef4444; }}
-        .chart-section {{ background: white; border-radius: 10px; padding: 30px; margin-bottom: 20px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-        .chart-title {{ font-size: 18px; font-weight: 600; color: #111; margin-bottom: 20px; }}
-        .chart-container {{ position: relative; height: 400px; }}
-        .shows-table {{ background: white; border-radius: 10px; padding: 30px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-        table {{ width: 100%; border-collapse: collapse; }}
-        th {{ background: #f3f4f6; padding: 12px; text-align: left; font-weight: 600; font-size: 13px; color: #374151; border-bottom: 2px solid #e5e7eb; cursor: pointer; }}
-        th:hover {{ background: #e5e7eb; }}
-        td {{ padding: 12px; border-bottom: 1px solid #e5e7eb; font-size: 14px; }}
-        tr:hover {{ background: #f9fafb; }}
-        .channel-badge {{ display: inline-block; padding: 4px 8px; border-radius: 4px; font-size: 11px; font-weight: 600; text-transform: uppercase; }}
-        .channel-meta {{ background: #dbeafe; color: #1e40af; }}
-        .channel-google {{ background: #d1fae5; color: #065f46; }}
-        .insight-card {{ background: white; border-radius: 10px; padding: 25px; margin-bottom: 20px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); border-left: 5px solid #2563eb; }}
-        .insight-card.high {{ border-left-color: #ef4444; }}
-        .insight-card.medium {{ border-left-color: #f59e0b; }}
-        .insight-card.low {{ border-left-color: #10b981; }}
-        .insight-badge {{ display: inline-block; padding: 6px 12px; border-radius: 6px; font-size: 11px; font-weight: 700; text-transform: uppercase; margin-bottom: 15px; }}
-        .insight-badge.high {{ background: #fee2e2; color: #991b1b; }}
-        .insight-badge.medium {{ background: #fef3c7; color: #92400e; }}
-        .insight-badge.low {{ background: #d1fae5; color: #065f46; }}
-        .insight-title {{ font-size: 18px; font-weight: 700; color: #111; margin-bottom: 15px; line-height: 1.4; }}
-        .insight-analysis {{ font-size: 14px; color: #374151; margin-bottom: 15px; line-height: 1.7; }}
-        .insight-recommendation {{ background: #f9fafb; padding: 15px; border-radius: 8px; border-left: 3px solid #2563eb; margin-top: 15px; }}
-        .insight-recommendation strong {{ color: #2563eb; }}
-        .insight-impact {{ background: #1f2937; color: white; padding: 12px; border-radius: 6px; margin-top: 15px; font-size: 13px; }}
-        .insight-impact strong {{ color: #60a5fa; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <div>
-                <h1>📊 STAGE Performance Dashboard</h1>
-                <p>{market_display} Market • Data Pre-Loaded ✅</p>
-            </div>
-            <div class="market-badge">{market_display.upper()}</div>
-        </div>
-        <div class="success">
-            ✅ Dashboard generated with {len(all_data)} show records • No file upload needed!
-        </div>
-        <div class="tab-nav">
-            <button class="tab-btn active" data-tab="overall">📈 Overall Performance</button>
-            <button class="tab-btn" data-tab="channel">🎯 Channel Analysis</button>
-            <button class="tab-btn" data-tab="platform">💻 Platform Breakdown</button>
-            <button class="tab-btn" data-tab="shows">🎬 Show Performance</button>
-            <button class="tab-btn" data-tab="insights">🤖 AI Insights</button>
-        </div>
-        <div id="tab-overall" class="tab-content active">
-            <div class="metrics-grid" id="metricsGrid"></div>
-        </div>
-        <div id="tab-channel" class="tab-content">
-            <div class="chart-section">
-                <div class="chart-title">📊 Channel Performance: Meta vs Google</div>
-                <div class="chart-container"><canvas id="channelChart"></canvas></div>
-            </div>
-        </div>
-        <div id="tab-platform" class="tab-content">
-            <div class="chart-section">
-                <div class="chart-title">💻 Platform Performance: App vs Web</div>
-                <div class="chart-container"><canvas id="platformChart"></canvas></div>
-            </div>
-        </div>
-        <div id="tab-shows" class="tab-content">
-            <div class="shows-table">
-                <div class="chart-title">📈 Show Performance Details</div>
-                <table id="showsTable">
-                    <thead>
-                        <tr>
-                            <th onclick="sortTable(0)">Show ↕</th>
-                            <th onclick="sortTable(1)">Channel ↕</th>
-                            <th onclick="sortTable(2)">Platform ↕</th>
-                            <th onclick="sortTable(3)">Spend (₹) ↕</th>
-                            <th onclick="sortTable(4)">Trials ↕</th>
-                            <th onclick="sortTable(5)">CAC (₹) ↕</th>
-                            <th onclick="sortTable(6)">IR% ↕</th>
-                            <th onclick="sortTable(7)">TR% ↕</th>
-                            <th onclick="sortTable(8)">TCR% ↕</th>
-                            <th onclick="sortTable(9)">CTR% ↕</th>
-                        </tr>
-                    </thead>
-                    <tbody id="showsTableBody"></tbody>
-                </table>
-            </div>
-        </div>
-        <div id="tab-insights" class="tab-content">
-            <div class="chart-section" style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; margin-bottom: 20px;">
-                <div style="text-align: center;">
-                    <div style="font-size: 48px; margin-bottom: 10px;">🤖</div>
-                    <div class="chart-title" style="color: white; margin-bottom: 10px;">AI-Powered Insights & Recommendations</div>
-                    <p style="opacity: 0.9; font-size: 14px;">Executive-level analysis • C-suite quality • Actionable recommendations</p>
-                </div>
-            </div>
-            <div id="insightsContainer"></div>
-        </div>
-    </div>
-    <script>
-        const DATA = {json.dumps(all_data, indent=8)};
-        let currentSortCol = 4;
-        let sortAsc = false;
-
-        // [Include all the JavaScript functions from the original - calculateMetrics, renderMetrics, renderChannelChart, renderPlatformChart, renderTable, sortTable, generateInsights, renderInsights]
-        // For brevity, I'll note that the full JS code should be included here from the original template
-    </script>
-</body>
-</html>"""
-
-    # Note: In a real implementation, you'd include all the JavaScript code here
-    # For now, returning the template structure
-    return html
+    return render_market_page(all_data, market_name, compress)
 
 if __name__ == "__main__":
     main()
@@ -16,9 +16,9 @@ if [ ! -d "HR Cac Solver" ]; then
     exit 1
 fi
 
-# Check if CSV files exist
-if ! ls "HR Cac Solver"/*.csv 1> /dev/null 2>&1; then
-    echo "❌ ERROR: No CSV files found in 'HR Cac Solver' folder!"
+# Check if CSV/XLSX files exist
+if ! ls "HR Cac Solver"/*.csv 1> /dev/null 2>&1 && ! ls "HR Cac Solver"/*.xlsx 1> /dev/null 2>&1; then
+    echo "❌ ERROR: No CSV or XLSX files found in 'HR Cac Solver' folder!"
     echo ""
     echo "Please add your Haryanvi CSV files to the folder."
     echo ""
@@ -26,25 +26,15 @@ if ! ls "HR Cac Solver"/*.csv 1> /dev/null 2>&1; then
 fi
 
 echo "✅ Found HR Cac Solver folder"
-echo "✅ Found CSV files"
+echo "✅ Found export files"
 echo ""
 
-# Temporarily replace GJ folder reference in Python script
+# Build only the Haryanvi page (skipped when nothing changed)
 echo "🔨 Generating dashboard..."
 
-# Create a temporary modified script
-sed 's/GJ Cac Solver/HR Cac Solver/g' generate_dashboard.py > temp_hr_generate.py
-sed -i '' 's/Gujarati Market/Haryanvi Market/g' temp_hr_generate.py
-sed -i '' 's/Gujarati (GJ)/Haryanvi (HR)/g' temp_hr_generate.py
-
-# Run the modified script
-python3 temp_hr_generate.py
-
-# Rename output
-if [ -f "dashboard_generated.html" ]; then
-    mv dashboard_generated.html dashboard_haryanvi.html
+if python3 build_dashboards.py haryanvi; then
     echo ""
-    echo "✅ SUCCESS! Haryanvi dashboard created: dashboard_haryanvi.html"
+    echo "✅ SUCCESS! Haryanvi dashboard ready: dashboard_haryanvi.html"
     echo ""
     echo "🎉 To view:"
     echo "   open dashboard_haryanvi.html"
@@ -52,7 +42,4 @@ else
     echo "❌ Error: Dashboard generation failed"
 fi
 
-# Cleanup
-rm -f temp_hr_generate.py
-
 echo "=========================================="
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+STAGE History Store
+Week-by-week warehouse of every parsed export, in a local SQLite file.
+
+Each (section, week) block of an export is written to `shows` as a whole,
+duplicate show rows included, just as the page generators read it.  Loading
+is idempotent: a file whose last load for the market had the same content
+hash is skipped without being parsed.  When a file's content changes (or is
+reverted) its earlier rows are dropped and it is loaded again, and a newer
+export of the same week replaces that block's rows, so restated numbers win
+and dropped shows disappear.
+
+Rows are keyed by (market, section, week_start, channel, platform, show) in
+spirit, but an export can list a show twice in one block and the generators
+count both, so the primary key ends in the row's position within its export
+instead of the show name; per-show lookups go through the trend index.
+
+Every newly loaded export is also fed, week by week, through the anomaly
+detector, whose running per-series statistics live in the same file; an
+export that backfills or restates a week re-scores the market's history.
+
+The generators can load a market's history (optionally the latest N weeks)
+straight from here instead of re-parsing the CSVs.  A file that fails to
+parse is reported and skipped; the rest of the folder still loads.
+
+Usage: python3 history_store.py [market ...]
+"""
+
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+from anomaly_detector import STATE_TABLES, AnomalyDetector, batch_rows
+from cac_dataset import ShowDataset
+from cac_numbers import finite_or_none
+from cac_reader import DEFAULT_SECTION
+from ingest import MARKET_FOLDERS, find_exports, iter_export_batches
+from parse_cache import default_cache
+
+DEFAULT_DB = Path(__file__).parent / '.cache' / 'history.db'
+
+# Bump whenever the tables change; older stores are rebuilt
+STORE_VERSION = 3
+
+MEASURE_COLUMNS = ('spend', 'trials', 'cac', 'ir', 'tr', 'tcr', 'ctr')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS exports (
+    id INTEGER PRIMARY KEY,
+    market TEXT NOT NULL,
+    name TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    loaded_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS exports_by_file ON exports (market, name, id);
+
+CREATE TABLE IF NOT EXISTS shows (
+    market TEXT NOT NULL,
+    section TEXT NOT NULL,
+    week_start TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    show TEXT NOT NULL,
+    week_end TEXT NOT NULL,
+    spend REAL NOT NULL,
+    trials REAL NOT NULL,
+    cac REAL,
+    ir REAL,
+    tr REAL,
+    tcr REAL,
+    ctr REAL,
+    export_id INTEGER NOT NULL REFERENCES exports(id),
+    position INTEGER NOT NULL,
+    PRIMARY KEY (market, section, week_start, channel, platform, position)
+) WITHOUT ROWID;
+
+-- Week-over-week and per-market week lists use the primary key order
+-- directly; these cover the per-show trend and cross-market week queries.
+CREATE INDEX IF NOT EXISTS shows_show_trend
+    ON shows (market, section, show, week_start, channel, platform,
+              spend, trials, cac, ir, tr, tcr, ctr);
+CREATE INDEX IF NOT EXISTS shows_week_markets
+    ON shows (section, week_start, market, channel, platform, spend, trials);
+"""
+
+_INSERT = """
+INSERT INTO shows (market, section, week_start, channel, platform, show, week_end,
+                   spend, trials, cac, ir, tr, tcr, ctr, export_id, position)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class HistoryStore:
+    """SQLite warehouse of show metrics by market, section and week"""
+
+    def __init__(self, path=None):
+        self.path = Path(path or os.environ.get('STAGE_HISTORY_DB') or DEFAULT_DB)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self._migrate()
+        self.anomalies = AnomalyDetector(self.db)
+
+    def _migrate(self):
+        version = self.db.execute('PRAGMA user_version').fetchone()[0]
+        if version != STORE_VERSION:
+            with self.db:
+                for table in ('shows', 'exports') + STATE_TABLES:
+                    self.db.execute(f'DROP TABLE IF EXISTS {table}')
+        with self.db:
+            self.db.executescript(_SCHEMA)
+            self.db.execute(f'PRAGMA user_version = {STORE_VERSION}')
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def has_export(self, market, name, digest):
+        """True if the last load of file `name` for the market had this content hash"""
+        row = self.db.execute('SELECT sha256 FROM exports WHERE market = ? AND name = ? '
+                              'ORDER BY id DESC LIMIT 1', (market, name)).fetchone()
+        return row is not None and row[0] == digest
+
+    def ingest_file(self, filepath, market):
+        """
+        Write every block of one export; returns the rows written, or None
+        if the file is unchanged since its last load for the market.
+        """
+        name = Path(filepath).name
+        digest = default_cache().content_hash(filepath)
+        if self.has_export(market, name, digest):
+            return None
+
+        batches = [batch for batch in iter_export_batches(filepath) if batch.data]
+        with self.db:
+            cursor = self.db.execute(
+                'INSERT INTO exports (market, name, sha256, size, rows, loaded_at) '
+                'VALUES (?, ?, ?, ?, 0, ?)',
+                (market, name, digest, os.path.getsize(filepath), time.time()))
+            export_id = cursor.lastrowid
+
+            # A changed file replaces whatever its earlier content loaded ...
+            self.db.execute('DELETE FROM shows WHERE export_id IN '
+                            '(SELECT id FROM exports WHERE market = ? AND name = ? AND id != ?)',
+                            (market, name, export_id))
+            # ... and the export is the authority for each block it contains
+            blocks = {(batch.section, batch.week_start or '', row.channel, row.platform)
+                      for batch in batches for row in batch.data}
+            self.db.executemany(
+                'DELETE FROM shows WHERE market = ? AND section = ? AND week_start = ? '
+                'AND channel = ? AND platform = ?',
+                [(market,) + block for block in blocks])
+
+            rows = []
+            for batch in batches:
+                week_start, week_end = batch.week_start or '', batch.week_end or ''
+                for row in batch.data:
+                    measures = [finite_or_none(getattr(row, name)) for name in MEASURE_COLUMNS]
+                    rows.append((market, batch.section, week_start, row.channel, row.platform,
+                                 row.show, week_end, *measures, export_id, len(rows)))
+            self.db.executemany(_INSERT, rows)
+            self.db.execute('UPDATE exports SET rows = ? WHERE id = ?', (len(rows), export_id))
+
+            # Weeks are scored oldest first; a week a series has already seen means
+            # the export backfills or restates history, so the market is replayed
+            for week_start, week_rows in sorted(batch_rows(batches).items()):
+                self.anomalies.observe(market, week_start, week_rows)
+            if any(late == market for late, _ in self.anomalies.late):
+                self.anomalies.replay(market, self.load_dataset(market))
+            self.anomalies.flush()
+        return len(rows)
+
+    def ingest_folder(self, folder, market):
+        """
+        Load every export of a market folder.  Returns (files, errors):
+        (file name, rows or None) pairs and (file name, error message) pairs.
+        """
+        files, errors = [], []
+        for path in find_exports(folder):
+            try:
+                files.append((path.name, self.ingest_file(path, market)))
+            except Exception as e:
+                errors.append((path.name, f"{type(e).__name__}: {e}"))
+        return files, errors
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def markets(self):
+        return [row[0] for row in self.db.execute('SELECT DISTINCT market FROM exports ORDER BY market')]
+
+    def weeks(self, market, section=DEFAULT_SECTION, limit=None):
+        """Week start dates of a market, newest first"""
+        sql = ('SELECT DISTINCT week_start FROM shows WHERE market = ? AND section = ? '
+               'ORDER BY week_start DESC')
+        params = [market, section]
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return [row[0] for row in self.db.execute(sql, params)]
+
+    def load_dataset(self, market, section=DEFAULT_SECTION, weeks=None):
+        """
+        ShowDataset of a market's stored rows, newest week first; `weeks`
+        keeps only the latest N weeks.
+        """
+        sql = ('SELECT show, channel, platform, spend, trials, cac, ir, tr, tcr, ctr, week_start '
+               'FROM shows WHERE market = ? AND section = ?')
+        params = [market, section]
+        if weeks:
+            recent = self.weeks(market, section, weeks)
+            if not recent:
+                return ShowDataset()
+            sql += ' AND week_start >= ?'
+            params.append(recent[-1])
+        sql += ' ORDER BY week_start DESC, channel, platform, position'
+
+        data = ShowDataset()
+        for show, channel, platform, *measures, week in self.db.execute(sql, params):
+            data.append(show, channel, platform,
+                        *(float('nan') if value is None else value for value in measures),
+                        week=week, section=section, market=market)
+        return data
+
+    def weekly_totals(self, market=None, section=DEFAULT_SECTION):
+        """(week_start, market, channel, platform, spend, trials) per week, oldest first"""
+        sql = ('SELECT week_start, market, channel, platform, SUM(spend), SUM(trials) '
+               'FROM shows WHERE section = ?')
+        params = [section]
+        if market:
+            sql += ' AND market = ?'
+            params.append(market)
+        sql += ' GROUP BY week_start, market, channel, platform ORDER BY week_start, market'
+        return self.db.execute(sql, params).fetchall()
+
+    def show_trend(self, market, show, section=DEFAULT_SECTION):
+        """Week-by-week rows of one show, oldest first"""
+        return self.db.execute(
+            'SELECT week_start, channel, platform, spend, trials, cac, ir, tr, tcr, ctr '
+            'FROM shows WHERE market = ? AND section = ? AND show = ? ORDER BY week_start',
+            (market, section, show)).fetchall()
+
+
+def sync_markets(store, markets=None, base_path=None):
+    """Load every market folder that exists into the store; {market: (files, errors)}"""
+    base_path = Path(base_path or Path(__file__).parent)
+    results = {}
+    for market, folder in MARKET_FOLDERS.items():
+        if markets and market not in markets:
+            continue
+        folder_path = base_path / folder
+        if folder_path.exists():
+            results[market] = store.ingest_folder(folder_path, market)
+    return results
+
+
+def parse_history_args(argv):
+    """(read from the store?, latest N weeks or None) from '--history [--weeks N]'"""
+    weeks = None
+    if '--weeks' in argv:
+        i = argv.index('--weeks')
+        try:
+            weeks = max(1, int(argv[i + 1]))
+        except (IndexError, ValueError):
+            print("⚠️ Ignoring invalid --weeks value")
+    return '--history' in argv, weeks
+
+
+def print_errors(errors):
+    """Failed files in the generators' console style"""
+    for name, error in errors:
+        print(f"   ❌ ERROR parsing {name}: {error}")
+
+
+def load_market(folder, market, weeks=None):
+    """Sync a market folder into the store and read the market back from it"""
+    with HistoryStore() as store:
+        _, errors = store.ingest_folder(folder, market)
+        print_errors(errors)
+        return store.load_dataset(market, weeks=weeks)
+
+
+def main():
+    markets = [arg.lower() for arg in sys.argv[1:]]
+
+    print("=" * 60)
+    print("📊 STAGE History Store")
+    print("=" * 60)
+
+    with HistoryStore() as store:
+        for market, (files, errors) in sync_markets(store, markets).items():
+            print(f"\n📄 {market.capitalize()}")
+            for name, rows in files:
+                if rows is None:
+                    print(f"   ✓ {name}: already loaded")
+                else:
+                    print(f"   ✓ {name}: {rows} rows loaded")
+            print_errors(errors)
+            weeks = store.weeks(market)
+            print(f"   📅 {len(weeks)} weeks stored ({weeks[-1]} to {weeks[0]})" if weeks else
+                  "   ⚠️ No weeks stored")
+
+    print(f"\n✅ History store: {store.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+STAGE Parallel Ingestion
+Parses every export (.csv or .xlsx) of a market folder on a process pool.
+
+Each worker streams one file through cac_reader and sends back the
+compact ShowDataset.to_bytes() form.  Results are merged in sorted file
+order, so the output is identical whatever order the workers finish in.
+A broken file is reported and skipped; it never stops the batch.
+
+Files already in the parse cache are loaded in-process; only cache misses
+are sent to the pool.  Large exports are read through their byte-offset
+index (cac_index), skipping the sections nobody asked for.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from cac_dataset import ShowDataset
+from cac_index import INDEX_MIN_BYTES, iter_indexed_batches
+from cac_reader import DEFAULT_SECTION, iter_batches
+from parse_cache import cache_enabled, default_cache
+from xlsx_reader import iter_batches as iter_xlsx_batches
+
+EXPORT_PATTERNS = ('*.csv', '*.xlsx')
+
+# Market name -> export folder (relative to the repo)
+MARKET_FOLDERS = {
+    'gujarati': 'GJ Cac Solver',
+    'haryanvi': 'HR Cac Solver',
+    'rajasthani': 'RJ Cac Solver',
+    'bhojpuri': 'BH Cac Solver'
+}
+
+
+class IngestResult:
+    """Merged dataset of a set of files plus per-file row counts and errors"""
+
+    __slots__ = ('dataset', 'files', 'errors')
+
+    def __init__(self):
+        self.dataset = ShowDataset()
+        self.files = []   # (file name, rows) in merge order
+        self.errors = []  # (file name, error message)
+
+
+def iter_export_batches(filepath, sections=None):
+    """RecordBatches of one .csv/.xlsx export, limited to `sections` if given"""
+    if Path(filepath).suffix.lower() == '.xlsx':
+        batches = iter_xlsx_batches(filepath)
+    elif sections is not None and os.path.getsize(filepath) >= INDEX_MIN_BYTES:
+        # Large export: decode only the blocks of the wanted sections
+        batches = iter_indexed_batches(filepath, sections)
+    else:
+        batches = iter_batches(filepath)
+    for batch in batches:
+        if sections is None or batch.section in sections:
+            yield batch
+
+
+def _parse_export(filepath, sections):
+    data = ShowDataset()
+    for batch in iter_export_batches(filepath, sections):
+        data.extend(batch.data)
+    return data
+
+
+def _cache_variant(sections):
+    return 'sections=' + ('*' if sections is None else ','.join(sections))
+
+
+def _cached(filepath, sections):
+    """Cached dataset of a file, or None on a miss"""
+    if not cache_enabled():
+        return None
+    cache = default_cache()
+    return cache.get(cache.entry_path(filepath, _cache_variant(sections)))
+
+
+def parse_file(filepath, market='', sections=(DEFAULT_SECTION,), cache=True):
+    """
+    Parse one export into a ShowDataset (all sections if `sections` is None).
+
+    Goes through the parse cache unless `cache` is False or STAGE_NO_CACHE=1.
+    """
+    if cache and cache_enabled():
+        data = default_cache().load(filepath, lambda path: _parse_export(path, sections),
+                                    _cache_variant(sections))
+    else:
+        data = _parse_export(filepath, sections)
+    if market:
+        data.set_dimension('market', market)
+    return data
+
+
+def _parse_worker(filepath, market, sections, cache):
+    return parse_file(filepath, market, sections, cache).to_bytes()
+
+
+def find_exports(folder, patterns=EXPORT_PATTERNS):
+    """All export files of a market folder, in a stable order"""
+    folder = Path(folder)
+    # '~$...' files are Excel's lock files for open workbooks
+    files = {path for pattern in patterns for path in folder.glob(pattern)
+             if not path.name.startswith('~$')}
+    return sorted(files, key=lambda path: path.name)
+
+
+def default_workers(file_count):
+    return max(1, min(file_count, os.cpu_count() or 1))
+
+
+def ingest_files(files, market='', workers=None, sections=(DEFAULT_SECTION,), cache=True):
+    """
+    Parse `files` with up to `workers` processes and merge them in order.
+
+    workers=None uses one process per CPU; workers=1 parses in-process.
+    """
+    files = sorted((Path(f) for f in files), key=lambda path: path.name)
+    result = IngestResult()
+    outcomes = {}
+
+    pending = []
+    for path in files:
+        try:
+            data = _cached(path, sections) if cache else None
+        except OSError:
+            data = None
+        if data is None:
+            pending.append(path)
+        else:
+            outcomes[path] = data.set_dimension('market', market) if market else data
+
+    workers = workers or default_workers(len(pending))
+    if workers <= 1 or len(pending) <= 1:
+        for path in pending:
+            try:
+                outcomes[path] = parse_file(path, market, sections, cache)
+            except Exception as e:
+                outcomes[path] = e
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {path: pool.submit(_parse_worker, str(path), market, sections, cache)
+                       for path in pending}
+            for path, future in futures.items():
+                try:
+                    outcomes[path] = ShowDataset.from_bytes(future.result())
+                except Exception as e:
+                    outcomes[path] = e
+
+    for path in files:
+        outcome = outcomes[path]
+        if isinstance(outcome, Exception):
+            result.errors.append((path.name, f"{type(outcome).__name__}: {outcome}"))
+            continue
+        result.dataset.extend(outcome)
+        result.files.append((path.name, len(outcome)))
+    return result
+
+
+def ingest_folder(folder, market='', workers=None, sections=(DEFAULT_SECTION,), cache=True):
+    """Parse every export in a market folder"""
+    return ingest_files(find_exports(folder), market, workers, sections, cache)
+
+
+def print_report(result):
+    """Per-file summary in the generators' console style"""
+    for name, rows in result.files:
+        print(f"   ✓ {name}: {rows} shows")
+    for name, error in result.errors:
+        print(f"   ❌ ERROR parsing {name}: {error}")
+
+
+def parse_workers_arg(argv):
+    """Read an optional '--workers N' (or '-j N') from a script's argv"""
+    for flag in ('--workers', '-j'):
+        if flag in argv:
+            i = argv.index(flag)
+            try:
+                return max(1, int(argv[i + 1]))
+            except (IndexError, ValueError):
+                print(f"⚠️ Ignoring invalid {flag} value")
+    return None
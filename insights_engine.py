@@ -0,0 +1,509 @@
+#!/usr/bin/env python3
+"""
+STAGE Insights Engine
+The executive insight rules, evaluated in Python once per data slice.
+
+Each slice (a market, or one week of a market) is reduced to its blended
+metrics (cac_metrics) and its ranking buckets, merged from the rankings the
+build computes once per (market, week, channel, platform) block
+(cac_rankings); the rules read only those, so a slice costs the size of its
+answer, not of its rows.
+Results are plain dicts (title / analysis / recommendation / priority /
+impact) that the pages embed and render as they are.
+
+Results are cached in the parse cache (insights/) under a hash of the
+slice's rows and the rule code, so re-running over every historical week
+only evaluates the weeks that changed.
+
+Usage: python3 insights_engine.py [market ...] [--weeks N]
+"""
+
+import hashlib
+import json
+import math
+import sys
+from decimal import ROUND_HALF_UP, Context, Decimal
+from pathlib import Path
+
+from anomaly_detector import Z_THRESHOLD, detect
+from budget_solver import plan_dataset, split_by
+from cac_metrics import GroupedMetrics
+from cac_rankings import CAC_TARGET, TCR_TARGET, Columns, build_rankings, slice_ranking
+from parse_cache import cache_enabled, default_cache, file_digest
+
+# Code the results depend on; editing any of these invalidates cached results
+RULE_SOURCES = ('insights_engine.py', 'budget_solver.py', 'anomaly_detector.py', 'cac_rankings.py',
+                'cac_metrics.py')
+
+PRIORITY_ORDER = {'high': 3, 'medium': 2, 'low': 1}
+
+# Slices the pages embed by default: each market, and each week of it (the week filter)
+DEFAULT_SLICES = (('market',), ('market', 'week'))
+
+
+# ----------------------------------------------------------------------
+# Number formatting, matching what the pages printed in the browser
+# ----------------------------------------------------------------------
+
+def js_str(value):
+    """Number as JavaScript prints it in a template literal (`${x}`)"""
+    if value is None or value != value:
+        return 'null'
+    if math.isinf(value):
+        return 'Infinity' if value > 0 else '-Infinity'
+    if value == int(value) and abs(value) < 1e21:
+        return str(int(value))
+    return repr(float(value))
+
+
+def to_fixed(value, digits):
+    """Number.prototype.toFixed: exact value, ties away from zero"""
+    if value != value:
+        return 'NaN'
+    if math.isinf(value) or abs(value) >= 1e21:
+        # Past 1e21 toFixed falls back to String(x)
+        return js_str(value)
+    # -0 prints as "0", but a negative that rounds to zero keeps its sign
+    return str(Decimal(value or 0.0).quantize(Decimal(1).scaleb(-digits), rounding=ROUND_HALF_UP))
+
+
+def _group(digits, indian=False):
+    if not indian or len(digits) <= 3:
+        groups = []
+        while len(digits) > 3:
+            digits, groups = digits[:-3], [digits[-3:]] + groups
+        return ','.join([digits] + groups)
+    head, tail = digits[:-3], digits[-3:]
+    groups = []
+    while len(head) > 2:
+        head, groups = head[:-2], [head[-2:]] + groups
+    return ','.join([head] + groups + [tail])
+
+
+def to_locale(value, indian=False):
+    """
+    toLocaleString() (en-US, or en-IN with `indian`): grouped, up to 3
+    decimals.  Unlike toFixed it rounds the shortest decimal form of the
+    number (1.0005 -> "1.001"), and the sign follows the sign bit ("-0").
+    """
+    if value != value:
+        return 'NaN'
+    sign = '-' if math.copysign(1, value) < 0 else ''
+    if math.isinf(value):
+        return sign + '∞'
+    text = str(Decimal(repr(abs(float(value)))).quantize(Decimal('0.001'), rounding=ROUND_HALF_UP,
+                                                        context=Context(prec=400)))
+    whole, _, fraction = text.rstrip('0').rstrip('.').partition('.')
+    return sign + _group(whole, indian) + ('.' + fraction if fraction else '')
+
+
+def format_currency(value):
+    return '—' if value is None else '₹' + to_locale(value, indian=True)
+
+
+def _lt(value, limit):
+    # JS compares null as 0
+    return (0 if value is None else value) < limit
+
+
+# ----------------------------------------------------------------------
+# Rules
+# ----------------------------------------------------------------------
+
+def evaluate(data, rank=None):
+    """
+    Insights of one slice, highest priority first.  `rank` is the slice's
+    ranking (positions indexing `data`); without it the slice is ranked here.
+    """
+    if not len(data):
+        return []
+    records = data.to_records()
+    metrics = GroupedMetrics.of(data).metrics()
+    by_channel = GroupedMetrics.of(data, 'channel')
+    by_platform = GroupedMetrics.of(data, 'platform')
+    if rank is None:
+        rank = slice_ranking(build_rankings(data), Columns(data))
+
+    def rows(bucket, limit=None):
+        positions = bucket['rows'] if limit is None else bucket['rows'][:limit]
+        return [records[i] for i in positions]
+
+    total_trials, total_spend = metrics['totalTrials'], metrics['totalSpend']
+    insights = []
+
+    # INSIGHT 1: Top Show Scaling Opportunity
+    top = records[rank['topTrials'][0]]
+    top_trials, top_spend = top['trials'], top['spend']
+    projected = math.floor(top_trials * 1.25)
+    additional_spend = (projected - top_trials) * (top['cac'] or 0)
+    insights.append({
+        'title': f"🚀 Scale \"{top['show']}\" - Top Performer with {to_locale(top_trials)} Trials",
+        'analysis': (
+            f"<strong>{top['show']}</strong> is your strongest performer, generating "
+            f"<strong>{to_fixed(_divide(top_trials, total_trials) * 100, 1)}%</strong> of total trials at "
+            f"₹{js_str(top['cac'])} CAC. This show demonstrates proven product-market fit with "
+            f"{top['channel']} on {top['platform']}. Current spend: ₹{format_currency(top_spend)}. "
+            f"The CAC is <strong>{'below target (healthy)' if _lt(top['cac'], CAC_TARGET) else 'above target'}"
+            f"</strong> and TCR is {js_str(top['tcr'])}% "
+            f"{'(excellent retention)' if _lt(top['tcr'], TCR_TARGET) else '(needs improvement)'}."),
+        'recommendation': (
+            f"<strong>💡 Immediate Action:</strong> Increase budget by <strong>20-25%</strong> "
+            f"(from ₹{to_fixed(top_spend / 100000, 1)}L to ₹{to_fixed(top_spend * 1.25 / 100000, 1)}L). "
+            f"Expected outcome: +{to_locale(projected - top_trials)} trials for "
+            f"₹{to_fixed(additional_spend / 100000, 2)}L incremental spend. Maintain current creative "
+            f"and targeting strategies. Monitor daily for 5-7 days to ensure CAC stability."),
+        'priority': 'high',
+        'impact': (f"Scaling top performer = {to_locale(projected - top_trials)} additional trials = "
+                   f"₹{to_fixed((projected - top_trials) * (top['cac'] or 0) / 100000, 2)}L efficient spend"),
+    })
+
+    # INSIGHT 2: CAC Efficiency Analysis
+    efficient, inefficient = rank['cacEfficient'], rank['cacOver']
+    avg_efficient = (to_fixed(efficient['cacSum'] / len(efficient['rows']), 0) if efficient['rows']
+                     else js_str(metrics['cac']))
+    if inefficient['rows']:
+        over_text = (f"<strong style=\"color: #ef4444;\">{len(inefficient['rows'])} shows exceed ₹250 CAC</strong>: "
+                     + ', '.join(f"{r['show']} (₹{js_str(r['cac'])})" for r in rows(inefficient, 3))
+                     + ". These shows require optimization or budget reallocation.")
+        optimize_text = ("<strong>OPTIMIZE/PAUSE:</strong> Reduce spend 30-50% on "
+                         + ', '.join(r['show'] for r in rows(inefficient, 2))
+                         + " until CAC improves below ₹280. Test new creatives and audiences.")
+    else:
+        over_text = 'All shows performing efficiently - excellent portfolio health.'
+        optimize_text = 'Maintain current efficiency - monitor for creative fatigue.'
+    insights.append({
+        'title': (f"💰 CAC Analysis: ₹{to_fixed(metrics['cac'], 0)} Blended "
+                  f"{'✅ Below Target' if metrics['cac'] < CAC_TARGET else '⚠️ Above Target'}"),
+        'analysis': (
+            f"Blended CAC of <strong>₹{to_fixed(metrics['cac'], 0)}</strong> vs ₹250 target. "
+            f"<strong>{len(efficient['rows'])} of {rank['size']} shows</strong> operate below target CAC "
+            f"(avg ₹{avg_efficient}), driving {to_fixed(_divide(efficient['trials'], total_trials) * 100, 1)}% "
+            f"of volume. {over_text}"),
+        'recommendation': (
+            f"<strong>💡 Action Plan:</strong><br>1. <strong>SCALE:</strong> Increase budget 20% for "
+            f"efficient shows: {', '.join(r['show'] for r in rows(efficient, 3))}.<br>2. {optimize_text} "
+            f"<br>3. Reallocate ₹{to_fixed((inefficient['spend'] * 0.4) / 100000, 1)}L from inefficient "
+            f"to efficient shows."),
+        'priority': 'high' if metrics['cac'] > CAC_TARGET else 'medium',
+        'impact': f"CAC optimization = estimated ₹{to_fixed((total_spend * 0.15) / 100000, 1)}L cost savings",
+    })
+
+    # INSIGHT 3: Channel Strategy
+    meta, google = by_channel.metrics('meta'), by_channel.metrics('google')
+    leader = 'Meta' if meta['cac'] < google['cac'] else 'Google'
+    cac_diff = to_fixed(abs(meta['cac'] - google['cac']), 0)
+    low_cac = min(meta['cac'], google['cac'])
+    diff_percent = to_fixed(_divide(float(cac_diff), low_cac) * 100, 0)
+    big_gap = _number(diff_percent) > 20
+    if leader == 'Meta':
+        rebalance = (f"Shift 15-20% budget from Google to Meta. Increase Meta from "
+                     f"₹{to_fixed(meta['totalSpend'] / 100000, 1)}L to "
+                     f"₹{to_fixed(meta['totalSpend'] * 1.2 / 100000, 1)}L. "
+                     + ('Significant efficiency gap - prioritize Meta scaling.' if big_gap else
+                        'Maintain Google for audience diversification.'))
+    else:
+        rebalance = ("Scale Google campaigns 15-20%. "
+                     + ('Review Meta creative fatigue and audience saturation.' if big_gap else
+                        'Maintain balanced mix.'))
+    insights.append({
+        'title': f"🎯 Channel Mix: {leader} Outperforming by ₹{cac_diff} CAC ({diff_percent}%)",
+        'analysis': (
+            f"<strong>Meta:</strong> {to_locale(meta['totalTrials'])} trials @ ₹{to_fixed(meta['cac'], 0)} CAC "
+            f"({to_fixed(_divide(meta['totalTrials'], total_trials) * 100, 0)}% share, "
+            f"₹{to_fixed(meta['totalSpend'] / 100000, 1)}L spend). <strong>Google:</strong> "
+            f"{to_locale(google['totalTrials'])} trials @ ₹{to_fixed(google['cac'], 0)} CAC "
+            f"({to_fixed(_divide(google['totalTrials'], total_trials) * 100, 0)}% share, "
+            f"₹{to_fixed(google['totalSpend'] / 100000, 1)}L spend). {leader} demonstrates "
+            f"<strong>₹{cac_diff} lower CAC</strong> (+{diff_percent}% efficiency edge)."),
+        'recommendation': (f"<strong>💡 Budget Rebalancing:</strong> {rebalance} Target: Reduce blended "
+                           f"CAC to ₹{to_fixed(metrics['cac'] * 0.93, 0)}."),
+        'priority': 'high' if big_gap else 'medium',
+        'impact': (f"Channel optimization = estimated "
+                   f"+{to_locale(_floor(_divide(total_spend, low_cac) - total_trials))} trials"),
+    })
+
+    # INSIGHT 4: Retention & TCR
+    healthy, poor = rank['tcrHealthy'], rank['tcrPoor']
+    lost = poor['lostTrials']
+    tcr_ok = metrics['tcr'] < TCR_TARGET
+    healthy_text = (' (' + ', '.join(f"{r['show']}: {js_str(r['tcr'])}%" for r in rows(healthy, 2)) + ')'
+                    if healthy['rows'] else '')
+    poor_text = (f"<strong style=\"color: #ef4444;\">{len(poor['rows'])} shows exceed 30% churn</strong>, "
+                 f"bleeding approximately <strong>{to_locale(lost)} trials</strong> worth "
+                 f"₹{to_fixed((lost * metrics['cac']) / 100000, 1)}L." if poor['rows'] else
+                 'Excellent retention across portfolio.')
+    if metrics['tcr'] >= TCR_TARGET:
+        strategy = (f"<strong>URGENT:</strong> Audit content quality, onboarding UX, and trial value prop for "
+                    f"{', '.join(r['show'] for r in rows(poor))}. Benchmark best performer against worst. "
+                    f"Implement fixes within 48 hours. Target: Reduce TCR to <28%.")
+    else:
+        strategy = ("Maintain retention excellence. Document success factors from top performers and "
+                    "replicate. Continue A/B testing onboarding improvements.")
+    insights.append({
+        'title': (f"{'✅' if tcr_ok else '🚨'} Trial Retention: {to_fixed(metrics['tcr'], 1)}% TCR "
+                  f"{'Healthy' if tcr_ok else 'CRITICAL'}"),
+        'analysis': (f"Overall D0 churn at <strong>{to_fixed(metrics['tcr'], 1)}%</strong> vs <30% target. "
+                     f"{len(healthy['rows'])} shows meet retention target{healthy_text}. {poor_text}"),
+        'recommendation': f"<strong>💡 Retention Strategy:</strong> {strategy}",
+        'priority': 'low' if tcr_ok else 'high',
+        'impact': (f"Fixing retention = {to_locale(lost)} trial recovery = "
+                   f"₹{to_fixed((lost * metrics['cac']) / 100000, 1)}L cost avoidance"),
+    })
+
+    # INSIGHT 5: Platform Strategy
+    app, web = by_platform.metrics('app'), by_platform.metrics('web')
+    platform_leader = 'App' if app['cac'] < web['cac'] else 'Web'
+    if platform_leader == 'App':
+        platform_text = ('Prioritize app install campaigns. Optimize app store listing (screenshots, '
+                         'reviews). Consider app-only promotional offers.')
+    else:
+        platform_text = ('Focus on web conversion optimization. Improve landing page UX and reduce signup '
+                         'friction. Test progressive web app (PWA).')
+    insights.append({
+        'title': (f"💻 Platform Mix: {platform_leader} Leading with "
+                  f"₹{to_fixed(min(app['cac'], web['cac']), 0)} CAC"),
+        'analysis': (
+            f"<strong>App:</strong> {to_locale(app['totalTrials'])} trials @ ₹{to_fixed(app['cac'], 0)} CAC. "
+            f"<strong>Web:</strong> {to_locale(web['totalTrials'])} trials @ ₹{to_fixed(web['cac'], 0)} CAC. "
+            f"Platform split: {to_fixed(_divide(app['totalTrials'], total_trials) * 100, 0)}% App, "
+            f"{to_fixed(_divide(web['totalTrials'], total_trials) * 100, 0)}% Web. "
+            f"{platform_leader} demonstrates better cost efficiency."),
+        'recommendation': f"<strong>💡 Platform Optimization:</strong> {platform_text}",
+        'priority': 'medium',
+        'impact': f"Platform optimization = estimated +{to_locale(math.floor(total_trials * 0.08))} trials",
+    })
+
+    # INSIGHT 6: Budget Reallocation (fitted response curves, budget_solver)
+    plan = plan_dataset(data)
+    if plan['budget'] > 0:
+        insights.append(_budget_insight(plan))
+
+    # INSIGHT 7: Week-over-Week Anomalies (running per-series statistics, anomaly_detector)
+    flags = detect(data)
+    if flags:
+        latest = max(flag['week'] for flag in flags)
+        worse = [flag for flag in flags if flag['week'] == latest and flag['direction'] == 'worse']
+        if worse:
+            insights.append(_anomaly_insight(latest, worse))
+
+    # Stable, like Array.prototype.sort
+    insights.sort(key=lambda insight: -PRIORITY_ORDER[insight['priority']])
+    return insights
+
+
+def _money(value):
+    if abs(value) >= 100000:
+        return f"₹{to_fixed(value / 100000, 1)}L"
+    return format_currency(round(value))
+
+
+def _budget_insight(plan):
+    gain = math.floor(plan['trials'] - plan['current_trials'])
+    current_cac = _divide(plan['budget'], plan['current_trials'])
+    cells = plan['cells']
+    fitted = sum(1 for cell in cells if cell['fitted'])
+
+    split = split_by(plan, 1)
+    placed = sum(planned for planned, _ in split.values())
+    shares = ', '.join(
+        f"{name.capitalize()} {to_fixed(_divide(current, plan['budget']) * 100, 0)}% → "
+        f"{to_fixed(_divide(planned, placed) * 100, 0)}%"
+        for name, (planned, current) in sorted(split.items()))
+
+    def moves(cells):
+        return ', '.join(f"{cell['key'][0]} ({cell['key'][1]} {cell['key'][2]}) "
+                         f"{_money(cell['current_spend'])} → {_money(cell['spend'])}" for cell in cells)
+
+    # Moves under 0.5% of the budget are solver noise, not advice
+    threshold = plan['budget'] * 0.005
+    by_change = sorted(cells, key=lambda cell: cell['spend'] - cell['current_spend'])
+    ups = [cell for cell in reversed(by_change) if cell['spend'] - cell['current_spend'] > threshold][:3]
+    downs = [cell for cell in by_change if cell['current_spend'] - cell['spend'] > threshold][:3]
+    actions = []
+    if ups:
+        actions.append(f"<strong>Increase:</strong> {moves(ups)}.")
+    if downs:
+        actions.append(f"<strong>Reduce:</strong> {moves(downs)}.")
+    unplaced = plan['budget'] - plan['allocated']
+    if unplaced > 1:
+        actions.append(f"{_money(unplaced)} stays unplaced: no cell can absorb it under "
+                       f"₹{js_str(plan['cac_ceiling'])} CAC.")
+
+    lift = _divide(gain, plan['current_trials'])
+    return {
+        'title': (f"📈 Budget Plan: +{to_locale(gain)} Trials from the Same {_money(plan['budget'])}"
+                  if gain > 0 else "📈 Budget Plan: Current Split Is Near-Optimal"),
+        'analysis': (
+            f"Spend→trials curves fitted for <strong>{len(cells)} show × channel × platform cells</strong> "
+            f"({fitted} from week-over-week history, the rest at the default elasticity). Re-spending "
+            f"the latest week's {_money(plan['budget'])} with no cell above ₹{js_str(plan['cac_ceiling'])} CAC "
+            f"moves predicted trials from {to_locale(math.floor(plan['current_trials']))} to "
+            f"<strong>{to_locale(math.floor(plan['trials']))}</strong> (CAC ₹{to_fixed(current_cac, 0)} → "
+            f"₹{to_fixed(plan['cac'], 0)}). Channel split: {shares}."),
+        'recommendation': f"<strong>💡 Reallocation:</strong> {' '.join(actions) or 'Keep the current split.'}",
+        'priority': 'high' if lift > 0.1 else ('medium' if gain > 0 else 'low'),
+        'impact': f"Reallocation = {'+' if gain > 0 else ''}{to_locale(gain)} predicted trials at the same spend",
+    }
+
+
+def _metric_text(metric, value):
+    if metric == 'cac':
+        return f"₹{to_fixed(value, 0)}"
+    return f"{to_fixed(value, 1)}%"
+
+
+def _anomaly_insight(week, flags):
+    # Largest moves first; young series have no z-score, so rank by relative change
+    flags = sorted(flags, key=lambda flag: -abs(flag['change']))
+    series = {(flag['show'], flag['channel'], flag['platform']) for flag in flags}
+    listed = '; '.join(
+        f"<strong>{flag['show']}</strong> ({flag['channel']} {flag['platform']}) {flag['metric'].upper()} "
+        f"{'rose' if flag['value'] > flag['previous'] else 'dropped'} from "
+        f"{_metric_text(flag['metric'], flag['previous'])} to {_metric_text(flag['metric'], flag['value'])}"
+        for flag in flags[:5])
+    more = f" and {len(flags) - 5} more" if len(flags) > 5 else ''
+    severe = any(flag['z'] is not None and abs(flag['z']) >= 2 * Z_THRESHOLD for flag in flags)
+    return {
+        'title': f"⚠️ {len(flags)} Week-over-Week Anomalies in the Week of {week}",
+        'analysis': (
+            f"Against each show × channel × platform series' own history, these moved outside their "
+            f"normal range in the latest week: {listed}{more}."),
+        'recommendation': (
+            "<strong>💡 Investigate:</strong> Check creative fatigue, audience saturation and tracking "
+            "for the flagged series before scaling them. Confirm whether each move was deliberate "
+            "(budget shift, new creative, pricing test)."),
+        'priority': 'high' if severe or len(series) >= 3 else 'medium',
+        'impact': f"{len(series)} series moved against target in one week",
+    }
+
+
+def _divide(a, b):
+    # JS division: x/0 is +-Infinity, 0/0 is NaN
+    if b:
+        return a / b
+    if a != a or not a:
+        return math.nan
+    return math.inf if a > 0 else -math.inf
+
+
+def _floor(value):
+    # Math.floor passes Infinity and NaN through
+    return math.floor(value) if math.isfinite(value) else value
+
+
+def _number(text):
+    # String -> number coercion of a toFixed() result
+    try:
+        return float(text)
+    except ValueError:
+        return math.nan
+
+
+# ----------------------------------------------------------------------
+# Caching and slices
+# ----------------------------------------------------------------------
+
+_rules_digest = None
+
+
+def rules_digest():
+    global _rules_digest
+    if _rules_digest is None:
+        base = Path(__file__).parent
+        _rules_digest = ','.join(file_digest(base / name) for name in RULE_SOURCES)
+    return _rules_digest
+
+
+def slice_key(data):
+    """Input hash of a slice: its rows plus the code of the rules"""
+    digest = hashlib.sha256(rules_digest().encode('ascii'))
+    digest.update(data.to_bytes())
+    return digest.hexdigest()
+
+
+def slice_insights(data, cache=True, ranking=None):
+    """
+    Insights of one slice, from the parse cache when its rows are unchanged.
+    `ranking` returns the slice's ranking; it is only called on a cache miss.
+    """
+    if not (cache and cache_enabled()):
+        return evaluate(data, ranking() if ranking else None)
+    store = default_cache()
+    entry = store.key_path(slice_key(data), 'insights', '.json')
+    blob = store.read(entry)
+    if blob is not None:
+        try:
+            return json.loads(blob.decode('utf-8'))
+        except ValueError:
+            pass
+    insights = evaluate(data, ranking() if ranking else None)
+    store.write(entry, json.dumps(insights, ensure_ascii=False).encode('utf-8'))
+    return insights
+
+
+def _local_ranking(rankings, cols, dims, key, positions):
+    """Merged ranking of one slice, its positions renumbered to index the slice's own rows"""
+    rank = slice_ranking(rankings, cols, **dict(zip(dims, key)))
+    local = {position: i for i, position in enumerate(positions)}
+    rank['topTrials'] = [local[i] for i in rank['topTrials']]
+    for name in ('cacEfficient', 'cacOver', 'tcrHealthy', 'tcrPoor'):
+        rank[name]['rows'] = [local[i] for i in rank[name]['rows']]
+    return rank
+
+
+def build_insights(data, slices=DEFAULT_SLICES, cache=True, rankings=None):
+    """
+    {'market': {'gujarati': [...]}, 'market,week': {'gujarati|2025-06-01': [...]}}
+
+    Slices read the block rankings of the build (`rankings`, from
+    cac_rankings.build_rankings of the same dataset; built here if omitted).
+    """
+    rankings = rankings or build_rankings(data)
+    cols = Columns(data)
+    results = {}
+    for dims in slices:
+        results[','.join(dims)] = {
+            '|'.join(key): slice_insights(
+                data.take(positions), cache,
+                lambda dims=dims, key=key, positions=positions:
+                    _local_ranking(rankings, cols, dims, key, positions))
+            for key, positions in data.group_indices(*dims).items()
+        }
+    return results
+
+
+def insights_json(data, slices=DEFAULT_SLICES, cache=True, rankings=None):
+    """Compact JSON of build_insights() for embedding in a page"""
+    return json.dumps(build_insights(data, slices, cache, rankings), ensure_ascii=False,
+                      separators=(',', ':'))
+
+
+def main():
+    from history_store import HistoryStore, parse_history_args, sync_markets
+
+    argv = sys.argv[1:]
+    _, weeks = parse_history_args(argv)
+    skip = {i + 1 for i, arg in enumerate(argv) if arg == '--weeks'}
+    markets = [arg.lower() for i, arg in enumerate(argv) if not arg.startswith('-') and i not in skip]
+
+    print("=" * 60)
+    print("📊 STAGE Insights Engine")
+    print("=" * 60)
+
+    with HistoryStore() as store:
+        sync_markets(store, markets or None)
+        for market in store.markets():
+            if markets and market not in markets:
+                continue
+            data = store.load_dataset(market, weeks=weeks)
+            results = build_insights(data, (('market', 'week'),))['market,week']
+            print(f"\n📄 {market.capitalize()}: {len(results)} weeks")
+            for key, insights in sorted(results.items(), reverse=True):
+                high = sum(1 for insight in insights if insight['priority'] == 'high')
+                print(f"   ✓ {key.split('|')[1] or '(undated)'}: {len(insights)} insights, {high} high priority")
+                for insight in insights[:1]:
+                    print(f"      {insight['title']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+STAGE Parse Cache
+Content-addressed on-disk cache of parsed exports.
+
+Entries are keyed by the file's SHA-256, size, the reader/schema versions and
+a hash of the parser code (PARSER_SOURCES), and hold the
+ShowDataset.to_bytes() form.  A per-file stat record
+(path + size + mtime -> content hash) lets an untouched file skip even the
+hashing step.  The cache directory is capped in size and evicts the least
+recently used entries first.
+
+    .cache/parsed/
+        stat/<key>            content hash of a (path, size, mtime)
+        data/<hash>-<...>.sds serialized dataset
+        index/<hash>-<...>.idx block offsets of an export (cac_index)
+        insights/<key>.json    insight results of a dataset slice (insights_engine)
+
+Set STAGE_CACHE_DIR to move the cache, STAGE_CACHE_MAX_MB to resize it and
+STAGE_NO_CACHE=1 to bypass it.
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+from cac_dataset import ShowDataset
+from cac_reader import READER_VERSION
+from cac_schema import SCHEMA_VERSION
+
+DEFAULT_CACHE_DIR = Path(__file__).parent / '.cache' / 'parsed'
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Code a parse depends on; editing any of these invalidates the cached entries
+PARSER_SOURCES = ('cac_reader.py', 'cac_schema.py', 'cac_numbers.py', 'cac_dataset.py',
+                  'cac_index.py', 'xlsx_reader.py', 'ingest.py')
+
+# Entry folders that count towards the size cap
+CACHED_KINDS = ('data', 'index', 'insights')
+
+
+def file_digest(filepath):
+    """SHA-256 of a file's content, read in 1 MB chunks"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _file_mode():
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+_version_tag = None
+
+
+def version_tag():
+    """Reader/schema versions plus a short hash of the parser code"""
+    global _version_tag
+    if _version_tag is None:
+        base = Path(__file__).parent
+        sources = ','.join(file_digest(base / name) for name in PARSER_SOURCES)
+        digest = hashlib.sha256(sources.encode('ascii')).hexdigest()
+        _version_tag = f"r{READER_VERSION}s{SCHEMA_VERSION}-{digest[:12]}"
+    return _version_tag
+
+
+# mkstemp creates 0600 files; published outputs need the usual permissions
+FILE_MODE = _file_mode()
+
+
+def atomic_write(path, data):
+    """Write bytes to `path` via a temp file + rename, so readers never see half a file"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp, FILE_MODE)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+class ParseCache:
+    """Size-capped LRU cache of parsed datasets, safe to share between processes"""
+
+    def __init__(self, root=None, max_bytes=None):
+        root = root or os.environ.get('STAGE_CACHE_DIR') or DEFAULT_CACHE_DIR
+        if max_bytes is None:
+            max_mb = os.environ.get('STAGE_CACHE_MAX_MB')
+            max_bytes = int(float(max_mb) * 1024 * 1024) if max_mb else DEFAULT_MAX_BYTES
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    def _stat_path(self, filepath, stat):
+        key = f"{Path(filepath).resolve()}|{stat.st_size}|{stat.st_mtime_ns}"
+        return self.root / 'stat' / hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def content_hash(self, filepath):
+        """Content hash of a file, reusing the stat record when size/mtime match"""
+        stat = os.stat(filepath)
+        stat_path = self._stat_path(filepath, stat)
+        try:
+            return stat_path.read_text().strip()
+        except OSError:
+            pass
+        digest = file_digest(filepath)
+        atomic_write(stat_path, digest.encode('ascii'))
+        return digest
+
+    def entry_path(self, filepath, variant='', kind='data', suffix='.sds'):
+        """Cache file for an export; `variant` separates different parse options"""
+        digest = self.content_hash(filepath)
+        size = os.path.getsize(filepath)
+        name = f"{digest}-{size}-{version_tag()}"
+        if variant:
+            name += '-' + hashlib.sha1(variant.encode('utf-8')).hexdigest()[:12]
+        return self.root / kind / f"{name}{suffix}"
+
+    def key_path(self, key, kind, suffix=''):
+        """Cache file for a derived result keyed by its own input hash"""
+        return self.root / kind / f"{key}{suffix}"
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def read(self, entry):
+        """Raw bytes of an entry, or None on a miss"""
+        try:
+            blob = entry.read_bytes()
+        except OSError:
+            return None
+        # Touch the entry: mtime doubles as the LRU clock
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return blob
+
+    def write(self, entry, blob):
+        atomic_write(entry, blob)
+        self.evict()
+
+    def get(self, entry):
+        blob = self.read(entry)
+        if blob is None:
+            return None
+        try:
+            return ShowDataset.from_bytes(blob)
+        except (ValueError, KeyError, EOFError):
+            return None
+
+    def put(self, entry, data):
+        self.write(entry, data.to_bytes())
+
+    def load(self, filepath, parse, variant=''):
+        """Cached `parse(filepath)`; parses and stores on a miss"""
+        entry = self.entry_path(filepath, variant)
+        data = self.get(entry)
+        if data is None:
+            data = parse(filepath)
+            self.put(entry, data)
+        return data
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def _entries(self, kind):
+        folder = self.root / kind
+        if not folder.exists():
+            return []
+        entries = []
+        for path in folder.iterdir():
+            if path.name.startswith('.tmp-'):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size(self):
+        return sum(size for kind in CACHED_KINDS for _, size, _ in self._entries(kind))
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits its cap"""
+        entries = sorted(entry for kind in CACHED_KINDS for entry in self._entries(kind))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
+        # Stat records are tiny but accumulate with every edit of a file
+        stats = sorted(self._entries('stat'))
+        for _, _, path in stats[:max(0, len(stats) - 4096)]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def clear(self):
+        for kind in CACHED_KINDS + ('stat',):
+            for _, _, path in self._entries(kind):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+
+def cache_enabled():
+    return os.environ.get('STAGE_NO_CACHE', '') in ('', '0')
+
+
+_default_cache = None
+
+
+def default_cache():
+    """Process-wide ParseCache configured from the environment"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ParseCache()
+    return _default_cache
@@ -0,0 +1,33 @@
+"""Shared fixtures: the repo's modules on sys.path and its sample exports"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_PATH))
+
+# Keep test runs out of the real parse cache and history store
+os.environ.setdefault('STAGE_NO_CACHE', '1')
+os.environ.setdefault('STAGE_CACHE_DIR', tempfile.mkdtemp(prefix='stage-cache-'))
+# A checkout has no vendored Chart.js; pages under test link the CDN build
+os.environ.setdefault('STAGE_CHART_CDN', '1')
+
+from ingest import MARKET_FOLDERS, find_exports, ingest_folder  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def sample_exports():
+    """{market: [export paths]} of the sample folders shipped with the repo"""
+    return {market: find_exports(BASE_PATH / folder) for market, folder in MARKET_FOLDERS.items()
+            if (BASE_PATH / folder).is_dir()}
+
+
+@pytest.fixture(scope='session')
+def sample_datasets():
+    """{market: ShowDataset} of the sample folders"""
+    return {market: ingest_folder(BASE_PATH / folder, market, workers=1).dataset
+            for market, folder in MARKET_FOLDERS.items() if (BASE_PATH / folder).is_dir()}
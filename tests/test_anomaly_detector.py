@@ -0,0 +1,126 @@
+"""anomaly_detector: running statistics, scoring and store/page agreement"""
+
+import math
+import os
+import statistics
+
+import pytest
+
+from anomaly_detector import (ALPHA, EARLY_CHANGE, MIN_TRIALS, AnomalyDetector, MetricStats, batch_rows,
+                              dataset_rows, detect)
+from cac_reader import iter_batches
+from history_store import HistoryStore
+
+VALUES = [100.0, 104.0, 97.0, 101.0, 99.5, 103.0]
+
+
+def _stats(values):
+    stats = MetricStats()
+    for i, value in enumerate(values):
+        stats.update(value, f'2026-01-{i + 1:02d}')
+    return stats
+
+
+def test_welford_matches_batch_statistics():
+    stats = _stats(VALUES)
+    assert stats.n == len(VALUES)
+    assert stats.mean == pytest.approx(statistics.mean(VALUES))
+    assert stats.std == pytest.approx(statistics.stdev(VALUES))
+    assert stats.last == VALUES[-1] and stats.last_week == '2026-01-06'
+
+
+def test_ewma_recursion():
+    ewma, ewvar = VALUES[0], 0.0
+    for value in VALUES[1:]:
+        diff = value - ewma
+        ewma += ALPHA * diff
+        ewvar = (1 - ALPHA) * (ewvar + ALPHA * diff * diff)
+    stats = _stats(VALUES)
+    assert stats.ewma == pytest.approx(ewma)
+    assert stats.ewvar == pytest.approx(ewvar)
+
+
+def test_score_young_and_mature_series():
+    young = _stats([100.0])
+    assert young.score(100 * (1 + EARLY_CHANGE))[3]
+    assert not young.score(110.0)[3]
+
+    mature = _stats(VALUES)
+    expected, z, change, outlier = mature.score(200.0)
+    assert expected == pytest.approx(mature.ewma)
+    assert z > 3 and outlier
+    assert change == pytest.approx(200.0 / VALUES[-1] - 1)
+    assert not mature.score(102.0)[3]
+
+
+def _rows(cac, trials=500):
+    return [('Saanwari', 'meta', 'app', trials, {'cac': cac, 'ir': math.nan})]
+
+
+def test_observe_flags_and_late_weeks():
+    detector = AnomalyDetector()
+    for i, cac in enumerate(VALUES):
+        assert detector.observe('gujarati', f'2026-01-{i + 1:02d}', _rows(cac)) == []
+    (flag,) = detector.observe('gujarati', '2026-01-10', _rows(200.0))
+    assert (flag['metric'], flag['direction'], flag['previous']) == ('cac', 'worse', VALUES[-1])
+
+    # Too few trials: not scored at all
+    assert detector.observe('gujarati', '2026-01-11', _rows(900.0, MIN_TRIALS - 1)) == []
+    # An earlier week is not folded in, but reported
+    assert detector.observe('gujarati', '2026-01-03', _rows(900.0)) == []
+    assert detector.late == {('gujarati', '2026-01-03')}
+    assert detector.series[('gujarati', 'Saanwari', 'meta', 'app', 'cac')].n == len(VALUES) + 1
+
+
+def test_batch_rows_blend_duplicate_show_rows(tmp_path):
+    path = tmp_path / 'Meta_SL-App.csv'
+    path.write_text(',Week (2026-02-01 to 2026-02-07),\n'
+                    'Show_Name - APP,Spends_GST,af_start_trial,Mandate_CAC,CTR\n'
+                    'Saanwari,"1,000",10,100,1%\n'
+                    'Saanwari,"3,000",10,300,2%\n', encoding='utf-8')
+    batches = list(iter_batches(path))
+    (row,) = batch_rows(batches)['2026-02-01']
+    assert row[:4] == ('Saanwari', 'meta', 'app', 20)
+    assert row[4]['cac'] == pytest.approx(200)
+    assert list(batch_rows(batches)['2026-02-01']) == list(dataset_rows(batches[0].data))
+
+
+def _flag_keys(flags):
+    return sorted((flag['market'], flag['week'], flag['show'], flag['channel'], flag['platform'],
+                   flag['metric'], round(flag['value'], 6), flag['direction']) for flag in flags)
+
+
+def _export(weeks):
+    text = ''
+    for week, cac in weeks:
+        text += (f',Week ({week} to 2026-12-31),\n'
+                 'Show_Name - APP,Spends_GST,af_start_trial,Mandate_CAC,CTR\n'
+                 f'Saanwari,{int(cac * 500)},500,{cac},1%\n')
+    return text
+
+
+def test_store_replays_backfilled_weeks(tmp_path):
+    weeks = [(f'2026-01-{i + 1:02d}', cac) for i, cac in enumerate(VALUES + [200.0])]
+    recent, early = tmp_path / 'Meta_SL-App recent.csv', tmp_path / 'Meta_SL-App early.csv'
+    recent.write_text(_export(weeks[3:]), encoding='utf-8')
+    early.write_text(_export(weeks[:3]), encoding='utf-8')
+    os.utime(early, (1_000_000, 1_000_000))
+
+    with HistoryStore(tmp_path / 'history.db') as store:
+        # The later weeks arrive first; the early export backfills under them
+        store.ingest_file(recent, 'gujarati')
+        store.ingest_file(early, 'gujarati')
+        assert not store.anomalies.late
+        flags = store.anomalies.flags('gujarati')
+        assert _flag_keys(flags) == _flag_keys(detect(store.load_dataset('gujarati')))
+        assert [flag['week'] for flag in flags] == ['2026-01-07']
+        assert store.anomalies.series[('gujarati', 'Saanwari', 'meta', 'app', 'cac')].n == len(weeks)
+
+
+def test_store_and_page_flags_agree_on_samples(tmp_path, sample_exports, sample_datasets):
+    with HistoryStore(tmp_path / 'history.db') as store:
+        for market, paths in sample_exports.items():
+            # Newest file name first, so exports arrive out of week order too
+            for path in reversed(paths):
+                store.ingest_file(path, market)
+            assert _flag_keys(store.anomalies.flags(market)) == _flag_keys(detect(sample_datasets[market]))
@@ -0,0 +1,89 @@
+"""budget_solver: curve fits, the greedy split and the sample-export plans"""
+
+import math
+
+import pytest
+
+from budget_solver import DEFAULT_ELASTICITY, MAX_SCALE, fit_curve, fit_curves, plan_dataset, solve
+from cac_dataset import ShowDataset
+
+
+def _dataset(rows):
+    """rows: (week, show, channel, platform, spend, trials)"""
+    data = ShowDataset()
+    for week, show, channel, platform, spend, trials in rows:
+        data.append(show, channel, platform, spend, trials, math.nan, math.nan, math.nan, math.nan,
+                    math.nan, week=week)
+    return data
+
+
+def test_fit_recovers_power_law():
+    history = [(s, 3.0 * s ** 0.6) for s in (1000, 2000, 4000, 8000)]
+    curve = fit_curve(('a', 'meta', 'app'), history)
+    assert curve.fitted
+    assert curve.b == pytest.approx(0.6)
+    assert curve.a == pytest.approx(3.0)
+
+
+def test_single_week_uses_default_elasticity():
+    curve = fit_curve(('a', 'meta', 'app'), [(1000, 10)], 1000, 10)
+    assert not curve.fitted
+    assert curve.b == DEFAULT_ELASTICITY
+    assert curve.predict(1000) == pytest.approx(10)
+
+
+def test_cap_respects_scale_and_ceiling():
+    curve = fit_curve(('a', 'meta', 'app'), [(s, 3.0 * s ** 0.6) for s in (1000, 4000)])
+    assert curve.cap() == MAX_SCALE * 4000
+    limit = curve.cap(cac_ceiling=10)
+    assert limit < MAX_SCALE * 4000
+    assert limit / curve.predict(limit) == pytest.approx(10)
+
+
+def test_solve_places_budget_within_caps():
+    curves = [fit_curve((name, 'meta', 'app'), [(s, k * s ** 0.7) for s in (1000, 3000)], 2000, 0)
+              for name, k in (('a', 1.0), ('b', 2.0), ('c', 0.5))]
+    plan = solve(curves, 6000, cac_ceiling=None)
+    assert plan['allocated'] == pytest.approx(6000)
+    assert sum(cell['spend'] for cell in plan['cells']) == pytest.approx(plan['allocated'])
+    for curve, cell in zip(sorted(curves, key=lambda c: c.key), sorted(plan['cells'], key=lambda c: c['key'])):
+        assert cell['spend'] <= curve.cap() + 1e-6
+    # The most responsive cell gets the most budget
+    assert plan['cells'][0]['key'][0] == 'b'
+    assert plan['trials'] >= sum(curve.predict(2000) for curve in curves) - 1e-6
+
+
+def test_solve_leaves_budget_unplaced_past_caps():
+    curve = fit_curve(('a', 'meta', 'app'), [(1000, 10), (2000, 16)])
+    plan = solve([curve], 1e9, cac_ceiling=None)
+    assert plan['allocated'] == pytest.approx(MAX_SCALE * 2000)
+
+
+def test_current_spend_is_each_cells_latest_week():
+    data = _dataset([
+        ('2026-01-25', 'a', 'meta', 'web', 1000, 10),
+        ('2026-02-01', 'a', 'meta', 'web', 1500, 12),
+        ('2026-02-08', 'a', 'meta', 'web', 2000, 15),   # only this cell runs a week further
+        ('2026-01-25', 'b', 'google', 'app', 800, 9),
+        ('2026-02-01', 'b', 'google', 'app', 900, 10),
+    ])
+    current = {curve.key[0]: curve.spend for curve in fit_curves(data)}
+    assert current == {'a': 2000, 'b': 900}
+    assert plan_dataset(data)['budget'] == 2900
+
+
+def test_sample_plans_keep_every_cells_current_spend(sample_datasets):
+    for market, data in sample_datasets.items():
+        if not data:
+            continue
+        plan = plan_dataset(data)
+        curves = fit_curves(data)
+        # Every cell that spent in its latest week keeps that spend as its baseline
+        for curve in curves:
+            weeks = {}
+            for row in data.filter(show=curve.key[0], channel=curve.key[1], platform=curve.key[2]):
+                weeks[row.week] = weeks.get(row.week, 0.0) + row.spend
+            assert curve.spend == pytest.approx(weeks[max(weeks)]), (market, curve.key)
+        assert plan['budget'] == pytest.approx(sum(curve.spend for curve in curves))
+        assert sum(cell['current_spend'] for cell in plan['cells']) == pytest.approx(plan['budget'])
+        assert plan['allocated'] <= plan['budget'] + 1e-6
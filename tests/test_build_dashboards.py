@@ -0,0 +1,105 @@
+"""build_dashboards: node keys, stale/up-to-date decisions and incremental builds"""
+
+import os
+import shutil
+
+from build_dashboards import BuildGraph, build, compressed_siblings, load_state, write_page
+from parse_cache import file_digest
+
+NAME = 'Stage_GJ- CAC SOLVER - Meta_SL-App.csv'
+EXPORT = (',Week (2026-02-01 to 2026-02-07),,,,,,\n'
+          'Show_Name - APP,Spends_GST,af_start_trial,Mandate_CAC,TCR_D0,AF_IR%,TR%_AF,CTR\n'
+          'Saanwari,"1,000",4,250,30%,10%,20%,0.5%\n')
+
+
+def _write(path, text, mtime):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding='utf-8')
+    # Distinct mtimes, so the content-hash stat records never go stale
+    os.utime(path, (mtime, mtime))
+
+
+def _tree(base):
+    _write(base / 'GJ Cac Solver' / NAME, EXPORT, 1_000_000)
+    _write(base / 'HR Cac Solver' / NAME.replace('GJ', 'HR'), EXPORT, 1_000_000)
+    return base
+
+
+def _built(graph):
+    """State as build() records it, with every page written"""
+    state = {}
+    for name, node in graph.pages.items():
+        write_page(node.output, f"<html>{name}</html>")
+        state[name] = {'key': node.key, 'output': file_digest(node.output)}
+    return state
+
+
+def test_pages_follow_markets(tmp_path):
+    base = _tree(tmp_path)
+    graph = BuildGraph(base)
+    assert sorted(graph.datasets) == ['gujarati', 'haryanvi']
+    assert sorted(graph.pages) == ['dashboard_generated.html', 'dashboard_gujarati.html',
+                                   'dashboard_haryanvi.html', 'dashboard_unified.html']
+    # A market-limited build leaves the unified page alone
+    assert sorted(BuildGraph(base, ['haryanvi']).pages) == ['dashboard_haryanvi.html']
+
+
+def test_up_to_date_until_something_changes(tmp_path):
+    base = _tree(tmp_path)
+    graph = BuildGraph(base)
+    assert sorted(graph.stale({})) == sorted(graph.pages)
+
+    state = _built(graph)
+    assert BuildGraph(base).stale(state) == []
+    assert sorted(BuildGraph(base).stale(state, force=True)) == sorted(graph.pages)
+
+    # Same content under a new mtime keeps every key
+    os.utime(base / 'GJ Cac Solver' / NAME, (1_000_050, 1_000_050))
+    assert BuildGraph(base).stale(state) == []
+
+
+def test_export_change_reaches_dependent_pages_only(tmp_path):
+    base = _tree(tmp_path)
+    state = _built(BuildGraph(base))
+    _write(base / 'GJ Cac Solver' / NAME, EXPORT.replace('"1,000"', '"1,200"'), 1_000_100)
+    assert sorted(BuildGraph(base).stale(state)) == ['dashboard_generated.html', 'dashboard_gujarati.html',
+                                                     'dashboard_unified.html']
+
+
+def test_generator_change_reaches_its_pages_only(tmp_path):
+    base = _tree(tmp_path)
+    _write(base / 'generate_market_dashboard.py', '# v1\n', 1_000_000)
+    state = _built(BuildGraph(base))
+    _write(base / 'generate_market_dashboard.py', '# v2\n', 1_000_100)
+    assert sorted(BuildGraph(base).stale(state)) == ['dashboard_gujarati.html', 'dashboard_haryanvi.html']
+
+    # Embedding the data compressed is a different page
+    assert sorted(BuildGraph(base, compress=True).stale(_built(BuildGraph(base)))) == sorted(state)
+
+
+def test_edited_or_incomplete_outputs_rebuild(tmp_path):
+    base = _tree(tmp_path)
+    state = _built(BuildGraph(base))
+    (base / 'dashboard_gujarati.html').write_text('<html>hand edit</html>', encoding='utf-8')
+    (base / 'dashboard_haryanvi.html.gz').unlink()
+    (base / 'dashboard_unified.html').unlink()
+    assert sorted(BuildGraph(base).stale(state)) == ['dashboard_gujarati.html', 'dashboard_haryanvi.html',
+                                                     'dashboard_unified.html']
+
+
+def test_build_skips_what_is_current(tmp_path, sample_exports):
+    base = tmp_path
+    folder = base / 'GJ Cac Solver'
+    folder.mkdir()
+    for path in sample_exports['gujarati']:
+        shutil.copy2(path, folder / path.name)
+    state_file = base / 'state.json'
+
+    built, skipped = build(base, workers=1, state_file=state_file)
+    assert sorted(built) == ['dashboard_generated.html', 'dashboard_gujarati.html', 'dashboard_unified.html']
+    assert skipped == []
+    for name in built:
+        assert all(path.exists() for path in compressed_siblings(base / name))
+    assert sorted(load_state(state_file)) == sorted(built)
+
+    assert build(base, workers=1, state_file=state_file) == ([], built)
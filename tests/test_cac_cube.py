@@ -0,0 +1,89 @@
+"""cac_cube: rollups against a brute-force group-by, and the embedded JSON"""
+
+import json
+import math
+from collections import defaultdict
+
+import pytest
+
+from cac_cube import CUBE_DIMENSIONS, DEFAULT_ROLLUPS, build_cube, cube_json, lookup
+from cac_dataset import ShowDataset
+from cac_metrics import SUM_INPUTS, SUMS, metrics_from_sums, row_sums
+
+
+@pytest.fixture(scope='module')
+def data(sample_datasets):
+    merged = ShowDataset()
+    for dataset in sample_datasets.values():
+        merged.extend(dataset)
+    return merged
+
+
+def _brute_force(data, rollup):
+    """{label tuple: sum vector} by summing each row's vector with fsum"""
+    groups = defaultdict(list)
+    for row in data:
+        groups[tuple(getattr(row, dim) for dim in rollup)].append(
+            row_sums(*(getattr(row, name) for name in SUM_INPUTS)))
+    return {key: [math.fsum(column) for column in zip(*rows)] for key, rows in groups.items()}
+
+
+def _cells(cube, rollup):
+    """{label tuple: sum vector} decoded from a built cube"""
+    labels = [cube['labels'][dim] for dim in rollup]
+    table = cube['rollups'][','.join(rollup)]
+    return {tuple(names[code] for names, code in zip(labels, key)): values
+            for key, values in zip(table['keys'], table['values'])}
+
+
+def test_rollups_match_brute_force(data):
+    cube = build_cube(data)
+    assert cube['dims'] == list(CUBE_DIMENSIONS) and cube['sums'] == list(SUMS)
+    assert sorted(cube['rollups']) == sorted(','.join(rollup) for rollup in DEFAULT_ROLLUPS)
+    assert len(cube['labels']['market']) > 1
+
+    for rollup in DEFAULT_ROLLUPS:
+        expected = _brute_force(data, rollup)
+        cells = _cells(cube, rollup)
+        assert cells.keys() == expected.keys(), rollup
+        for key, sums in expected.items():
+            assert cells[key] == pytest.approx(sums, rel=1e-9, abs=1e-6), (rollup, key)
+
+
+def test_coarser_rollups_are_sums_of_finer_ones(data):
+    cube = build_cube(data)
+    fine = _cells(cube, ('market', 'week', 'channel', 'platform'))
+    for rollup, positions in ((('market',), (0,)), (('market', 'channel'), (0, 2)),
+                              (('market', 'platform'), (0, 3)), (('market', 'week'), (0, 1))):
+        totals = defaultdict(lambda: [0.0] * len(SUMS))
+        for key, sums in fine.items():
+            cell = totals[tuple(key[i] for i in positions)]
+            cell[:] = [a + b for a, b in zip(cell, sums)]
+        cells = _cells(cube, rollup)
+        assert cells.keys() == totals.keys()
+        for key, sums in totals.items():
+            assert cells[key] == pytest.approx(sums, rel=1e-9, abs=1e-6), (rollup, key)
+
+
+def test_json_and_lookup(data):
+    cube = build_cube(data)
+    text = cube_json(data)
+    assert json.loads(text) == cube
+    assert text == json.dumps(cube, ensure_ascii=False, separators=(',', ':'))
+    # Integral sums print without a trailing '.0'
+    assert all(isinstance(value, int) for value in cube['rollups']['market']['values'][0][:2])
+
+    market = cube['labels']['market'][0]
+    rows = data.filter(market=market)
+    expected = metrics_from_sums(_brute_force(rows, ('market',))[(market,)])
+    assert lookup(cube, 'market', market) == pytest.approx(expected)
+    assert lookup(cube, 'market,channel', market, 'nowhere')['totalSpend'] == 0
+
+
+def test_custom_rollups_and_empty_dataset(data):
+    cube = build_cube(data, (('show',),))
+    assert list(cube['rollups']) == ['show']
+    assert _cells(cube, ('show',)).keys() == _brute_force(data, ('show',)).keys()
+
+    empty = build_cube(ShowDataset())
+    assert all(table == {'keys': [], 'values': []} for table in empty['rollups'].values())
@@ -0,0 +1,87 @@
+"""cac_dataset: columnar storage, serialization and bulk operations"""
+
+import json
+import math
+
+import pytest
+
+from cac_dataset import RECORD_FIELDS, ShowDataset
+
+ROWS = [
+    # show, channel, platform, spend, trials, cac, ir, tr, tcr, ctr, week
+    ('Saanwari', 'meta', 'app', 1007212.0, 3555, 283.0, 13.14, 25.02, 32.04, 0.55, '2026-02-01'),
+    ('31st', 'meta', 'app', 593574.0, 2362, 251.0, 21.13, math.nan, 31.51, 0.45, '2026-02-01'),
+    ('Saanwari', 'google', 'app', 380000.0, 1200, 316.7, 9.0, 20.0, 28.0, 1.2, '2026-02-01'),
+    ('Saanwari', 'meta', 'app', 900000.0, 3000, 300.0, 12.0, 24.0, 30.0, 0.5, '2026-01-25'),
+]
+
+
+def _dataset(market='gujarati'):
+    data = ShowDataset()
+    for *row, week in ROWS:
+        data.append(*row, week=week, section='main', market=market)
+    return data
+
+
+def _rows(data):
+    # NaN never equals itself; compare it as None
+    return [tuple(None if isinstance(v, float) and math.isnan(v) else v for v in
+                  (row.show, row.channel, row.platform, row.spend, row.trials, row.cac, row.ir, row.tr,
+                   row.tcr, row.ctr, row.week, row.market)) for row in data]
+
+
+def test_rows_read_back():
+    data = _dataset()
+    assert len(data) == 4
+    assert data[0].show == 'Saanwari' and data[-1].week == '2026-01-25'
+    assert data.labels('show') == ['Saanwari', '31st']
+    assert list(data.codes('show')) == [0, 1, 0, 0]
+    assert data.values('channel') == ['meta', 'meta', 'google', 'meta']
+    with pytest.raises(IndexError):
+        data[4]
+
+
+def test_bytes_round_trip():
+    data = _dataset()
+    copy = ShowDataset.from_bytes(data.to_bytes())
+    assert _rows(copy) == _rows(data)
+    assert copy.to_bytes() == data.to_bytes()
+    with pytest.raises(ValueError):
+        ShowDataset.from_bytes(b'XXXX' + data.to_bytes()[4:])
+
+
+def test_records_export_missing_as_null():
+    records = _dataset().to_records()
+    assert list(records[0]) == list(RECORD_FIELDS)
+    assert records[0]['trials'] == 3555
+    assert records[1]['tr'] is None
+    assert 'NaN' not in json.dumps(records)
+
+
+def test_take_and_filter():
+    data = _dataset()
+    assert _rows(data.take([3, 0])) == [_rows(data)[3], _rows(data)[0]]
+    meta = data.filter(channel='meta')
+    assert [row.show for row in meta] == ['Saanwari', '31st', 'Saanwari']
+    assert len(data.filter(show=('31st', 'Unknown'))) == 1
+    assert len(data.filter(show='Unknown')) == 0
+    latest = data.filter(lambda row: row.trials > 2000, week='2026-02-01')
+    assert [row.show for row in latest] == ['Saanwari', '31st']
+
+
+def test_group_by_keeps_first_seen_order():
+    data = _dataset()
+    assert data.group_indices('week', 'channel') == {
+        ('2026-02-01', 'meta'): [0, 1], ('2026-02-01', 'google'): [2], ('2026-01-25', 'meta'): [3]}
+    groups = data.group_by('show')
+    assert list(groups) == [('Saanwari',), ('31st',)]
+    assert [row.spend for row in groups[('Saanwari',)]] == [1007212.0, 380000.0, 900000.0]
+
+
+def test_concat_recodes_string_tables():
+    gujarati, haryanvi = _dataset(), _dataset('haryanvi').take([1, 2])
+    merged = ShowDataset.concat([haryanvi, gujarati])
+    assert merged.values('market') == ['haryanvi'] * 2 + ['gujarati'] * 4
+    assert _rows(merged)[2:] == _rows(gujarati)
+    assert merged.set_dimension('market', 'all').labels('market') == ['all']
+    assert merged.values('market') == ['all'] * 6
@@ -0,0 +1,73 @@
+"""cac_index: indexed block reads give the same batches as a full pass"""
+
+import pytest
+
+from cac_index import ExportIndex, iter_indexed_batches
+from cac_reader import iter_batches
+
+HEADER = 'Show_Name - APP,Spends_GST,af_start_trial,Mandate_CAC,CP_AF_CPT_D0,TCR_D0,AF_CPD1,AF_IR%,TR%_AF,CTR\n'
+
+# Two sections, a pivot row, notes with a quoted line break and a repeated header
+EXPORT = (
+    ',Week_range,Values,,,,,,,\n'
+    ',Week (2026-02-01 to 2026-02-07),,,,,,,,\n'
+    + HEADER +
+    'Saanwari,"1,007,212","3,555",283,285,32.04%,"2,107",13.14%,25.02%,0.55%\n'
+    '31st,"593,574","2,362",251,268,31.51%,"1,271",21.13%,28.43%,0.45%\n'
+    'Grand Total,"1,600,786","5,917",270,,,,,,\n'
+    '\n'
+    'Insights:\n'
+    '"vb shut off,\ncac was high"\n'
+    '\n'
+    'PAN IND - Stage TAM\n'
+    ',Week (2026-02-01 to 2026-02-07),,,,,,,,\n'
+    + HEADER +
+    'Minzar,"88,201",209,422,493,29.61%,"2,450",18.76%,15.71%,0.71%\n'
+    ',Week (2026-01-25 to 2026-01-31),,,,,,,,\n'
+    + HEADER +
+    'Minzar,"70,000",150,466,,,,,,\n'
+    'Akshar,"3,874",6,646,646,66.67%,"3,874",14.87%,15.00%,0.24%'
+)
+
+
+def _summary(batches):
+    return [(batch.section, batch.week, batch.notes, batch.data.to_bytes()) for batch in batches]
+
+
+@pytest.fixture
+def export(tmp_path):
+    path = tmp_path / 'Stage_GJ- CAC SOLVER - Meta_SL-App.csv'
+    path.write_text(EXPORT, encoding='utf-8')
+    return path
+
+
+def test_blocks_cover_every_section_and_week(export):
+    blocks = ExportIndex.scan(export).blocks()
+    assert [(block.section, block.week[0]) for block in blocks] == [
+        ('main', None), ('main', '2026-02-01'),
+        ('PAN IND - Stage TAM', '2026-02-01'), ('PAN IND - Stage TAM', '2026-01-25')]
+    assert blocks[-1].end == export.stat().st_size
+
+
+def test_indexed_read_matches_full_pass(export):
+    assert _summary(iter_indexed_batches(export, cache=False)) == _summary(iter_batches(export))
+
+
+def test_indexed_read_of_one_section(export):
+    full = [item for item in _summary(iter_batches(export)) if item[0] == 'PAN IND - Stage TAM']
+    assert len(full) == 2
+    assert _summary(iter_indexed_batches(export, ['PAN IND - Stage TAM'], cache=False)) == full
+
+
+def test_index_round_trip(export):
+    index = ExportIndex.scan(export)
+    copy = ExportIndex.from_bytes(index.to_bytes())
+    assert list(copy.entries()) == list(index.entries())
+    assert copy.size == index.size
+
+
+def test_sample_exports_match_full_pass(sample_exports):
+    for paths in sample_exports.values():
+        for path in paths:
+            if path.suffix.lower() == '.csv':
+                assert _summary(iter_indexed_batches(path, cache=False)) == _summary(iter_batches(path)), path
@@ -0,0 +1,80 @@
+"""cac_metrics: compensated group sums, and the NumPy pass against the pure-Python one"""
+
+import math
+import random
+
+import pytest
+
+import cac_metrics
+from cac_dataset import ShowDataset
+from cac_metrics import SUM_INPUTS, GroupedMetrics, row_sums
+
+DIMS = ((), ('market',), ('market', 'channel'), ('market', 'week', 'channel', 'platform'), ('show',))
+
+
+def _drifting(rows=20_000, seed=7):
+    """Rupee amounts that plain float accumulation gets visibly wrong"""
+    rng = random.Random(seed)
+    data = ShowDataset()
+    for i in range(rows):
+        spend = rng.choice((1e9, -1e9 + 0.1, 0.1, 123456.789))
+        data.append(f"show{i % 37}", rng.choice(('meta', 'google')), rng.choice(('app', 'web')),
+                    spend, rng.randint(0, 500), math.nan, rng.uniform(0, 40),
+                    math.nan if i % 5 == 0 else rng.uniform(0, 40), rng.uniform(0, 60), rng.uniform(0, 3),
+                    week=f"2026-0{1 + i % 3}-01", section='main', market=rng.choice(('gujarati', 'haryanvi')))
+    return data
+
+
+def _exact(data, dims):
+    groups = {}
+    for row in data:
+        groups.setdefault(tuple(getattr(row, dim) for dim in dims), []).append(
+            row_sums(*(getattr(row, name) for name in SUM_INPUTS)))
+    return {key: [math.fsum(column) for column in zip(*rows)] for key, rows in groups.items()}
+
+
+@pytest.fixture
+def pure_python(monkeypatch):
+    monkeypatch.setattr(cac_metrics, 'np', None)
+
+
+def _check(data, dims):
+    grouped = GroupedMetrics.of(data, *dims)
+    expected = _exact(data, dims)
+    # Groups come out in first-seen order
+    assert grouped.keys() == list(expected)
+    for key, sums in grouped.items():
+        assert sums == pytest.approx(expected[key], rel=1e-15, abs=1e-6), (dims, key)
+    return grouped
+
+
+@pytest.mark.parametrize('dims', DIMS)
+def test_python_pass_is_compensated(pure_python, dims):
+    _check(_drifting(), dims)
+
+
+def test_merge_matches_one_pass(pure_python):
+    data = _drifting(4_000)
+    halves = [GroupedMetrics.of(data.take(range(0, 2_000)), 'market'),
+              GroupedMetrics.of(data.take(range(2_000, 4_000)), 'market')]
+    merged = GroupedMetrics.merged(halves)
+    for key, sums in GroupedMetrics.of(data, 'market').items():
+        assert merged.sums(key) == pytest.approx(sums, rel=1e-15, abs=1e-6)
+    with pytest.raises(ValueError):
+        merged.merge(GroupedMetrics(('show',)))
+
+
+@pytest.mark.parametrize('dims', DIMS)
+def test_numpy_pass_matches_python(monkeypatch, sample_datasets, dims):
+    pytest.importorskip('numpy')
+    samples = ShowDataset()
+    for dataset in sample_datasets.values():
+        samples.extend(dataset)
+    for data in (_drifting(), samples):
+        vectorized = _check(data, dims)
+        monkeypatch.setattr(cac_metrics, 'np', None)
+        python = GroupedMetrics.of(data, *dims)
+        monkeypatch.undo()
+        assert vectorized.keys() == python.keys()
+        for key, sums in python.items():
+            assert vectorized.sums(key) == pytest.approx(sums, rel=1e-15, abs=1e-6), (dims, key)
@@ -0,0 +1,43 @@
+"""cac_numbers: cell decoding and MISSING handling"""
+
+import math
+
+import pytest
+
+from cac_numbers import (MISSING, fill_missing, finite_or_none, is_missing, missing_mask, parse_column,
+                         parse_number)
+
+CELLS = ['1,007,212', '32.04%', '₹3,363', '', ' 12 ', '#DIV/0!', None, '-4.5']
+EXPECTED = [1007212.0, 32.04, 3363.0, MISSING, 12.0, MISSING, MISSING, -4.5]
+
+
+def _same(values, expected):
+    return all((is_missing(a) and is_missing(b)) or a == b for a, b in zip(values, expected)) and \
+        len(values) == len(expected)
+
+
+def test_parse_number():
+    assert _same([parse_number(cell) for cell in CELLS], EXPECTED)
+    assert parse_number(7) == 7.0
+
+
+def test_parse_column_python_path():
+    assert _same(list(parse_column(CELLS, vectorized=False)), EXPECTED)
+    # Without stray text the fast path never falls back
+    assert list(parse_column(['1', '2,000', '3%'], vectorized=False)) == [1.0, 2000.0, 3.0]
+
+
+def test_parse_column_numpy_path():
+    pytest.importorskip('numpy')
+    assert _same(list(parse_column(CELLS, vectorized=True)), EXPECTED)
+
+
+def test_missing_helpers():
+    column = parse_column(['5', '', '7'])
+    assert missing_mask(column) == b'\x00\x01\x00'
+    assert list(fill_missing(column)) == [5.0, 0.0, 7.0]
+    assert list(fill_missing(column, -1)) == [5.0, -1.0, 7.0]
+    assert is_missing(None) and is_missing(MISSING) and not is_missing(0.0)
+    assert finite_or_none(MISSING) is None
+    assert finite_or_none(math.inf) is None
+    assert finite_or_none(2.5) == 2.5
@@ -0,0 +1,101 @@
+"""cac_payload: encoding round trip and the build-time sort orders"""
+
+import json
+import random
+
+import pytest
+
+from cac_dataset import RECORD_FIELDS, ShowDataset
+from cac_payload import PAGE_FIELDS, build_payload, decode_payload, pack_order, sort_order, unpack_order
+
+MISSING = float('nan')
+
+
+@pytest.mark.parametrize('rows', [0, 1, 5, 0x10000, 0x10001])
+def test_pack_order_round_trip(rows):
+    order = list(range(rows))
+    random.Random(rows).shuffle(order)
+    assert unpack_order(pack_order(order), rows) == order
+
+
+def test_pack_order_width():
+    # uint16 up to 65536 rows, uint32 past it (4 base64 chars per 3 bytes)
+    assert len(pack_order([0] * 3)) == 8
+    assert len(pack_order(list(range(0x10001)))) == 4 * -(-4 * 0x10001 // 3)
+
+
+def test_sort_order_stable_with_nulls_last():
+    values = [3, None, 1, 3, None, 2, 1]
+    assert sort_order(values) == [2, 6, 5, 0, 3, 1, 4]
+    assert sort_order(['b', 'a', 'b', 'A']) == [3, 1, 0, 2]
+    assert sort_order([]) == []
+
+
+def _dataset():
+    data = ShowDataset()
+    rows = [('gujarati', 'Saanwari', 'meta', 'app', 1007212.456, 3555, 283.0, 13.14, 25.02, 32.04, 0.55),
+            ('haryanvi', 'Randeep', 'meta', 'web', 1227822, 4862, 253, MISSING, MISSING, 12.1, 18),
+            ('gujarati', '31st', 'google', 'app', 593574, 2362, 251, 21.13, MISSING, 31.51, 0.45),
+            ('gujarati', 'Minzar', 'meta', 'app', 593574, 209, MISSING, 18.76, 15.71, 29.61, 0.71)]
+    for market, *row in rows:
+        data.append(*row, market=market)
+    return data
+
+
+def test_payload_decodes_to_records():
+    data = _dataset()
+    payload = json.loads(json.dumps(build_payload(data)))
+    records = decode_payload(payload)
+    assert [record['show'] for record in records] == data.values('show')
+    assert records[0]['spend'] == 1007212.46
+    assert records[0]['trials'] == 3555 and isinstance(records[0]['trials'], int)
+    assert records[1]['ir'] is None
+    assert list(records[0]) == list(RECORD_FIELDS)
+
+
+def test_orders_sort_each_market_slice():
+    payload = build_payload(_dataset(), group='market', orders=True)
+    assert set(payload['orders']) == {'gujarati', 'haryanvi'}
+
+    records = decode_payload(payload)
+    markets = payload['labels']['market']
+    for market, orders in payload['orders'].items():
+        rows = [record for record, code in zip(records, payload['columns']['market']) if markets[code] == market]
+        assert set(orders) == set(RECORD_FIELDS)
+        for field, packed in orders.items():
+            order = unpack_order(packed, len(rows))
+            assert sorted(order) == list(range(len(rows)))
+            assert order == sort_order([row[field] for row in rows])
+
+    spend = unpack_order(payload['orders']['gujarati']['spend'], 3)
+    # Equal spends keep their row order
+    assert spend == [1, 2, 0]
+    cac = unpack_order(payload['orders']['gujarati']['cac'], 3)
+    assert cac[-1] == 2  # the missing CAC sorts last
+
+
+def test_orders_of_ungrouped_payload():
+    payload = build_payload(_dataset(), orders=True)
+    assert list(payload['orders']) == ['']
+    assert unpack_order(payload['orders']['']['show'], 4) == [2, 3, 1, 0]
+
+
+
+def test_orders_of_each_week():
+    data = ShowDataset()
+    for row, week in zip(_dataset(), ('2026-02-01', '2026-02-08', '2026-02-08', '2026-02-01')):
+        data.append(*(getattr(row, name) for name in RECORD_FIELDS), week=week, market=row.market)
+    payload = build_payload(data, PAGE_FIELDS, group='market', orders=True)
+    # haryanvi has one week: its market orders already are that week's
+    assert set(payload['orders']) == {'gujarati', 'haryanvi', 'gujarati|2026-02-01', 'gujarati|2026-02-08'}
+
+    records = decode_payload(payload)
+    markets = [payload['labels']['market'][code] for code in payload['columns']['market']]
+    for week in ('2026-02-01', '2026-02-08'):
+        # The week's rows in market-slice order
+        rows = [record for record, market in zip(records, markets) if market == 'gujarati' and record['week'] == week]
+        for field, packed in payload['orders'][f"gujarati|{week}"].items():
+            assert unpack_order(packed, len(rows)) == sort_order([row[field] for row in rows])
+
+    ungrouped = build_payload(data.filter(market='gujarati'), PAGE_FIELDS, orders=True)
+    assert set(ungrouped['orders']) == {'', '|2026-02-01', '|2026-02-08'}
@@ -0,0 +1,121 @@
+"""cac_rankings: block rankings and their merges against a brute-force sort"""
+
+import json
+import math
+import random
+
+import pytest
+
+import insights_engine
+from cac_dataset import ShowDataset
+from cac_rankings import (CAC_TARGET, MIN_TRIALS, RANK_DIMENSIONS, TCR_TARGET, Columns, build_rankings,
+                          merge_rankings, rank_slice, rankings_json, slice_ranking)
+
+
+def _random(rows=300, seed=3):
+    rng = random.Random(seed)
+    data = ShowDataset()
+    for i in range(rows):
+        def maybe(value):
+            return math.nan if rng.random() < 0.15 else value
+        data.append(f"show{i % 23}", rng.choice(('meta', 'google')), rng.choice(('app', 'web')),
+                    rng.uniform(0, 500000), rng.choice((0, 50, 51, 120, rng.randint(0, 4000))),
+                    maybe(rng.choice((CAC_TARGET, rng.uniform(50, 600)))), 10.0, 20.0,
+                    maybe(rng.choice((TCR_TARGET, rng.uniform(5, 60)))), 0.5,
+                    week=rng.choice(('2026-01-25', '2026-02-01', '2026-02-08')), section='main',
+                    market=rng.choice(('gujarati', 'haryanvi')))
+    return data
+
+
+def _brute_force(data, positions, k=10):
+    """The ranking the pages used to compute: a stable sort by trials, then filters"""
+    rows = sorted(positions, key=lambda i: -int(data[i].trials))
+    cac = {i: data[i].cac for i in positions}
+    tcr = {i: data[i].tcr for i in positions}
+    trials = {i: int(data[i].trials) for i in positions}
+    return {
+        'size': len(rows),
+        'topTrials': rows[:k],
+        'cacEfficient': [i for i in rows if cac[i] < CAC_TARGET and trials[i] > MIN_TRIALS],
+        'cacOver': [i for i in rows if cac[i] >= CAC_TARGET],
+        'tcrHealthy': [i for i in rows if tcr[i] < TCR_TARGET],
+        'tcrPoor': [i for i in rows if tcr[i] >= TCR_TARGET],
+    }
+
+
+def _check(data, ranking, positions):
+    expected = _brute_force(data, positions)
+    assert ranking['size'] == expected['size']
+    assert ranking['topTrials'] == expected['topTrials']
+    for name in ('cacEfficient', 'cacOver', 'tcrHealthy', 'tcrPoor'):
+        bucket = ranking[name]
+        assert bucket['rows'] == expected[name], name
+        assert bucket['trials'] == sum(int(data[i].trials) for i in expected[name])
+        assert bucket['spend'] == pytest.approx(math.fsum(data[i].spend for i in expected[name]))
+    lost = sum(math.floor(int(data[i].trials) * max(0, (data[i].tcr - (TCR_TARGET - 1)) / 100))
+               for i in expected['tcrPoor'])
+    assert ranking['tcrPoor']['lostTrials'] == lost
+
+
+@pytest.fixture(scope='module')
+def data():
+    return _random()
+
+
+def test_blocks_match_brute_force(data):
+    rankings = build_rankings(data)
+    groups = data.group_indices(*RANK_DIMENSIONS)
+    assert rankings['dims'] == list(RANK_DIMENSIONS)
+    assert list(rankings['slices']) == ['|'.join(key) for key in groups]
+    for key, positions in groups.items():
+        _check(data, rankings['slices']['|'.join(key)], positions)
+    assert 'topSpend' not in next(iter(rankings['slices'].values()))
+
+
+@pytest.mark.parametrize('dims', [('market',), ('market', 'week'), ('channel',), ()])
+def test_merged_slices_match_brute_force(data, dims):
+    rankings, cols = build_rankings(data), Columns(data)
+    for key, positions in data.group_indices(*dims).items():
+        merged = slice_ranking(rankings, cols, **dict(zip(dims, key)))
+        _check(data, merged, positions)
+        # The merge is exactly what ranking the slice's rows directly gives
+        assert merged == rank_slice(positions, cols)
+
+
+def test_merge_of_merges_and_unknown_dimension(data):
+    rankings, cols = build_rankings(data), Columns(data)
+    by_market = [slice_ranking(rankings, cols, market=market) for market in ('gujarati', 'haryanvi')]
+    assert merge_rankings(by_market, cols) == rank_slice(range(len(data)), cols)
+    with pytest.raises(ValueError):
+        slice_ranking(rankings, cols, show='show1')
+
+
+def test_sample_markets(sample_datasets):
+    for data in sample_datasets.values():
+        rankings, cols = build_rankings(data), Columns(data)
+        _check(data, slice_ranking(rankings, cols), range(len(data)))
+
+
+def test_page_json(data):
+    rankings = build_rankings(data)
+    page = json.loads(rankings_json(data, rankings))
+    assert page['k'] == 10 and page['dims'] == list(RANK_DIMENSIONS)
+    assert page['thresholds'] == {'cac': CAC_TARGET, 'minTrials': MIN_TRIALS, 'tcr': TCR_TARGET}
+    for key, ranking in rankings['slices'].items():
+        entry = page['slices'][key]
+        assert entry['topTrials'] == [[data.codes('show')[i], int(data[i].trials)] for i in ranking['topTrials']]
+        assert [page['shows'][code] for code, _ in entry['topTrials']] == \
+            [data[i].show for i in ranking['topTrials']]
+        for name in ('cacEfficient', 'cacOver', 'tcrHealthy'):
+            assert entry[name][:2] == [len(ranking[name]['rows']), ranking[name]['trials']]
+        assert entry['tcrPoor'][3] == ranking['tcrPoor']['lostTrials']
+
+
+def test_insight_slices_read_the_block_rankings(data, monkeypatch):
+    expected = {key: insights_engine.evaluate(part, rank_slice(range(len(part)), Columns(part)))
+                for key, part in data.group_by('market', 'week').items()}
+    # Slices are merged from the build's rankings, never re-ranked from their rows
+    monkeypatch.setattr(insights_engine, 'build_rankings', None)
+    built = insights_engine.build_insights(data, (('market', 'week'),), cache=False,
+                                           rankings=build_rankings(data))
+    assert built['market,week'] == {'|'.join(key): insights for key, insights in expected.items()}
@@ -0,0 +1,123 @@
+"""cac_reader: section/week batching and parity with the original generator parse"""
+
+import csv
+import io
+import os
+
+from cac_numbers import is_missing
+from cac_reader import (BLANK, DATA, DEFAULT_SECTION, HEADER, NOTES, PIVOT, TEXT, WEEK, classify_row,
+                        iter_batches, iter_row_batches)
+
+META_HEADER = ['Show_Name - APP', 'Spends_GST', 'af_start_trial', 'Mandate_CAC', 'TCR_D0', 'AF_IR%', 'TR%_AF', 'CTR']
+
+
+def _rows(text):
+    return list(csv.reader(io.StringIO(text, newline='')))
+
+
+def test_classify_row():
+    assert classify_row(['', '', ''])[0] == BLANK
+    assert classify_row(['', 'Week (2026-02-01 to 2026-02-07)', '']) == (WEEK, ('2026-02-01', '2026-02-07'))
+    assert classify_row(META_HEADER)[0] == HEADER
+    assert classify_row(['', 'Week_range', 'Values'])[0] == PIVOT
+    assert classify_row(['PAN IND - Stage TAM', '']) == (TEXT, 'PAN IND - Stage TAM')
+    assert classify_row(['Insights:'])[0] == NOTES
+    assert classify_row(['Saanwari', '1,007', '3'])[0] == DATA
+
+
+def test_batches_split_by_week_and_section():
+    rows = _rows(
+        ',Week (2026-02-01 to 2026-02-07),,,,,,\n'
+        + ','.join(META_HEADER) + '\n'
+        'Saanwari,"1,007,212","3,555",283,32.04%,13.14%,25.02%,0.55%\n'
+        'Grand Total,"1,007,212","3,555",283,,,,\n'
+        ',Week (2026-01-25 to 2026-01-31),,,,,,\n'
+        + ','.join(META_HEADER) + '\n'
+        'Saanwari,"900,000","3,000",300,,,,\n'
+        '\n'
+        'Insights:\n'
+        '"vb shut off, cac was high"\n'
+        '\n'
+        'PAN IND - Stage TAM\n'
+        ',Week (2026-02-01 to 2026-02-07),,,,,,\n'
+        + ','.join(META_HEADER) + '\n'
+        '31st,"593,574","2,362",251,31.51%,21.13%,28.43%,0.45%\n')
+    batches = list(iter_row_batches(rows, 'Stage_GJ- CAC SOLVER - Meta_SL-App.csv'))
+
+    assert [(b.section, b.week_start, len(b)) for b in batches] == [
+        (DEFAULT_SECTION, '2026-02-01', 1),
+        (DEFAULT_SECTION, '2026-01-25', 1),
+        ('PAN IND - Stage TAM', '2026-02-01', 1)]
+    assert batches[1].notes == ['vb shut off, cac was high']
+
+    row = batches[0].data[0]
+    assert (row.show, row.channel, row.platform, row.spend, row.trials) == ('Saanwari', 'meta', 'app', 1007212, 3555)
+    assert row.tcr == 32.04
+    # Blank rate cells stay missing instead of becoming 0
+    assert is_missing(batches[1].data[0].tcr)
+
+
+def test_google_trials_derived_from_cac():
+    rows = _rows('showname,Spends_GST,CP_AF_CPT_D0,AF_IR%,AF_TR%,AF_TCR%,CTR\n'
+                 'Minzar,"10,000",250,1%,2%,3%,0.5%\n'
+                 'Akshar,"5,000",,1%,2%,3%,0.5%\n')
+    (batch,) = iter_row_batches(rows, 'Google_SL-app.csv')
+    assert batch.derive_trials
+    assert [(row.show, row.trials) for row in batch.data] == [('Minzar', 40), ('Akshar', 0)]
+
+
+def _baseline_parse(filepath):
+    """The generators' original DictReader parse, kept as the reference output"""
+    def clean_number(value):
+        if not value:
+            return 0
+        try:
+            return float(str(value).replace(',', '').replace('%', '').strip())
+        except ValueError:
+            return 0
+
+    with open(filepath, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    header_idx = next((i for i, line in enumerate(lines) if 'Spends_GST' in line or 'showname' in line), None)
+    if header_idx is None:
+        return []
+    filename = os.path.basename(filepath).lower()
+    is_meta, is_web = 'meta' in filename, 'web' in filename
+
+    data = []
+    for row in csv.DictReader(lines[header_idx:]):
+        show = (row.get('Show_Name - APP') or row.get('Show_Name') or row.get('showname') or
+                row.get('show') or '').strip()
+        if not show or show in ('Grand Total', 'Values') or 'Week' in show:
+            continue
+        spend = clean_number(row.get('Spends_GST', 0))
+        if is_meta and not is_web:
+            trials = int(clean_number(row.get('af_start_trial', 0)))
+            cac = clean_number(row.get('Mandate_CAC', 0))
+            ir, tr = clean_number(row.get('AF_IR%', 0)), clean_number(row.get('TR%_AF', 0))
+            tcr, ctr = clean_number(row.get('TCR_D0', 0)), clean_number(row.get('CTR', 0))
+        elif is_meta:
+            trials = int(clean_number(row.get('Trial_web', 0)))
+            cac = clean_number(row.get('Mandate_CAC', 0))
+            ir = tr = 0
+            tcr, ctr = clean_number(row.get('TCR_D0', 0)), clean_number(row.get('CTR', 0))
+        else:
+            cac = clean_number(row.get('CP_AF_CPT_D0', 0))
+            trials = int(spend / cac) if cac > 0 else 0
+            ir, tr = clean_number(row.get('AF_IR%', 0)), clean_number(row.get('AF_TR%', 0))
+            tcr, ctr = clean_number(row.get('AF_TCR%', 0)), clean_number(row.get('CTR', 0))
+        if spend > 0 or trials > 0:
+            data.append((show, 'meta' if is_meta else 'google', 'web' if is_web else 'app',
+                         spend, trials, cac, ir, tr, tcr, ctr))
+    return data
+
+
+def test_reader_matches_baseline_parse(sample_exports):
+    # The original parse only knew the GJ layouts
+    for path in sample_exports.get('gujarati', ()):
+        rows = []
+        for batch in iter_batches(path):
+            for row in batch.data:
+                rows.append((row.show, row.channel, row.platform, row.spend, row.trials) + tuple(
+                    0 if is_missing(value) else value for value in (row.cac, row.ir, row.tr, row.tcr, row.ctr)))
+        assert rows == _baseline_parse(path), path.name
@@ -0,0 +1,44 @@
+"""cac_schema: header matching and the compiled itemgetter extractor"""
+
+from cac_schema import FIELDS, match_schema
+
+HR_WEB = ['Grouped Showname', 'Spends_GST', 'Trial_web', 'Mandate_CAC', 'CP_AM_CPT_D0', 'TCR_D0', 'AM_CPD1',
+          'Hook Rate%', 'Hold Rate%', 'CTR', 'CPM', 'CPC', 'Spends_gst%']
+GJ_GOOGLE = ['showname', 'Spends_GST', 'CP_AF_CPT_D0', 'AF_CPI', 'AF_IR%', 'AF_TR%', 'AF_TCR%', 'CPM', 'CPC', 'CTR']
+
+
+def test_registered_layouts_match():
+    assert match_schema(HR_WEB, 'meta', 'web').schema.name == 'hr_v2_meta_web'
+    assert match_schema(GJ_GOOGLE, 'google', 'app').schema.name == 'gj_google_app'
+    hr_google = ['showname', 'Spends_gst', 'start_trial_d0', 'CP_AF_CPT_D0', 'AF_CPI', 'AF_IR%', 'AF_TR%',
+                 'AF_TCR%D0', 'CPM', 'CPC', 'CTR']
+    compiled = match_schema(hr_google, 'google', 'app')
+    assert compiled.schema.name == 'google_trials'
+    # Header names match case-insensitively
+    assert compiled.indices['spend'] == 1
+    assert compiled.indices['tcr'] == hr_google.index('AF_TCR%D0')
+
+
+def test_unknown_layout_falls_back_to_generic():
+    compiled = match_schema(['Show', 'Spend', 'CAC', 'CTR%'], 'google', 'web')
+    assert compiled.schema.name == 'generic_google'
+    assert compiled.platform == 'web'
+
+
+def test_extract_returns_fields_in_order():
+    compiled = match_schema(HR_WEB, 'meta', 'web')
+    row = ['Randeep Hooda', '1,227,822', '4,862', '253', '237', '12.1%', '', '11.36%', '0.26', '18.00%',
+           '757', '4', '48.76%']
+    extracted = compiled.extract(row)
+    assert len(extracted) == len(FIELDS)
+    assert dict(zip(FIELDS, extracted)) == {
+        'show': 'Randeep Hooda', 'spend': '1,227,822', 'trials': '4,862', 'cac': '253',
+        # The web layout has no IR/TR columns: they read as blank
+        'ir': '', 'tr': '', 'tcr': '12.1%', 'ctr': '18.00%'}
+
+
+def test_extract_pads_short_rows():
+    compiled = match_schema(GJ_GOOGLE, 'google', 'app')
+    assert compiled.derive_trials
+    extracted = compiled.extract(['Minzar', '10,000', '250'])
+    assert extracted == ('Minzar', '10,000', '', '250', '', '', '', '')
@@ -0,0 +1,100 @@
+"""dashboard_template: compiling skeletons, filling slots, and the rendered pages"""
+
+import json
+
+import pytest
+
+import dashboard_template
+from dashboard_template import (CHART_JS, Template, app_js, asset, chart_library, inert_script, load_template,
+                                market_label, render_market_page, render_market_shell, render_unified_page,
+                                script_json, worker_js)
+
+
+def test_assets_inline_at_compile_time_and_slots_fill_at_render():
+    template = Template('t', "<a>{{asset:cube.js}}</a>{{x}}|{{y}}|{{x}}")
+    assert template.slots == ['x', 'y']
+    page = template.render(x='1', y=2)
+    assert page == f"<a>{asset('cube.js')}</a>1|2|1"
+
+
+def test_slot_values_are_not_rescanned():
+    # A value that looks like a marker is page content, not another slot
+    template = Template('t', "{{a}}-{{b}}")
+    assert template.render(a='{{b}}', b='{{asset:cube.js}}') == '{{b}}-{{asset:cube.js}}'
+
+
+def test_missing_slot_raises_and_extra_values_are_ignored():
+    template = Template('t', "{{a}} {{b}}")
+    with pytest.raises(KeyError, match='missing slot.*b'):
+        template.render(a=1)
+    assert template.render(a=1, b=2, unused=3) == '1 2'
+
+
+def test_text_without_markers():
+    template = Template('t', "plain { braces } and {single}")
+    assert template.slots == []
+    assert template.render() == "plain { braces } and {single}"
+
+
+def test_missing_asset_fails_at_compile_time():
+    with pytest.raises(OSError):
+        Template('t', "{{asset:no-such-file.js}}")
+
+
+def test_load_template_compiles_once():
+    assert load_template('market.html') is load_template('market.html')
+    assert load_template('market_scripts.html').slots == [
+        'app_js', 'cube_json', 'data_payload', 'insights_json', 'market_label', 'rankings_json', 'worker_js']
+
+
+def test_escaping():
+    assert script_json('{"a": "</script>"}') == '{"a": "<\\/script>"}'
+    assert inert_script("x = '</SCRIPT>'; <!-- y") == "x = '<\\/SCRIPT>'; <\\!-- y"
+
+
+def test_market_page(sample_datasets):
+    market, data = next(iter(sample_datasets.items()))
+    page = render_market_page(data, market)
+    assert '{{' not in page
+    assert f"{len(data)} show records" in page
+    assert app_js('market') in page
+    assert inert_script(worker_js()) in page
+    # The shared CSS is inlined once, at compile time
+    assert page.count(asset('dashboard.css')) == 1
+    assert f"const MARKET_LABEL = {json.dumps(market_label(market))};" in page
+    # Nothing embedded closes its <script> early
+    assert page.count('</script>') == page.count('<script')
+
+
+def test_unified_page_and_bundle_shell(sample_datasets):
+    page = render_unified_page(sample_datasets)
+    assert '{{' not in page
+    assert page.count('</script>') == page.count('<script')
+    assert app_js('unified') in page
+    for market in sample_datasets:
+        assert f'data-market="{market}"' in page
+
+    shell = render_market_shell('gujarati', {'manifest': 'manifest.json', 'app': 'app-market.0123456789ab.js'})
+    assert '{{' not in shell and 'const PAYLOAD' not in shell
+    assert '"app": "app-market.0123456789ab.js"' in shell
+    assert asset('bundle.js') in shell
+
+
+@pytest.fixture
+def assets_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(dashboard_template, 'ASSETS_DIR', tmp_path)
+    asset.cache_clear()
+    yield tmp_path
+    asset.cache_clear()
+
+
+def test_missing_chart_library_fails_unless_cdn_is_asked_for(assets_dir, monkeypatch):
+    monkeypatch.delenv('STAGE_CHART_CDN', raising=False)
+    with pytest.raises(FileNotFoundError, match='--vendor'):
+        chart_library()
+    monkeypatch.setenv('STAGE_CHART_CDN', '1')
+    assert chart_library() is None
+
+    (assets_dir / 'vendor').mkdir()
+    (assets_dir / CHART_JS).write_text('window.Chart = function () {};')
+    assert chart_library() == 'window.Chart = function () {};'
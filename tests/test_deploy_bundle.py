@@ -0,0 +1,92 @@
+"""deploy_bundle: manifest contents, content-hashed shards, reuse and pruning"""
+
+import hashlib
+import json
+
+import pytest
+
+from cac_payload import PAGE_FIELDS
+from deploy_bundle import HASH_LENGTH, MANIFEST, build_bundle, hashed_name
+
+
+def _manifest(out_dir):
+    return json.loads((out_dir / MANIFEST).read_text(encoding='utf-8'))
+
+
+def test_hashed_name():
+    data = b'{"rows": 0}'
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    assert hashed_name('gujarati-2026-02-01', data, '.json') == f"gujarati-2026-02-01.{digest}.json"
+    # Unsafe characters in the stem are replaced, the hash only follows the bytes
+    assert hashed_name('a b/c', data, '.json') == f"a_b_c.{digest}.json"
+    assert hashed_name('x', b'other', '.json') != hashed_name('x', data, '.json')
+
+
+@pytest.fixture
+def bundle(sample_datasets, tmp_path):
+    return build_bundle(sample_datasets, tmp_path / 'dist')
+
+
+def test_manifest_lists_every_file(bundle, sample_datasets):
+    out_dir = bundle.out_dir
+    manifest = _manifest(out_dir)
+    assert set(manifest['markets']) == set(sample_datasets)
+    assert set(manifest['pages']) == set(sample_datasets) | {'unified'}
+    assert manifest['pages']['unified']['markets'] == list(sample_datasets)
+
+    on_disk = {path.relative_to(out_dir).as_posix() for path in out_dir.rglob('*') if path.is_file()}
+    assert set(manifest['files']) == on_disk - {MANIFEST}
+    for page in manifest['pages'].values():
+        for name in ('cube', 'rankings', 'insights'):
+            assert page[name] in manifest['files']
+    for market, data in sample_datasets.items():
+        assert f"dashboard_{market}.html" in manifest['files']
+        weeks = manifest['markets'][market]['weeks']
+        assert sorted(week['week'] for week in weeks) == sorted(data.labels('week'))
+        assert sum(week['rows'] for week in weeks) == len(data)
+
+
+def test_shards_are_content_addressed(bundle, sample_datasets):
+    manifest = _manifest(bundle.out_dir)
+    for market, data in sample_datasets.items():
+        for week in manifest['markets'][market]['weeks']:
+            path = bundle.out_dir / week['file']
+            raw = path.read_bytes()
+            assert path.name == hashed_name(f"{market}-{week['week']}", raw, '.json')
+            shard = json.loads(raw)
+            assert shard['rows'] == week['rows'] == len(data.filter(week=week['week']))
+            assert shard['fields'] == list(PAGE_FIELDS)
+            assert shard['labels']['week'] == [week['week']]
+            # The shard's orders are its week's; the page files them under 'market|week'
+            assert set(shard['orders']) == {market}
+
+
+def test_rebuild_reuses_unchanged_files(bundle, sample_datasets):
+    again = build_bundle(sample_datasets, bundle.out_dir)
+    assert again.written == [] and again.removed == []
+    assert sorted(again.reused) == sorted(again.files)
+
+
+def test_pruning_keeps_the_previous_build_one_round(bundle, sample_datasets):
+    out_dir = bundle.out_dir
+    market, data = next(iter(sample_datasets.items()))
+    first = _manifest(out_dir)
+
+    # Changed rows get new shards (and page files); the old ones stay for pages still open
+    changed = dict(sample_datasets)
+    changed[market] = data.take(range(1, len(data)))
+    second = build_bundle(changed, out_dir)
+    replaced = set(first['files']) - set(_manifest(out_dir)['files'])
+    assert replaced & {week['file'] for week in first['markets'][market]['weeks']}
+    assert second.removed == []
+    assert all((out_dir / path).exists() for path in replaced)
+
+    # Unlisted by both the new and the previous manifest: removed
+    stray = out_dir / 'data' / hashed_name('stray', b'{}', '.json')
+    stray.write_bytes(b'{}')
+    untouched = out_dir / 'notes.txt'
+    untouched.write_text('kept')
+    third = build_bundle(changed, out_dir)
+    assert sorted(third.removed) == sorted(replaced | {stray.relative_to(out_dir).as_posix()})
+    assert not any((out_dir / path).exists() for path in third.removed)
+    assert untouched.exists()
@@ -0,0 +1,98 @@
+"""history_store: reload rules and parity with the folder parse"""
+
+import os
+import shutil
+
+import pytest
+
+from history_store import HistoryStore, load_market
+
+NAME = 'Stage_GJ- CAC SOLVER - Meta_SL-App.csv'
+HEADER = 'Show_Name - APP,Spends_GST,af_start_trial,Mandate_CAC,TCR_D0,AF_IR%,TR%_AF,CTR\n'
+
+
+def _export(week, rows):
+    return f',Week ({week} to 2026-12-31),,,,,,\n' + HEADER + ''.join(
+        f'{show},{spend},{trials},{spend // max(trials, 1)},30%,10%,20%,0.5%\n' for show, spend, trials in rows)
+
+
+def _write(path, text, mtime):
+    path.write_text(text, encoding='utf-8')
+    # Distinct mtimes, so the content-hash stat records never go stale
+    os.utime(path, (mtime, mtime))
+
+
+def _records(data):
+    return sorted((row.week, row.show, row.channel, row.platform, row.spend, row.trials) for row in data)
+
+
+@pytest.fixture
+def store(tmp_path):
+    with HistoryStore(tmp_path / 'history.db') as store:
+        yield store
+
+
+def test_sample_folders_match_the_folder_parse(store, sample_exports, sample_datasets):
+    for market, paths in sample_exports.items():
+        for path in paths:
+            store.ingest_file(path, market)
+        assert _records(store.load_dataset(market)) == _records(sample_datasets[market])
+
+
+def test_unchanged_file_is_skipped(store, tmp_path):
+    path = tmp_path / NAME
+    _write(path, _export('2026-02-01', [('Saanwari', 1000, 4)]), 1_000_000)
+    assert store.ingest_file(path, 'gujarati') == 1
+    assert store.ingest_file(path, 'gujarati') is None
+
+
+def test_changed_and_reverted_files_reload(store, tmp_path):
+    path = tmp_path / NAME
+    first = _export('2026-02-01', [('Saanwari', 1000, 4), ('31st', 500, 2)])
+    _write(path, first, 1_000_000)
+    store.ingest_file(path, 'gujarati')
+
+    # The new content covers another week: the first load's rows go away
+    _write(path, _export('2026-02-08', [('Saanwari', 1200, 5)]), 1_000_100)
+    assert store.ingest_file(path, 'gujarati') == 1
+    assert _records(store.load_dataset('gujarati')) == [('2026-02-08', 'Saanwari', 'meta', 'app', 1200, 5)]
+
+    # Reverting to content seen before loads it again
+    _write(path, first, 1_000_200)
+    assert store.ingest_file(path, 'gujarati') == 2
+    assert [row.week for row in store.load_dataset('gujarati')] == ['2026-02-01', '2026-02-01']
+
+
+def test_same_content_under_another_name_loads(store, tmp_path):
+    text = _export('2026-02-01', [('Saanwari', 1000, 4)])
+    _write(tmp_path / NAME, text, 1_000_000)
+    copy = tmp_path / 'copy' / NAME.replace('.csv', ' (1).csv')
+    copy.parent.mkdir()
+    shutil.copy(tmp_path / NAME, copy)
+    assert store.ingest_file(tmp_path / NAME, 'gujarati') == 1
+    assert store.ingest_file(copy, 'gujarati') == 1
+    # The second file replaced the block rather than adding to it
+    assert len(store.load_dataset('gujarati')) == 1
+
+
+def test_duplicate_show_rows_are_kept(store, tmp_path):
+    path = tmp_path / NAME
+    _write(path, _export('2026-02-01', [('Saanwari', 1000, 4), ('Saanwari', 300, 1)]), 1_000_000)
+    assert store.ingest_file(path, 'gujarati') == 2
+    assert [(row.spend, row.trials) for row in store.load_dataset('gujarati')] == [(1000, 4), (300, 1)]
+
+
+def test_corrupt_file_is_reported_and_skipped(store, tmp_path, monkeypatch, capsys):
+    _write(tmp_path / NAME, _export('2026-02-01', [('Saanwari', 1000, 4)]), 1_000_000)
+    bad = tmp_path / 'Stage_GJ- CAC SOLVER - Google_SL-app.csv'
+    bad.write_bytes(b'\xff\xfe\x00broken,Week (2026-02-01 to 2026-02-07)\n')
+
+    files, errors = store.ingest_folder(tmp_path, 'gujarati')
+    assert files == [(NAME, 1)]
+    assert [(name, error.split(':')[0]) for name, error in errors] == [(bad.name, 'UnicodeDecodeError')]
+    assert len(store.load_dataset('gujarati')) == 1
+
+    # The generators' loader reports the failure and still returns the good file
+    monkeypatch.setenv('STAGE_HISTORY_DB', str(tmp_path / 'other.db'))
+    assert [row.show for row in load_market(tmp_path, 'gujarati')] == ['Saanwari']
+    assert f"ERROR parsing {bad.name}: UnicodeDecodeError" in capsys.readouterr().out
@@ -0,0 +1,87 @@
+"""insights_engine: the rules against the strings the pages' JavaScript used to print"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from cac_dataset import ShowDataset
+from insights_engine import DEFAULT_SLICES, build_insights, evaluate, to_fixed, to_locale
+
+# generateInsights() of the original dashboard page (generate_dashboard.py
+# before the rules moved to Python) run in node on the sample markets and on
+# EDGE_CASES, plus Number.toFixed / toLocaleString('en-US' / 'en-IN') outputs
+GOLDEN = json.loads((Path(__file__).parent / 'golden' / 'insights_baseline.json').read_text(encoding='utf-8'))
+
+# Rules the page never had: the budget plan and the week-over-week anomalies
+PYTHON_ONLY = ('📈 Budget Plan', '⚠️ ')
+
+
+def _record(show, channel, platform, spend, trials, cac, tcr):
+    return {'show': show, 'channel': channel, 'platform': platform, 'spend': spend, 'trials': trials,
+            'cac': cac, 'ir': 10.0, 'tr': 20.0, 'tcr': tcr, 'ctr': 0.5}
+
+
+# Ties on trials, missing CAC / TCR, values right on the thresholds, and one
+# channel or platform missing (its CAC divides by zero)
+EDGE_CASES = {
+    'ties_and_missing': [
+        _record('Alpha', 'meta', 'app', 125000.5, 500, 250, 30),
+        _record('Beta', 'meta', 'web', 98765.43, 500, None, 29.99),
+        _record('Gamma', 'google', 'app', 40000, 51, 249.99, None),
+        _record('Delta', 'google', 'web', 1234567.891, 50, 180.25, 45.5),
+        _record('Epsilon', 'meta', 'app', 0, 0, None, None),
+    ],
+    'meta_app_only': [
+        _record('Solo', 'meta', 'app', 1000000, 4000, 250, 31),
+        _record('Duo', 'meta', 'app', 2500.75, 12, 208.4, 12.5),
+    ],
+    'no_trials': [
+        _record('Quiet', 'google', 'web', 500, 0, None, None),
+        _record('Silent', 'meta', 'app', 0, 0, None, 0),
+    ],
+    'large_numbers': [
+        _record('Mega', 'meta', 'web', 98765432.1, 1234567, 80.004, 5.55),
+        _record('Giga', 'google', 'app', 12345678.9, 98765, 125.005, 30.05),
+        _record('Tera', 'google', 'web', 0.5, 1, 0.5, 99.95),
+    ],
+}
+
+
+def edge_dataset(name):
+    return ShowDataset.from_records(EDGE_CASES[name], market='test', week='2026-02-01', section='main')
+
+
+def _page_rules(insights):
+    return [insight for insight in insights if not insight['title'].startswith(PYTHON_ONLY)]
+
+
+@pytest.mark.parametrize('name', sorted(EDGE_CASES))
+def test_edge_cases_match_baseline(name):
+    assert _page_rules(evaluate(edge_dataset(name))) == GOLDEN['datasets'][name]
+
+
+def test_sample_markets_match_baseline(sample_datasets):
+    for market, data in sample_datasets.items():
+        assert _page_rules(evaluate(data)) == GOLDEN['datasets'][market], market
+
+
+@pytest.mark.parametrize('value, digits, expected', GOLDEN['toFixed'])
+def test_to_fixed(value, digits, expected):
+    assert to_fixed(value, digits) == expected
+
+
+@pytest.mark.parametrize('value, us, indian', GOLDEN['toLocaleString'])
+def test_to_locale(value, us, indian):
+    assert to_locale(value) == us
+    assert to_locale(value, indian=True) == indian
+
+
+def test_default_slices_cover_market_weeks(sample_datasets):
+    assert ('market', 'week') in DEFAULT_SLICES
+    data = next(iter(sample_datasets.values()))
+    built = build_insights(data, cache=False)
+    assert set(built) == {','.join(dims) for dims in DEFAULT_SLICES}
+    for market, week in data.group_indices('market', 'week'):
+        insights = built['market,week'][f"{market}|{week}"]
+        assert insights == evaluate(data.filter(market=market, week=week))
@@ -0,0 +1,43 @@
+"""parse_cache: entry keys and cached loads"""
+
+import parse_cache
+from cac_dataset import ShowDataset
+from parse_cache import ParseCache, version_tag
+
+
+def _parse(calls):
+    def parse(path):
+        calls.append(path)
+        data = ShowDataset()
+        data.append('Saanwari', 'meta', 'app', 1000.0, 4, 250.0, 1.0, 2.0, 3.0, 0.5, week='2026-02-01')
+        return data
+    return parse
+
+
+def test_load_parses_once(tmp_path):
+    export = tmp_path / 'export.csv'
+    export.write_text('a,b\n', encoding='utf-8')
+    cache = ParseCache(tmp_path / 'cache')
+    calls = []
+    first = cache.load(export, _parse(calls))
+    second = cache.load(export, _parse(calls))
+    assert len(calls) == 1
+    assert second.to_bytes() == first.to_bytes()
+
+    # New content is a new entry
+    export.write_text('a,b,c\n', encoding='utf-8')
+    cache.load(export, _parse(calls))
+    assert len(calls) == 2
+
+
+def test_entry_names_carry_the_parser_code_hash(tmp_path, monkeypatch):
+    export = tmp_path / 'export.csv'
+    export.write_text('a,b\n', encoding='utf-8')
+    cache = ParseCache(tmp_path / 'cache')
+    entry = cache.entry_path(export, 'sections=main')
+    assert version_tag() in entry.name
+
+    # Different parser code (here: a different source set) gives different entries
+    monkeypatch.setattr(parse_cache, '_version_tag', None)
+    monkeypatch.setattr(parse_cache, 'PARSER_SOURCES', parse_cache.PARSER_SOURCES[:-1])
+    assert cache.entry_path(export, 'sections=main') != entry
@@ -0,0 +1,107 @@
+"""xlsx_reader: shared strings, percent styles and parity with the CSV row pipeline"""
+
+import zipfile
+
+from cac_reader import iter_row_batches
+from xlsx_reader import iter_batches, iter_sheets
+
+NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+# 0 Week marker, 1 header cells, 7.. show names (one rich-text, one with a phonetic hint)
+SHARED = [
+    'Week (2026-02-01 to 2026-02-07)',
+    'Show_Name - APP', 'Spends_GST', 'af_start_trial', 'Mandate_CAC', 'TCR_D0', 'AF_IR%',
+    'Saanwari',
+    '<r><t>31</t></r><r><rPr><b/></rPr><t>st</t></r>',
+    '<t>Dhundh</t><rPh sb="0" eb="1"><t>ignored</t></rPh>',
+]
+
+# cellXfs: 0 general, 1 built-in 10 (0.00%), 2 custom '0.0%', 3 custom non-percent
+STYLES = f'''<styleSheet xmlns="{NS}">
+<numFmts count="2"><numFmt numFmtId="164" formatCode="0.0%"/><numFmt numFmtId="165" formatCode="#,##0"/></numFmts>
+<cellStyleXfs count="1"><xf numFmtId="9"/></cellStyleXfs>
+<cellXfs count="4"><xf numFmtId="0"/><xf numFmtId="10"/><xf numFmtId="164"/><xf numFmtId="165"/></cellXfs>
+</styleSheet>'''
+
+MAIN_ROWS = '''
+<row r="1"><c r="B1" t="s"><v>0</v></c></row>
+<row r="2"><c r="A2" t="s"><v>1</v></c><c r="B2" t="s"><v>2</v></c><c r="C2" t="s"><v>3</v></c>
+  <c r="D2" t="s"><v>4</v></c><c r="E2" t="s"><v>5</v></c><c r="F2" t="s"><v>6</v></c></row>
+<row r="3"><c r="A3" t="s"><v>7</v></c><c r="B3" s="3"><v>1007212</v></c><c r="C3"><v>3555</v></c>
+  <c r="D3"><v>283</v></c><c r="E3" s="1"><v>0.3204</v></c><c r="F3" s="2"><v>0.1314</v></c></row>
+<row r="4"><c r="A4" t="s"><v>8</v></c><c r="B4"><v>593574</v></c><c r="C4"><v>2362</v></c>
+  <c r="D4"><v>251</v></c><c r="E4" s="1"><v>0.3151</v></c><c r="F4" s="2"><v>0.2113</v></c></row>
+<row r="6"><c r="A6" t="s"><v>9</v></c><c r="C6"><v>12</v></c><c r="F6" t="inlineStr"><is><t>n/a</t></is></c></row>
+'''
+
+
+def _sheet(rows):
+    return f'<worksheet xmlns="{NS}"><sheetData>{rows}</sheetData></worksheet>'
+
+
+def _shared_strings():
+    items = ''.join(f'<si>{s if s.startswith("<") else f"<t>{s}</t>"}</si>' for s in SHARED)
+    return f'<sst xmlns="{NS}" count="{len(SHARED)}">{items}</sst>'
+
+
+def _write_workbook(path):
+    workbook = f'''<workbook xmlns="{NS}" xmlns:r="{REL_NS}"><sheets>
+<sheet name="Meta App" sheetId="1" r:id="rId1"/>
+<sheet name="Scratch" sheetId="2" state="hidden" r:id="rId2"/>
+<sheet name="Sheet1" sheetId="3" r:id="rId3"/>
+</sheets></workbook>'''
+    rels = '''<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Target="worksheets/sheet1.xml"/>
+<Relationship Id="rId2" Target="worksheets/sheet2.xml"/>
+<Relationship Id="rId3" Target="/xl/worksheets/sheet3.xml"/>
+</Relationships>'''
+    with zipfile.ZipFile(path, 'w') as book:
+        book.writestr('xl/workbook.xml', workbook)
+        book.writestr('xl/_rels/workbook.xml.rels', rels)
+        book.writestr('xl/sharedStrings.xml', _shared_strings())
+        book.writestr('xl/styles.xml', STYLES)
+        book.writestr('xl/worksheets/sheet1.xml', _sheet(MAIN_ROWS))
+        book.writestr('xl/worksheets/sheet2.xml', _sheet('<row r="1"><c r="A1"><v>1</v></c></row>'))
+        book.writestr('xl/worksheets/sheet3.xml', _sheet('<row r="1"><c r="A1" t="b"><v>1</v></c></row>'))
+    return path
+
+
+def _read(path):
+    return [(source, list(rows)) for source, rows in iter_sheets(path)]
+
+
+def test_visible_sheets_and_sources(tmp_path):
+    sheets = _read(_write_workbook(tmp_path / 'GJ export.xlsx'))
+    # The hidden sheet is skipped; a generic sheet name falls back to the workbook's name
+    assert [source for source, rows in sheets] == ['Meta App', 'GJ export - Sheet1']
+    assert sheets[1][1] == [['TRUE']]
+
+
+def test_shared_strings_and_percent_styles(tmp_path):
+    source, rows = _read(_write_workbook(tmp_path / 'book.xlsx'))[0]
+    assert rows[0] == ['', 'Week (2026-02-01 to 2026-02-07)']
+    assert rows[1] == ['Show_Name - APP', 'Spends_GST', 'af_start_trial', 'Mandate_CAC', 'TCR_D0', 'AF_IR%']
+    # Built-in and custom percent formats come back as "32.04%"; other formats stay raw
+    assert rows[2] == ['Saanwari', '1007212', '3555', '283', '32.04%', '13.14%']
+    # Rich-text runs are joined
+    assert rows[3][0] == '31st'
+    # The skipped row 5 surfaces as one blank row; gaps between cells are padded
+    assert rows[4] == ['']
+    # Phonetic hints are dropped from the shared string
+    assert rows[5] == ['Dhundh', '', '12', '', '', 'n/a']
+
+
+def test_batches_match_csv_rows(tmp_path):
+    path = _write_workbook(tmp_path / 'book.xlsx')
+    source, rows = _read(path)[0]
+    expected = list(iter_row_batches(rows, source))
+    batches = [batch for batch in iter_batches(path) if batch.source == 'Meta App']
+
+    assert len(batches) == len(expected) == 1
+    batch = batches[0]
+    assert (batch.channel, batch.platform) == ('meta', 'app')
+    assert batch.week == '2026-02-01 to 2026-02-07'
+    assert batch.data.to_records() == expected[0].data.to_records()
+    assert [row.show for row in batch.data] == ['Saanwari', '31st', 'Dhundh']
+    assert batch.data[0].tcr == 32.04 and batch.data[1].ir == 21.13
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+STAGE XLSX Reader
+Streams the sheets of an .xlsx workbook into the same row pipeline as CSV.
+
+The workbook is read straight from its zip: sheet XML is pulled row by row
+with iterparse and each row is cleared as soon as it is handed on, so memory
+stays flat however long the sheet is.  Only the shared-strings table is held
+in full.  Every visible sheet (e.g. Meta App / Meta Web / Google) becomes its
+own source for cac_reader.iter_row_batches.
+
+Cells come out as the strings a CSV export would contain: shared/inline
+strings as text, numbers as written, and percentage-formatted numbers
+scaled back to "32.04%".
+"""
+
+import posixpath
+import re
+import zipfile
+from pathlib import Path
+from xml.etree.ElementTree import iterparse
+
+from cac_reader import iter_row_batches
+
+# Built-in number formats that display as a percentage
+_PERCENT_FORMATS = {9, 10}
+
+_CELL_REF = re.compile(r'([A-Z]+)(\d*)')
+
+
+def _local(tag):
+    """Tag name without its namespace (workbooks use transitional or strict)"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _column_index(ref):
+    """Zero-based column of a cell reference such as 'AB12'"""
+    letters = _CELL_REF.match(ref).group(1)
+    index = 0
+    for char in letters:
+        index = index * 26 + ord(char) - 64
+    return index - 1
+
+
+def _attr(elem, name):
+    """Attribute by local name (r:id and friends carry a namespace)"""
+    for key, value in elem.attrib.items():
+        if _local(key) == name:
+            return value
+    return None
+
+
+def _read_shared_strings(book):
+    try:
+        source = book.open('xl/sharedStrings.xml')
+    except KeyError:
+        return []
+    strings = []
+    with source:
+        parts = []
+        in_phonetic = False
+        for event, elem in iterparse(source, events=('start', 'end')):
+            tag = _local(elem.tag)
+            if event == 'start':
+                if tag == 'rPh':
+                    in_phonetic = True
+                continue
+            if tag == 't':
+                # Phonetic hints are not part of the cell text
+                if not in_phonetic:
+                    parts.append(elem.text or '')
+            elif tag == 'rPh':
+                in_phonetic = False
+            elif tag == 'si':
+                strings.append(''.join(parts))
+                parts.clear()
+                elem.clear()
+    return strings
+
+
+def _read_percent_styles(book):
+    """Style indices (the cells' s= attribute) whose number format is a percentage"""
+    try:
+        source = book.open('xl/styles.xml')
+    except KeyError:
+        return set()
+    percent_formats = set(_PERCENT_FORMATS)
+    styles = []
+    in_cell_xfs = False
+    with source:
+        for event, elem in iterparse(source, events=('start', 'end')):
+            tag = _local(elem.tag)
+            if event == 'start':
+                if tag == 'cellXfs':
+                    in_cell_xfs = True
+                continue
+            if tag == 'numFmt' and '%' in (elem.get('formatCode') or ''):
+                percent_formats.add(int(elem.get('numFmtId')))
+            elif tag == 'xf' and in_cell_xfs:
+                styles.append(int(elem.get('numFmtId') or 0))
+            elif tag == 'cellXfs':
+                in_cell_xfs = False
+    return {i for i, fmt in enumerate(styles) if fmt in percent_formats}
+
+
+def list_sheets(book):
+    """(name, zip member) of every visible sheet, in workbook order"""
+    targets = {}
+    with book.open('xl/_rels/workbook.xml.rels') as source:
+        for event, elem in iterparse(source):
+            if _local(elem.tag) == 'Relationship':
+                target = elem.get('Target')
+                if target.startswith('/'):
+                    target = target.lstrip('/')
+                else:
+                    target = posixpath.normpath(posixpath.join('xl', target))
+                targets[elem.get('Id')] = target
+
+    sheets = []
+    with book.open('xl/workbook.xml') as source:
+        for event, elem in iterparse(source):
+            if _local(elem.tag) == 'sheet' and elem.get('state') in (None, 'visible'):
+                target = targets.get(_attr(elem, 'id'))
+                if target:
+                    sheets.append((elem.get('name'), target))
+    return sheets
+
+
+def _cell_text(cell, ns, shared, percent_styles):
+    kind = cell.get('t')
+    if kind == 'inlineStr':
+        return ''.join(t.text or '' for t in cell.iter(ns + 't'))
+    value = cell.findtext(ns + 'v')
+    if value is None:
+        return ''
+    if kind == 's':
+        return shared[int(value)]
+    if kind == 'b':
+        return 'TRUE' if value == '1' else 'FALSE'
+    if kind in ('str', 'e'):
+        return value
+    if percent_styles and int(cell.get('s') or 0) in percent_styles:
+        return f"{float(value) * 100:.10g}%"
+    return value
+
+
+def iter_sheet_rows(book, member, shared, percent_styles=frozenset()):
+    """Rows of one sheet as lists of strings; a gap of empty rows yields one blank row"""
+    ns = None
+    sheet_data = None
+    last_row = 0
+    columns = {}  # column letters -> index
+    with book.open(member) as source:
+        for event, elem in iterparse(source, events=('start', 'end')):
+            if event == 'start':
+                if ns is None:
+                    # Namespace of the root element (transitional or strict)
+                    ns = elem.tag[:elem.tag.index('}') + 1] if elem.tag[0] == '{' else ''
+                    row_tag, cell_tag = ns + 'row', ns + 'c'
+                elif sheet_data is None and elem.tag == ns + 'sheetData':
+                    sheet_data = elem
+                continue
+            if elem.tag != row_tag:
+                continue
+
+            number = int(elem.get('r') or last_row + 1)
+            if number > last_row + 1:
+                # Empty rows are not stored; the reader needs to see the break
+                yield ['']
+            last_row = number
+
+            cells = []
+            for cell in elem.iterfind(cell_tag):
+                ref = cell.get('r')
+                if ref:
+                    letters = ref.rstrip('0123456789')
+                    column = columns.get(letters)
+                    if column is None:
+                        column = columns[letters] = _column_index(letters)
+                    if column > len(cells):
+                        cells.extend([''] * (column - len(cells)))
+                cells.append(_cell_text(cell, ns, shared, percent_styles))
+            yield cells
+
+            # Drop the rows already handed on so memory stays flat
+            if sheet_data is not None:
+                sheet_data.clear()
+            else:
+                elem.clear()
+
+
+def _sheet_source(filepath, sheet_name):
+    """Name the reader detects channel/platform from"""
+    name = sheet_name.lower()
+    if 'meta' in name or 'google' in name:
+        return sheet_name
+    # Generic sheet names ("Sheet1"): fall back to the workbook's name
+    return f"{Path(filepath).stem} - {sheet_name}"
+
+
+def iter_sheets(filepath):
+    """(source name, row iterator) of every visible sheet of a workbook"""
+    with zipfile.ZipFile(filepath) as book:
+        shared = _read_shared_strings(book)
+        percent_styles = _read_percent_styles(book)
+        for name, member in list_sheets(book):
+            yield _sheet_source(filepath, name), iter_sheet_rows(book, member, shared, percent_styles)
+
+
+def iter_batches(filepath):
+    """Stream every sheet of an .xlsx export and yield one RecordBatch per (section, week)"""
+    for source, rows in iter_sheets(filepath):
+        yield from iter_row_batches(rows, source)